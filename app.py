@@ -1,11 +1,18 @@
+import contextlib
+import json
+
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 from src.data_loader import DataLoader
 from src.features import FeatureEngineer
-from src.strategies import MACrossoverStrategy, MLStrategy
+from src.feature_store import FeatureStore
+from src.strategies import MACrossoverStrategy, MLStrategy, PrecomputedSignalStrategy
+from src.walk_forward import WalkForward
+from src.model_store import ModelStore
 from src.backtester import Backtester
 from src.evaluation import Evaluator
+from src.profiling import profiling
+from src.compact import drop_warmup
 
 # Set page config
 st.set_page_config(page_title="Quantitative Backtesting Demo", layout="wide")
@@ -17,28 +24,56 @@ App này minh họa hệ thống backtesting định lượng với 2 chiến l
 2. **Rule-Based**: Moving Average Crossover (Golden Cross).
 """)
 
+@st.cache_resource
+def get_model_store():
+    # One store per server process, so trained models stay in memory across reruns
+    return ModelStore()
+
+@st.cache_data(show_spinner=False)
+def load_features(ticker, start_date, end_date):
+    # Cached per (ticker, dates), so widget changes do not reload the data
+    loader = DataLoader()
+    raw_data = loader.fetch_data(ticker, start_date, end_date)
+    if raw_data is None or raw_data.empty:
+        return None, None
+    data = loader.clean_data(raw_data)
+    feature_store = FeatureStore()
+    data = feature_store.get_or_compute(data, FeatureEngineer())
+    return drop_warmup(data), feature_store.stats()
+
+@st.cache_resource(show_spinner=False)
+def trained_ml_strategy(train_data):
+    strategy = MLStrategy()
+    strategy.train_model(train_data, store=get_model_store())
+    return strategy
+
+@st.cache_data(show_spinner=False)
+def walk_forward_signals(data):
+    return WalkForward(train_size=756, test_size=126).run(data)
+
 # Sidebar settings
 st.sidebar.header("Settings")
 ticker = st.sidebar.text_input("Ticker Symbol", value="SPY")
 start_date = st.sidebar.date_input("Start Date", value=pd.to_datetime("2015-01-01"))
 end_date = st.sidebar.date_input("End Date", value=pd.to_datetime("2024-01-01"))
 initial_capital = st.sidebar.number_input("Initial Capital ($)", value=10000)
+walk_forward = st.sidebar.checkbox("Walk-forward ML (retrain every 6 months on the previous 3 years)")
+profile_run = st.sidebar.checkbox("Profile pipeline stages")
 
 if st.sidebar.button("Run Simulation"):
-    with st.spinner("Fetching data and running backtest..."):
-        # 1. Data Loading
-        loader = DataLoader()
-        raw_data = loader.fetch_data(ticker, str(start_date), str(end_date))
+    profile_context = profiling() if profile_run else contextlib.nullcontext()
+    with st.spinner("Fetching data and running backtest..."), profile_context as profiler:
+        # 1. Data Loading and 2. Feature Engineering (cached across reruns)
+        data, cache_stats = load_features(ticker, str(start_date), str(end_date))
         
-        if raw_data is None or raw_data.empty:
+        if data is None:
             st.error("No data found!")
         else:
-            data = loader.clean_data(raw_data)
-            
-            # 2. Feature Engineering
-            fe = FeatureEngineer()
-            data = fe.add_features(data)
-            data = data.dropna()
+            st.sidebar.caption(
+                f"Feature cache: {cache_stats['entries']} entries, "
+                f"{cache_stats['bytes'] / 1024 ** 2:.1f} MB, "
+                f"{'hit' if cache_stats['hits'] else 'extended' if cache_stats['extensions'] else 'computed'} when loaded"
+            )
             
             # Split Data
             train_end_date = '2021-12-31'
@@ -61,8 +96,13 @@ if st.sidebar.button("Run Simulation"):
             ma_strategy = MACrossoverStrategy(50, 200)
             
             # ML
-            ml_strategy = MLStrategy()
-            ml_strategy.train_model(train_data)
+            if walk_forward:
+                wf_signals, wf_report = walk_forward_signals(data)
+                ml_strategy = PrecomputedSignalStrategy(wf_signals)
+                with st.expander("Walk-forward folds"):
+                    st.dataframe(wf_report[['test_start', 'test_end', 'train_seconds', 'predict_seconds', 'accuracy', 'Sharpe Ratio']])
+            else:
+                ml_strategy = trained_ml_strategy(train_data)
             
             # 4. Backtest
             backtester = Backtester(initial_capital=initial_capital, transaction_cost_pct=0.001)
@@ -98,6 +138,8 @@ if st.sidebar.button("Run Simulation"):
                 st.metric("Return", f"{benchmark_return:.2%}")
                 
             # Plot
+            import matplotlib.pyplot as plt
+
             st.subheader("Equity Curve")
             fig, ax = plt.subplots(figsize=(12, 6))
             ax.plot(ma_results.index, ma_results['Portfolio Value'], label='MA Crossover')
@@ -111,3 +153,9 @@ if st.sidebar.button("Run Simulation"):
             ax.legend()
             ax.grid(True)
             st.pyplot(fig)
+
+    if profiler is not None:
+        with st.expander("Stage timings", expanded=True):
+            st.dataframe(profiler.summary())
+            st.download_button("Download Chrome trace", json.dumps(profiler.chrome_trace()),
+                               file_name='trace.json', mime='application/json')
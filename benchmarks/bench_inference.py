@@ -0,0 +1,69 @@
+"""
+Latency benchmark for MLStrategy inference.
+
+Compares sklearn's RandomForestClassifier.predict with the CompiledForest
+path (MLStrategy.predict_rows) for a single row and a 1000-row batch, on
+synthetic data so it runs offline.
+
+Usage:
+    python -m benchmarks.bench_inference [--repeats 200]
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+
+from src.features import FeatureEngineer
+from src.providers import SyntheticProvider
+from src.strategies import MLStrategy
+
+
+def measure(fn, repeats):
+    """
+    Call `fn` repeatedly and return (p50, p99) latency in milliseconds.
+    """
+    fn()  # warm up
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return np.percentile(timings, 50) * 1e3, np.percentile(timings, 99) * 1e3
+
+
+def run(repeats=200):
+    raw = SyntheticProvider().download('BENCH', '2000-01-01', '2024-01-01')
+    raw.columns = [c.lower() for c in raw.columns]
+    data = FeatureEngineer().add_features(raw).dropna()
+
+    strategy = MLStrategy()
+    strategy.train_model(data.iloc[:3000])
+    X = data[strategy.features].to_numpy()
+    compiled = strategy.compiled_model()
+
+    cases = {
+        'single row': X[-1:],
+        '1000-row batch': X[-1000:],
+    }
+    rows = []
+    with warnings.catch_warnings():
+        # sklearn warns about arrays without feature names on every call
+        warnings.simplefilter('ignore', UserWarning)
+        for case, batch in cases.items():
+            case_repeats = repeats if len(batch) == 1 else max(repeats // 10, 10)
+            sk_p50, sk_p99 = measure(lambda: strategy.model.predict(batch), case_repeats)
+            cf_p50, cf_p99 = measure(lambda: compiled.predict(batch), case_repeats)
+            rows.append((case, sk_p50, sk_p99, cf_p50, cf_p99))
+
+    print(f"{'case':<16}{'sklearn p50':>13}{'sklearn p99':>13}{'compiled p50':>14}{'compiled p99':>14}")
+    for case, sk_p50, sk_p99, cf_p50, cf_p99 in rows:
+        print(f"{case:<16}{sk_p50:>11.3f}ms{sk_p99:>11.3f}ms{cf_p50:>12.3f}ms{cf_p99:>12.3f}ms")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+    run(args.repeats)
@@ -0,0 +1,286 @@
+"""
+Benchmark suite for the whole pipeline, with regression tracking.
+
+Times every stage (fetch_data, clean_data, add_features, train_model,
+generate_signals, Backtester.run, and the multi-ticker fetch_many /
+run_portfolio path, with and without a fill model) on synthetic
+random-walk OHLCV data, so it runs offline. Peak memory per stage is
+measured with tracemalloc.
+
+Results are written as JSON. Given a baseline file from an earlier run,
+the suite compares every stage present in both and exits with status 1
+when a stage is slower (or uses more memory) than the baseline by more
+than the threshold.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--sizes 10k,1M] [--tickers 1,100]
+        [--output results.json] [--baseline baseline.json] [--threshold 0.25]
+
+    Full suite: --sizes 10k,1M,10M --tickers 1,100,1000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from src.backtester import Backtester
+from src.data_loader import DataLoader
+from src.features import FeatureEngineer
+from src.fill_models import FillModel, VolatilitySlippage, market_panels
+from src.indicators import IndicatorSpec
+from src.providers import SyntheticProvider
+from src.strategies import MACrossoverStrategy, MLStrategy
+
+# Slowdowns (and memory growth) smaller than this are noise, whatever the ratio
+MIN_SECONDS = 0.05
+MIN_MB = 1.0
+
+
+def parse_count(text):
+    """
+    '10k' -> 10000, '1M' -> 1000000.
+    """
+    text = text.strip()
+    scale = {'k': 1_000, 'K': 1_000, 'm': 1_000_000, 'M': 1_000_000}.get(text[-1], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def synthetic_ohlcv(n_rows, seed=0, start='2000-01-03'):
+    """
+    Random-walk OHLCV bars at a one-minute spacing (so 10M rows fit in the
+    pandas date range), with provider-style column names.
+    """
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((n_rows, 3))
+    close = 100 * np.exp(np.cumsum(0.0001 * shocks[:, 0]))
+    open_ = close * np.exp(0.0005 * shocks[:, 1])
+    spread = np.abs(0.001 * shocks[:, 2])
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) * (1 + spread),
+        'Low': np.minimum(open_, close) * (1 - spread),
+        'Close': close,
+        'Volume': rng.integers(1_000, 100_000, n_rows),
+    }, index=pd.date_range(start, periods=n_rows, freq='min', name='Date'))
+
+
+class FrameProvider:
+    """
+    Provider serving pre-generated frames, so fetch_data times the store.
+    """
+
+    rate_limit = None
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def download(self, ticker, start_date, end_date):
+        df = self.frames[ticker]
+        return df.loc[(df.index >= pd.Timestamp(start_date)) & (df.index < pd.Timestamp(end_date))]
+
+
+class StageTimer:
+    """
+    Run pipeline stages, recording wall time and peak traced memory.
+
+    Timed runs are not traced, because tracemalloc slows down allocation-heavy
+    Python code several times over; peak memory comes from one extra traced run.
+    """
+
+    def __init__(self, repeats=1, trace_memory=True):
+        self.repeats = repeats
+        self.trace_memory = trace_memory
+        self.results = {}
+
+    def __call__(self, name, fn, rows=None, once=False):
+        """
+        Time `fn` and return its value.
+
+        Args:
+            name (str): Stage name in the results.
+            fn (callable): Stage to run.
+            rows (int, optional): Rows processed, stored with the result.
+            once (bool): Run a single untraced time only, for stages that
+                cannot be repeated (cold caches) or are very slow.
+        """
+        best = None
+        for _ in range(1 if once else self.repeats):
+            started = time.perf_counter()
+            # Stages print progress messages; keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                value = fn()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+
+        peak_mb = None
+        if self.trace_memory and not once:
+            tracemalloc.start()
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+
+        self.results[name] = {'seconds': best, 'peak_mb': peak_mb, 'rows': rows}
+        memory = f"{peak_mb:>10.1f}MB" if peak_mb is not None else f"{'-':>12}"
+        print(f"{name:<40}{best:>10.3f}s{memory}")
+        return value
+
+
+def bench_single(timer, n_rows, train_rows, n_estimators):
+    """
+    Stages of the single-ticker pipeline on `n_rows` bars.
+    """
+    label = f"single/{n_rows}"
+    raw = synthetic_ohlcv(n_rows)
+    start, end = raw.index[0].normalize(), raw.index[-1].normalize() + pd.Timedelta(days=1)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        loader = DataLoader(data_dir, provider=FrameProvider({'BENCH': raw}))
+        timer(f"{label}/fetch_data_cold", lambda: loader.fetch_data('BENCH', start, end), n_rows, once=True)
+        data = timer(f"{label}/fetch_data_warm", lambda: loader.fetch_data('BENCH', start, end), n_rows)
+        data = timer(f"{label}/clean_data", lambda: loader.clean_data(data.copy()), n_rows)
+        # Drop the memory maps before the directory goes away
+        data = data.copy()
+    del raw
+
+    data = timer(f"{label}/add_features", lambda: FeatureEngineer().add_features(data), n_rows).dropna()
+
+    strategy = MLStrategy(n_estimators=n_estimators)
+    train_data = data.iloc[:train_rows]
+    timer(f"{label}/train_model", lambda: strategy.train_model(train_data), len(train_data), once=True)
+
+    ma_strategy = MACrossoverStrategy()
+    timer(f"{label}/generate_signals_ma", lambda: ma_strategy.generate_signals(data), len(data))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        timer(f"{label}/generate_signals_ml", lambda: strategy.generate_signals(data), len(data))
+    timer(f"{label}/backtest_run", lambda: Backtester().run(data, ma_strategy), len(data))
+
+
+def bench_universe(timer, n_tickers, start='2010-01-01', end='2020-01-01'):
+    """
+    Multi-ticker stages for a universe of `n_tickers` daily series.
+    """
+    label = f"universe/{n_tickers}"
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        loader = DataLoader(data_dir, provider=SyntheticProvider(origin=start))
+        timer(f"{label}/fetch_many_cold", lambda: loader.fetch_many(tickers, start, end), n_tickers, once=True)
+        frames = timer(f"{label}/fetch_many_warm", lambda: loader.fetch_many(tickers, start, end), n_tickers)
+        frames = {ticker: loader.clean_data(df.copy()) for ticker, df in frames.items()}
+
+    fe = FeatureEngineer()
+    spec = IndicatorSpec(sma=(50, 200), log_return=False)
+    panel = timer(
+        f"{label}/compute_matrix",
+        lambda: {ticker: pd.concat([df, fe.compute_matrix(df, spec)], axis=1) for ticker, df in frames.items()},
+        n_tickers,
+    )
+    weights = timer(f"{label}/generate_weights", lambda: MACrossoverStrategy().generate_weights(panel), n_tickers)
+    prices = pd.DataFrame({ticker: df['close'] for ticker, df in panel.items()})
+    timer(f"{label}/run_portfolio", lambda: Backtester().run_portfolio(prices, weights), n_tickers)
+
+    # Next-open fills, 1% volume cap and volatility-based spread/impact
+    fill_model = FillModel(max_participation=0.01, slippage=VolatilitySlippage())
+    market = market_panels(panel, ['open', 'volume'])
+    market['Volatility_20'] = np.log(prices).diff().rolling(20).std()
+    timer(
+        f"{label}/run_portfolio_fills",
+        lambda: Backtester(fill_model=fill_model).run_portfolio(prices, weights, market),
+        n_tickers,
+    )
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare stages present in both runs.
+
+    Returns:
+        list: Names of stages that regressed past `threshold`.
+    """
+    regressions = []
+    print(f"\n{'stage':<40}{'baseline':>10}{'current':>10}{'change':>9}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        change = current['seconds'] / previous['seconds'] - 1 if previous['seconds'] > 0 else 0.0
+        slower = change > threshold and current['seconds'] - previous['seconds'] >= MIN_SECONDS
+        bigger = False
+        if current['peak_mb'] is not None and previous.get('peak_mb'):
+            memory_change = current['peak_mb'] / previous['peak_mb'] - 1
+            bigger = memory_change > threshold and current['peak_mb'] - previous['peak_mb'] >= MIN_MB
+        flag = ' REGRESSION' if slower or bigger else ''
+        print(f"{name:<40}{previous['seconds']:>9.3f}s{current['seconds']:>9.3f}s{change:>+9.0%}{flag}")
+        if bigger:
+            print(f"{'':<40}peak memory {previous['peak_mb']:.1f}MB -> {current['peak_mb']:.1f}MB")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def run(sizes=('10k', '1M'), tickers=('100',), repeats=1, train_rows=50_000, n_estimators=50,
+        output=None, baseline=None, threshold=0.25, trace_memory=True):
+    timer = StageTimer(repeats, trace_memory)
+    for size in sizes:
+        bench_single(timer, parse_count(size), train_rows, n_estimators)
+    for count in tickers:
+        bench_universe(timer, parse_count(count))
+
+    report = {
+        'meta': {
+            'created': pd.Timestamp.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'sklearn': sklearn.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'repeats': repeats,
+        },
+        'results': timer.results,
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to {output}")
+
+    if baseline:
+        with open(baseline) as f:
+            previous = json.load(f)['results']
+        regressions = compare(timer.results, previous, threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) regressed by more than {threshold:.0%}.")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10k,1M', help="Rows for the single-ticker stages, e.g. 10k,1M,10M")
+    parser.add_argument('--tickers', default='100', help="Universe sizes, e.g. 1,100,1000")
+    parser.add_argument('--repeats', type=int, default=1, help="Runs per stage; the fastest is kept")
+    parser.add_argument('--train-rows', type=int, default=50_000, help="Rows used by train_model")
+    parser.add_argument('--trees', type=int, default=50, help="Trees in the benchmark forest")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed slowdown, e.g. 0.25 = 25%%")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the traced memory runs")
+    args = parser.parse_args()
+
+    split = lambda text: [item for item in text.split(',') if item]
+    sys.exit(run(split(args.sizes), split(args.tickers), args.repeats, args.train_rows, args.trees,
+                 args.output, args.baseline, args.threshold, not args.no_memory))
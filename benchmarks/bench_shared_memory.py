@@ -0,0 +1,66 @@
+"""
+Per-task dispatch overhead: pickled DataFrames vs a shared-memory panel.
+
+Every task receives the full feature frame, either as a pickled DataFrame
+argument (what a plain `executor.submit(fn, df)` does) or as a
+`PanelHandle` that the worker resolves to read-only views of one shared
+copy. The task itself only touches the data (sums the close column), so
+the timings are dominated by getting the frame into the worker.
+
+Usage:
+    python -m benchmarks.bench_shared_memory [--sizes 10k,1M] [--tasks 20] [--workers 2]
+"""
+import argparse
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.bench_pipeline import parse_count, synthetic_ohlcv
+from src.features import FeatureEngineer
+from src.shared_memory import SharedPanel, as_frame
+
+
+def _touch(data):
+    return float(as_frame(data)['close'].sum())
+
+
+def time_tasks(executor, payload, n_tasks, workers):
+    """
+    Seconds per task for `n_tasks` tasks that each receive `payload`.
+    """
+    # Warm up: start the workers (and attach, for handles) before timing
+    list(executor.map(_touch, [payload] * workers))
+    started = time.perf_counter()
+    list(executor.map(_touch, [payload] * n_tasks))
+    return (time.perf_counter() - started) / n_tasks
+
+
+def run(sizes=('10k', '1M'), n_tasks=20, workers=2):
+    print(f"{'rows':>10}{'frame MB':>10}{'pickle KB':>12}{'handle B':>10}"
+          f"{'publish ms':>12}{'pickled ms':>12}{'shared ms':>11}{'speedup':>9}")
+    for size in sizes:
+        n_rows = parse_count(size)
+        raw = synthetic_ohlcv(n_rows)
+        raw.columns = [c.lower() for c in raw.columns]
+        data = FeatureEngineer(use_ta_lib=False).add_features(raw)
+
+        started = time.perf_counter()
+        panel = SharedPanel.publish(data)
+        publish = time.perf_counter() - started
+        with panel, ProcessPoolExecutor(max_workers=workers) as executor:
+            pickled = time_tasks(executor, data, n_tasks, workers)
+            shared = time_tasks(executor, panel.handle, n_tasks, workers)
+            pickle_bytes = len(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+            handle_bytes = len(pickle.dumps(panel.handle, protocol=pickle.HIGHEST_PROTOCOL))
+
+        print(f"{n_rows:>10}{data.memory_usage().sum() / 2**20:>10.1f}{pickle_bytes / 1024:>12.0f}{handle_bytes:>10}"
+              f"{publish * 1e3:>12.1f}{pickled * 1e3:>12.2f}{shared * 1e3:>11.2f}{pickled / shared:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10k,1M', help="Rows of the shared frame, e.g. 10k,1M")
+    parser.add_argument('--tasks', type=int, default=20, help="Timed tasks per case")
+    parser.add_argument('--workers', type=int, default=2, help="Worker processes")
+    args = parser.parse_args()
+    run([size for size in args.sizes.split(',') if size], args.tasks, args.workers)
@@ -0,0 +1,78 @@
+"""
+Cold-start budget for import-only startup.
+
+Imports each entry point in a fresh interpreter (so nothing is cached in
+the process) and reports the fastest of several runs. Heavy optional
+dependencies must load on first use, not at import time: the check fails
+when an entry point pulls one of them in, or when startup exceeds the
+budget.
+
+Usage:
+    python -m benchmarks.bench_startup [--budget 1.0] [--repeats 5]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+# Imported lazily by the modules that need them
+HEAVY_MODULES = ('sklearn', 'scipy', 'matplotlib', 'yfinance', 'ta', 'joblib')
+
+ENTRY_POINTS = {
+    'main': 'import main',
+    'src': 'import src.data_loader, src.features, src.feature_store, src.strategies, '
+           'src.backtester, src.evaluation, src.walk_forward, src.optimization, src.model_store',
+}
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{'seconds': elapsed, 'modules': sorted(name for name in sys.modules if '.' not in name)}}))
+"""
+
+
+def measure(statement, repeats):
+    """
+    Time `statement` in fresh interpreters.
+
+    Returns:
+        tuple: (fastest seconds, top-level modules loaded by the statement).
+    """
+    best, modules = None, []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(statement=statement)],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best:
+            best = result['seconds']
+        modules = result['modules']
+    return best, modules
+
+
+def run(budget=1.0, repeats=5):
+    failures = []
+    print(f"{'entry point':<16}{'seconds':>10}  heavy modules loaded")
+    for name, statement in ENTRY_POINTS.items():
+        seconds, modules = measure(statement, repeats)
+        heavy = [module for module in HEAVY_MODULES if module in modules]
+        print(f"{name:<16}{seconds:>9.3f}s  {', '.join(heavy) or '-'}")
+        if seconds > budget:
+            failures.append(f"{name} took {seconds:.2f}s (budget {budget:.2f}s)")
+        if heavy:
+            failures.append(f"{name} imported {', '.join(heavy)} at startup")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"\nAll entry points start within {budget:.2f}s.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget', type=float, default=1.0, help="Maximum import time in seconds")
+    parser.add_argument('--repeats', type=int, default=5, help="Fresh interpreters per entry point; the fastest is kept")
+    args = parser.parse_args()
+    sys.exit(run(args.budget, args.repeats))
@@ -1,17 +1,24 @@
 from src.data_loader import DataLoader
 from src.features import FeatureEngineer
-from src.strategies import MACrossoverStrategy, MLStrategy
+from src.feature_store import FeatureStore
+from src.strategies import MACrossoverStrategy, MLStrategy, PrecomputedSignalStrategy
+from src.walk_forward import WalkForward
+from src.model_store import ModelStore
 from src.backtester import Backtester
+from src.fill_models import FillModel, VolatilitySlippage
 from src.evaluation import Evaluator
-import matplotlib.pyplot as plt
-import pandas as pd
+from src.robustness import RobustnessTest
+from src.profiling import profiling
+from src.compact import drop_warmup
+import sys
 
-def run_demo():
+def run_demo(compact=False):
     print("=== Quantitative Trading Project Demo ===")
     
     # 1. Data Collection
     print("\n[1] Fetching data...")
-    loader = DataLoader()
+    # compact: float32 prices/features and integer volume (python main.py --compact)
+    loader = DataLoader(compact=compact)
     # Fetch 9 years of data
     raw_data = loader.fetch_data('SPY', '2015-01-01', '2024-01-01')
     if raw_data is None:
@@ -23,10 +30,13 @@ def run_demo():
     
     # 2. Feature Engineering
     print("\n[2] Engineering features...")
-    fe = FeatureEngineer()
-    data = fe.add_features(data)
-    data = data.dropna()
+    fe = FeatureEngineer(compact=compact)
+    feature_store = FeatureStore()
+    data = feature_store.get_or_compute(data, fe)
+    data = drop_warmup(data)
     print("Features added: SMA_50, SMA_200, RSI, MACD, Volatility.")
+    cache_stats = feature_store.stats()
+    print(f"Feature cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['extensions']} extensions.")
     
     # Split for ML (Train: 2015-2021, Test: 2022-2023)
     train_end_date = '2021-12-31'
@@ -47,7 +57,7 @@ def run_demo():
     # B. ML-based
     print("\n[4] Training ML Strategy (Random Forest)...")
     ml_strategy = MLStrategy()
-    ml_strategy.train_model(train_data)
+    ml_strategy.train_model(train_data, store=ModelStore())
     
     # 4. Backtesting (on Test Data)
     backtester = Backtester(transaction_cost_pct=0.001) # 0.1% per trade
@@ -77,8 +87,41 @@ def run_demo():
     benchmark_return = (final_price / initial_price) - 1
     print(f"Cumulative Return: {benchmark_return:.4f}")
 
+    # Same MA signals without the same-close look-ahead: fill at the next open,
+    # with spread/impact from Volatility_20 and at most 1% of each bar's volume
+    print("\n=== MA Strategy with Next-Open Fills ===")
+    realistic = Backtester(
+        transaction_cost_pct=0.001,
+        fill_model=FillModel('next_open', max_participation=0.01, slippage=VolatilitySlippage()),
+    )
+    realistic_metrics = Evaluator(realistic.run(test_data, ma_strategy)).calculate_metrics()
+    for k in ('Cumulative Return', 'Sharpe Ratio', 'Max Drawdown'):
+        print(f"{k}: {realistic_metrics[k]:.4f} (close fills: {ma_metrics[k]:.4f})")
+
+    # Is the Sharpe ratio distinguishable from luck? Block bootstrap of daily returns
+    print("\n=== Bootstrap 95% Confidence Intervals (10,000 resamples, 20-day blocks) ===")
+    for name, results in (('MA Strategy', ma_results), ('ML Strategy', ml_results)):
+        intervals = RobustnessTest(results).report(n_resamples=10000)
+        print(f"\n{name}")
+        print(intervals.loc[['Sharpe Ratio', 'Max Drawdown', 'Cumulative Return']].round(4).to_string())
+
+    # Walk-forward: retrain every 6 months on the previous 3 years
+    print("\n[6] Walk-forward ML Strategy (rolling 3y train / 6m test)...")
+    walk_forward = WalkForward(train_size=756, test_size=126)
+    wf_signals, wf_report = walk_forward.run(data)
+    print(wf_report[['test_start', 'test_end', 'train_seconds', 'accuracy', 'Sharpe Ratio']].to_string())
+    wf_results = backtester.run(data.loc[wf_signals.index], PrecomputedSignalStrategy(wf_signals))
+    print("\n=== Walk-forward ML Performance ===")
+    for k, v in Evaluator(wf_results).calculate_metrics().items():
+        print(f"{k}: {v:.4f}")
+
     # Plot
-    print("\n[6] Generating Plot...")
+    print("\n[7] Generating Plot...")
+    # matplotlib is only needed here; the figure is saved, so no GUI backend
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(14, 7))
     plt.plot(ma_results.index, ma_results['Portfolio Value'], label=f'MA Crossover (Sharpe: {ma_metrics.get("Sharpe Ratio",0):.2f})')
     plt.plot(ml_results.index, ml_results['Portfolio Value'], label=f'ML Random Forest (Sharpe: {ml_metrics.get("Sharpe Ratio",0):.2f})')
@@ -99,4 +142,9 @@ def run_demo():
     print(f"Plot saved to {save_path}")
 
 if __name__ == "__main__":
-    run_demo()
+    with profiling() as profiler:
+        run_demo(compact='--compact' in sys.argv[1:])
+    
+    # Where the time went, per pipeline stage (nested stages overlap their parents)
+    print("\n=== Stage Timings ===")
+    print(profiler.summary()[['calls', 'wall_seconds', 'cpu_seconds', 'rows', 'share']].round(3).to_string())
@@ -1,8 +1,14 @@
 import pandas as pd
 import numpy as np
 
+from .fill_models import fill_trades
+from .frequency import BarFrequency
+from .profiling import profiled, stage
+from .results import BacktestResult
+from .validation import ensure_sorted
+
 class Backtester:
-    def __init__(self, initial_capital=10000.0, transaction_cost_pct=0.001, slippage_pct=0.0005):
+    def __init__(self, initial_capital=10000.0, transaction_cost_pct=0.001, slippage_pct=0.0005, frequency='1d', signal_cache=None, fill_model=None):
         """
         Initialize the Backtester.
         
@@ -10,85 +16,499 @@ class Backtester:
             initial_capital (float): Starting cash.
             transaction_cost_pct (float): Cost per trade (e.g. 0.001 for 0.1%).
             slippage_pct (float): Estimated price slippage (e.g. 0.0005 for 0.05%).
+            frequency (str or BarFrequency): Bar size of the data. Orders fill at
+                each bar's close whatever the size; results carry the bars per
+                year in `attrs` so Evaluator annualizes correctly.
+            signal_cache (SignalCache, optional): Reuse strategy signals across
+                runs on the same data (e.g. when only costs change).
+            fill_model (FillModel, optional): Next-open execution, volume caps,
+                partial fills and volatility-based slippage for `run`,
+                `run_batch` and `run_portfolio`. Defaults to filling the
+                whole order at the signal bar's close with `slippage_pct`.
         """
         self.initial_capital = initial_capital
         self.transaction_cost_pct = transaction_cost_pct
         self.slippage_pct = slippage_pct
+        self.frequency = BarFrequency(frequency)
+        self.signal_cache = signal_cache
+        self.fill_model = fill_model
 
-    def run(self, data, strategy):
+    @profiled('Backtester.run')
+    def run(self, data, strategy, engine='vectorized', evaluator=None, output_path=None):
         """
         Run the backtest.
         
         Args:
             data (pd.DataFrame): Date-indexed DataFrame with 'close' price.
             strategy (Strategy): Feature-aware strategy instance.
+            engine (str): 'vectorized' (NumPy engine) or 'loop' (reference
+                row-by-row implementation). Both produce identical results.
+                With a fill model the array kernel in `fill_models` is used.
+                'loop' is not supported.
+            evaluator (OnlineEvaluator, optional): Fed every bar as it is
+                marked to market, e.g. to keep live metrics up to date.
+            output_path (str, optional): Directory for memory-mapped result
+                columns (see `BacktestResult`), for very long runs.
             
         Returns:
             pd.DataFrame: Portfolio result with 'Portfolio Value', 'Cash', 'Holdings'.
         """
-        # Ensure data is sorted
-        data = data.sort_index()
+        if engine not in ('vectorized', 'loop'):
+            raise ValueError(f"Unknown engine '{engine}'. Use 'vectorized' or 'loop'.")
+        if not isinstance(data.index, pd.DatetimeIndex):
+            raise ValueError(f"Backtest data needs a DatetimeIndex, got {type(data.index).__name__}.")
+        if engine == 'loop' and self.fill_model is not None:
+            raise ValueError("The loop engine only supports the default close fills.")
+
+        # Ensure data is sorted (validated data already is)
+        data = ensure_sorted(data)
         
         # Get target positions (0 or 1) from strategy
         # Strategy should use info available up to t to signal position for t+1 open/close.
         # Here we assume strategies execute at CLOSE of the signal day (or Open of next, but simpler is Close).
-        signals = strategy.generate_signals(data)
-        
-        # Initialize
-        cash = self.initial_capital
-        position = 0.0 # shares
-        portfolio_history = []
+        with stage('Backtester.signals', rows=len(data)):
+            signals = self.signals(data, strategy)
+
+        with stage(f'Backtester.{engine}', rows=len(data)):
+            result = BacktestResult(len(data), path=output_path)
+            if engine == 'loop':
+                self._run_loop(data, signals, result, evaluator)
+            elif self.fill_model is not None:
+                self._run_fills(data, signals, result, evaluator)
+            else:
+                self._run_vectorized(data, signals, result, evaluator)
+            result.flush()
+        results = result.to_frame()
+        results.attrs['periods_per_year'] = self.frequency.periods_per_year
+        return results
+
+    def signals(self, data, strategy):
+        """
+        The strategy's int8 target positions for `data`, from the signal
+        cache when one is set.
+        """
+        if self.signal_cache is not None:
+            return self.signal_cache.get_or_compute(data, strategy)
+        return strategy.signal_array(data)
+
+    @profiled('Backtester.run_batch')
+    def run_batch(self, data, signals):
+        """
+        Backtest many long/flat signal columns over the same prices at once.
         
-        # Iterate daily
-        prev_signal = 0
+        Every column goes through the same trade arithmetic as `run`, so
+        column k equals `run` for strategy k, but prices are converted once
+        and the results are written into shared (dates x strategies) arrays.
         
-        for date, row in data.iterrows():
-            current_signal = signals.loc[date]
-            price = row['close']
+        Args:
+            data (pd.DataFrame): Date-indexed DataFrame with 'close' price.
+            signals (pd.DataFrame or np.ndarray): Target positions, dates x
+                strategies, e.g. from `signals.signal_matrix`. A DataFrame is
+                aligned to the dates of `data`; an array must have one row
+                per bar of `data` in date order.
             
-            # If signal changes, execute trade
-            # In this simple model, signal=1 means WE WANT TO BE LONG.
-            # signal=0 means WE WANT TO BE FLAT.
+        Returns:
+            dict: 'Cash', 'Holdings', 'Portfolio Value' and 'Position' as
+                (dates x strategies) DataFrames.
+        """
+        if isinstance(signals, pd.DataFrame):
+            data = ensure_sorted(data)
+            if not signals.index.equals(data.index):
+                signals = signals.loc[data.index]
+            labels = signals.columns
+            matrix = signals.to_numpy()
+        else:
+            matrix = np.asarray(signals)
+            labels = pd.RangeIndex(matrix.shape[1])
+            if len(matrix) != len(data):
+                raise ValueError(f"Signals have {len(matrix)} rows for {len(data)} bars.")
+
+        prices = data['close'].to_numpy(dtype=np.float64)
+        n_bars, n_strategies = matrix.shape
+        cash = np.empty((n_bars, n_strategies), order='F')
+        position = np.empty((n_bars, n_strategies), dtype=np.int64, order='F')
+        bars = np.arange(n_bars)
+
+        with stage('Backtester.batch', rows=n_bars * n_strategies):
+            for j in range(n_strategies):
+                if self.fill_model is not None:
+                    cash_rows, cash_values, position_values = self._fill_events(data, matrix[:, j])
+                    cash_values = cash_values.tolist()
+                    position_values = position_values.tolist()
+                else:
+                    cash_rows, cash_values, position_values = _long_flat_trades(
+                        prices, matrix[:, j], self.initial_capital, self.slippage_pct, self.transaction_cost_pct
+                    )
+                last_trade = np.searchsorted(cash_rows, bars, side='right')
+                np.take(np.array([self.initial_capital] + cash_values), last_trade, out=cash[:, j])
+                np.take(np.array([0] + position_values), last_trade, out=position[:, j])
+            holdings_value = position * prices[:, None]
+            total_value = cash + holdings_value
+
+        index = pd.Index(data.index, name='Date')
+        results = {}
+        for name, values in (('Cash', cash), ('Holdings', holdings_value),
+                             ('Portfolio Value', total_value), ('Position', position)):
+            results[name] = pd.DataFrame(values, index=index, columns=labels, copy=False)
+            results[name].attrs['periods_per_year'] = self.frequency.periods_per_year
+        return results
+
+    def stream(self, bars, strategy, evaluator=None):
+        """
+        Run the backtest bar by bar as a generator, for paper trading or data
+        larger than memory.
+        
+        Bars are pulled from `bars` one at a time, the strategy is asked for
+        an incremental signal (`Strategy.on_bar`), and a portfolio record is
+        yielded for every bar. Only the strategy's rolling state is kept, so
+        memory stays bounded however long the stream runs. Fills follow the
+        same long/flat model as `run` (at the close, without the fill model).
+        
+        Args:
+            bars (iterable): (date, bar) pairs in date order, e.g. from a
+                source in `bar_sources`; bar is a dict with a 'close' value.
+            strategy (Strategy): Strategy implementing `on_bar`.
+            evaluator (OnlineEvaluator, optional): Fed every record.
             
-            # Calculate Target Shares
-            if current_signal == 1:
-                # We want to be fully invested
-                if position == 0:
-                    # BUY
-                    effective_price = price * (1 + self.slippage_pct)
-                    shares_to_buy = int(cash / effective_price)
-                    cost = shares_to_buy * effective_price
-                    fee = cost * self.transaction_cost_pct
-                    
-                    if cash >= cost + fee:
-                        cash -= (cost + fee)
-                        position = shares_to_buy
+        Yields:
+            dict: 'Date', 'Cash', 'Holdings', 'Portfolio Value', 'Position'.
+        """
+        strategy.start_stream()
+        cash = self.initial_capital
+        position = 0
+        
+        for date, bar in bars:
+            price = float(bar['close'])
+            signal = strategy.on_bar(date, bar)
             
-            elif current_signal == 0:
-                # We want to be cash
-                if position > 0:
-                    # SELL
-                    effective_price = price * (1 - self.slippage_pct)
-                    revenue = position * effective_price
-                    fee = revenue * self.transaction_cost_pct
-                    
-                    cash += (revenue - fee)
-                    position = 0
+            cash, position = _long_flat_fill(signal, price, cash, position, self.slippage_pct, self.transaction_cost_pct)
             
             # Mark to Market
             holdings_value = position * price
             total_value = cash + holdings_value
+            if evaluator is not None:
+                evaluator.update(total_value, cash, position)
             
-            portfolio_history.append({
+            yield {
                 'Date': date,
                 'Cash': cash,
                 'Holdings': holdings_value,
                 'Portfolio Value': total_value,
-                'Position': position
-            })
+                'Position': position,
+            }
+
+    @profiled('Backtester.run_portfolio')
+    def run_portfolio(self, prices, weights, market=None):
+        """
+        Run a multi-asset backtest over a price panel.
+
+        The portfolio is rebalanced at the close of every bar whose target
+        weights differ from the previous bar (the multi-asset analogue of
+        the long/flat model in `run`). Sells are filled before buys, and
+        buys are scaled down if cash would not cover them.
+
+        Args:
+            prices (pd.DataFrame): Close prices, dates x tickers. NaN marks
+                bars where a ticker cannot trade (e.g. before listing).
+            weights (pd.DataFrame): Target portfolio weights with the same
+                shape, e.g. from `Strategy.generate_weights`.
+            market (dict, optional): Further (dates x tickers) panels needed by
+                the fill model, keyed by column (`fill_model.columns()`, e.g.
+                'open', 'volume', 'Volatility_20'); see
+                `fill_models.market_panels`.
+
+        Returns:
+            tuple: (results, positions) where results has 'Cash', 'Holdings',
+                'Portfolio Value' and positions holds integer shares per ticker.
+        """
+        prices = ensure_sorted(prices)
+        weights = weights.reindex(index=prices.index, columns=prices.columns)
+
+        price_matrix = prices.to_numpy(dtype=np.float64)
+        weight_matrix = np.nan_to_num(weights.to_numpy(dtype=np.float64))
+
+        # Mark to Market at the last known price of each asset
+        marks = np.nan_to_num(prices.ffill().to_numpy(dtype=np.float64))
+
+        if self.fill_model is not None:
+            market = {
+                column: panel.reindex(index=prices.index, columns=prices.columns).to_numpy(dtype=np.float64)
+                for column, panel in self._market(market or {}).items()
+            }
+            cash_rows, cash_values, position_values = self._fill_trades(price_matrix, marks, weight_matrix, market)
+        else:
+            cash_rows, cash_values, position_values = _rebalance_trades(
+                price_matrix, marks, weight_matrix, self.initial_capital,
+                self.slippage_pct, self.transaction_cost_pct
+            )
+
+        n_bars, n_assets = price_matrix.shape
+        last_trade = np.searchsorted(cash_rows, np.arange(n_bars), side='right')
+        cash = np.concatenate(([float(self.initial_capital)], cash_values))[last_trade]
+        position_matrix = np.concatenate(
+            (np.zeros((1, n_assets), dtype=np.int64), position_values)
+        )[last_trade]
+
+        holdings_value = np.einsum('ij,ij->i', position_matrix, marks)
+
+        index = pd.Index(prices.index, name='Date')
+        results = pd.DataFrame(
+            {
+                'Cash': cash,
+                'Holdings': holdings_value,
+                'Portfolio Value': cash + holdings_value,
+            },
+            index=index,
+        )
+        positions = pd.DataFrame(position_matrix, index=index, columns=prices.columns)
+        results.attrs['periods_per_year'] = self.frequency.periods_per_year
+        return results, positions
+
+    def _run_vectorized(self, data, signals, result, evaluator=None):
+        """
+        NumPy execution engine.
+
+        Trades can only happen on bars where the signal disagrees with the
+        current position, so instead of visiting every row we jump between
+        candidate bars with searchsorted and apply exactly the same scalar
+        fill arithmetic as the reference loop. Cash and position are then
+        forward-filled across the bars in between.
+        """
+        # Cash arithmetic stays in float64 even for compact (float32) prices
+        prices = data['close'].to_numpy(dtype=np.float64)
+
+        cash_rows, cash_values, position_values = _long_flat_trades(
+            prices, signals, self.initial_capital, self.slippage_pct, self.transaction_cost_pct
+        )
+
+        # Map every bar to the most recent trade (or the initial state), writing
+        # straight into the preallocated result columns
+        result.add_rows(len(prices))
+        last_trade = np.searchsorted(cash_rows, np.arange(len(prices)), side='right')
+        cash = np.take(np.array([self.initial_capital] + cash_values), last_trade, out=result.column('Cash'))
+        position = np.take(np.array([0] + position_values), last_trade, out=result.column('Position'))
+        result.write_dates(data.index)
+
+        # Mark to Market
+        holdings_value = np.multiply(position, prices, out=result.column('Holdings'))
+        total_value = np.add(cash, holdings_value, out=result.column('Portfolio Value'))
+
+        if evaluator is not None:
+            for bar in zip(total_value.tolist(), cash.tolist(), position.tolist()):
+                evaluator.update(*bar)
+
+    def _run_fills(self, data, signals, result, evaluator=None):
+        """
+        Single-asset run through the fill model's array kernel.
+        """
+        prices = data['close'].to_numpy(dtype=np.float64)
+        cash_rows, cash_values, position_values = self._fill_events(data, signals)
+
+        result.add_rows(len(prices))
+        last_trade = np.searchsorted(cash_rows, np.arange(len(prices)), side='right')
+        cash = np.take(np.concatenate(([float(self.initial_capital)], cash_values)), last_trade, out=result.column('Cash'))
+        position = np.take(np.concatenate(([0], position_values)), last_trade, out=result.column('Position'))
+        result.write_dates(data.index)
+
+        holdings_value = np.multiply(position, prices, out=result.column('Holdings'))
+        total_value = np.add(cash, holdings_value, out=result.column('Portfolio Value'))
+
+        if evaluator is not None:
+            for bar in zip(total_value.tolist(), cash.tolist(), position.tolist()):
+                evaluator.update(*bar)
+
+    def _fill_events(self, data, signals):
+        """
+        Trade events of one long/flat signal column under the fill model.
+
+        Signal 1 targets a fully invested position and 0 a flat one; any
+        other value keeps the previous target, as in the default engines.
+        """
+        close = data[['close']].to_numpy(dtype=np.float64)
+        signals = np.asarray(signals)
+        weights = np.where(signals == 1, 1.0, np.where(signals == 0, 0.0, np.nan))
+        weights = pd.Series(weights).ffill().fillna(0.0).to_numpy()[:, None]
+        market = {column: values.to_numpy(dtype=np.float64) for column, values in self._market(data).items()}
+        marks = np.nan_to_num(pd.DataFrame(close).ffill().to_numpy())
+        cash_rows, cash_values, position_values = self._fill_trades(close, marks, weights, market)
+        return cash_rows, cash_values, position_values[:, 0]
+
+    def _market(self, data):
+        """
+        The market data columns the fill model needs, from a DataFrame or a
+        dict of panels.
+        """
+        needed = self.fill_model.columns()
+        missing = [column for column in needed if column not in data]
+        if missing:
+            raise ValueError(f"Fill model needs {', '.join(missing)} data.")
+        if isinstance(data, pd.DataFrame):
+            return {column: data[[column]] for column in needed}
+        return {column: data[column] for column in needed}
+
+    def _fill_trades(self, close, marks, weights, market):
+        arrays = self.fill_model.arrays(close, market, self.slippage_pct)
+        with stage('Backtester.fills', rows=close.size):
+            return fill_trades(
+                close, marks, weights, self.initial_capital, self.transaction_cost_pct,
+                delay=self.fill_model.delay, **arrays
+            )
+
+    def _run_loop(self, data, signals, result, evaluator=None):
+        """
+        Reference engine: iterate day by day. Kept to cross-check the
+        vectorized engine.
+        """
+        # Initialize
+        cash = self.initial_capital
+        position = 0 # shares
+        
+        # Iterate daily
+        for i, (date, row) in enumerate(data.iterrows()):
+            current_signal = signals[i]
+            price = float(row['close'])
+            
+            # signal=1 means WE WANT TO BE LONG (fully invested).
+            # signal=0 means WE WANT TO BE FLAT.
+            cash, position = _long_flat_fill(current_signal, price, cash, position, self.slippage_pct, self.transaction_cost_pct)
             
-            prev_signal = current_signal
+            # Mark to Market
+            holdings_value = position * price
+            total_value = cash + holdings_value
+            if evaluator is not None:
+                evaluator.update(total_value, cash, position)
+            
+            result.append(date, cash, holdings_value, total_value, position)
 
-        results = pd.DataFrame(portfolio_history)
-        results = results.set_index('Date')
-        return results
+
+def _long_flat_fill(signal, price, cash, position, slippage_pct, transaction_cost_pct):
+    """
+    One bar of the long/flat model, shared by every single-asset engine.
+
+    Signal 1 buys with all the cash when flat and signal 0 sells everything
+    when long, at the close with slippage and fees. A buy whose fee the cash
+    does not cover is skipped; any other signal keeps the position.
+
+    Returns:
+        tuple: (cash, position) after the bar.
+    """
+    if signal == 1 and position == 0:
+        # BUY
+        effective_price = price * (1 + slippage_pct)
+        shares_to_buy = int(cash / effective_price)
+        cost = shares_to_buy * effective_price
+        fee = cost * transaction_cost_pct
+        if cash >= cost + fee:
+            cash -= (cost + fee)
+            position = shares_to_buy
+    elif signal == 0 and position > 0:
+        # SELL
+        effective_price = price * (1 - slippage_pct)
+        revenue = position * effective_price
+        fee = revenue * transaction_cost_pct
+        cash += (revenue - fee)
+        position = 0
+    return cash, position
+
+
+def _long_flat_trades(prices, signals, initial_capital, slippage_pct, transaction_cost_pct):
+    """
+    Walk the trade events of the long/flat model.
+
+    Args:
+        prices (np.ndarray): Close prices.
+        signals (np.ndarray): Target position per bar (1: long, 0: flat).
+        initial_capital (float): Starting cash.
+        slippage_pct (float): Price slippage per fill.
+        transaction_cost_pct (float): Fee per fill.
+
+    Returns:
+        tuple: (rows, cash, positions) after each executed trade.
+    """
+    buy_rows = np.flatnonzero(signals == 1)
+    sell_rows = np.flatnonzero(signals == 0)
+
+    cash = initial_capital
+    position = 0
+    rows, cash_values, position_values = [], [], []
+
+    i = 0
+    while True:
+        candidates = buy_rows if position == 0 else sell_rows
+        k = np.searchsorted(candidates, i)
+        if k == len(candidates):
+            break
+        i = candidates[k]
+
+        # A buy whose fee does not fit leaves the position flat and is
+        # retried on the next long bar
+        new_cash, new_position = _long_flat_fill(signals[i], prices[i], cash, position, slippage_pct, transaction_cost_pct)
+        if new_position != position:
+            cash, position = new_cash, new_position
+            rows.append(i)
+            cash_values.append(cash)
+            position_values.append(position)
+
+        i += 1
+
+    return np.array(rows, dtype=np.int64), cash_values, position_values
+
+
+def _rebalance_trades(prices, marks, weights, initial_capital, slippage_pct, transaction_cost_pct):
+    """
+    Walk the rebalance events of a multi-asset portfolio.
+
+    Args:
+        prices (np.ndarray): Close prices, shape (bars, assets).
+        marks (np.ndarray): Forward-filled prices used for valuation (0 before
+            an asset's first price).
+        weights (np.ndarray): Target weights, shape (bars, assets).
+        initial_capital (float): Starting cash.
+        slippage_pct (float): Price slippage per fill.
+        transaction_cost_pct (float): Fee per fill.
+
+    Returns:
+        tuple: (rows, cash, positions) after each rebalance, with positions
+            as an int64 array of shape (rebalances, assets).
+    """
+    n_bars, n_assets = prices.shape
+
+    # Rebalance only when the target changes
+    changed = np.empty(n_bars, dtype=bool)
+    if n_bars:
+        changed[0] = weights[0].any()
+        changed[1:] = (weights[1:] != weights[:-1]).any(axis=1)
+    rebalance_rows = np.flatnonzero(changed)
+
+    cash = float(initial_capital)
+    position = np.zeros(n_assets, dtype=np.int64)
+    cash_values = np.empty(len(rebalance_rows))
+    position_values = np.empty((len(rebalance_rows), n_assets), dtype=np.int64)
+
+    for k, i in enumerate(rebalance_rows):
+        tradable = ~np.isnan(prices[i])
+        equity = cash + position @ marks[i]
+
+        price = np.where(tradable, prices[i], 1.0)
+        target = np.trunc(weights[i] * equity / (price * (1 + slippage_pct))).astype(np.int64)
+        delta = np.where(tradable, target - position, 0)
+
+        # SELL first to free cash
+        sells = np.minimum(delta, 0)
+        revenue = -sells * price * (1 - slippage_pct)
+        cash += revenue.sum() - (revenue * transaction_cost_pct).sum()
+
+        # BUY, scaled down to the cash available
+        buys = np.maximum(delta, 0)
+        buy_price = price * (1 + slippage_pct) * (1 + transaction_cost_pct)
+        needed = buys @ buy_price
+        if needed > cash:
+            buys = np.floor(buys * (max(cash, 0.0) / needed)).astype(np.int64)
+        cost = buys * price * (1 + slippage_pct)
+        cash -= cost.sum() + (cost * transaction_cost_pct).sum()
+
+        position = position + sells + buys
+        cash_values[k] = cash
+        position_values[k] = position
+
+    return rebalance_rows, cash_values, position_values
@@ -0,0 +1,149 @@
+import json
+import socket
+import threading
+
+import pandas as pd
+
+# Bar sources for `Backtester.stream`. Each source is an iterable of
+# (date, bar) pairs, where bar is a dict with lowercase OHLCV keys, and only
+# keeps one chunk of rows in memory at a time.
+
+
+def _frame_bars(df):
+    """
+    Yield (date, bar) pairs from a DataFrame chunk.
+    """
+    columns = [str(column).lower() for column in df.columns]
+    values = [df[column].tolist() for column in df.columns]
+    for date, row in zip(df.index, zip(*values)):
+        yield date, dict(zip(columns, row))
+
+
+class DataFrameSource:
+    """
+    Replay the rows of an in-memory DataFrame.
+    """
+
+    def __init__(self, df, chunksize=10_000):
+        self.df = df
+        self.chunksize = chunksize
+
+    def __iter__(self):
+        for start in range(0, len(self.df), self.chunksize):
+            yield from _frame_bars(self.df.iloc[start:start + self.chunksize])
+
+
+class CSVSource:
+    """
+    Read a date-indexed OHLCV CSV file in chunks, so files larger than
+    memory can be streamed.
+    """
+
+    def __init__(self, path, chunksize=10_000):
+        self.path = path
+        self.chunksize = chunksize
+
+    def __iter__(self):
+        with pd.read_csv(self.path, index_col=0, parse_dates=True, chunksize=self.chunksize) as reader:
+            for chunk in reader:
+                yield from _frame_bars(chunk)
+
+
+class ParquetSource:
+    """
+    Read a Parquet file one row group at a time. Requires pyarrow.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("ParquetSource requires pyarrow (pip install pyarrow).") from exc
+
+        parquet_file = pq.ParquetFile(self.path)
+        for i in range(parquet_file.num_row_groups):
+            # to_pandas restores the date index saved by DataFrame.to_parquet
+            yield from _frame_bars(parquet_file.read_row_group(i).to_pandas())
+
+
+class SocketSource:
+    """
+    Read bars sent as JSON lines over TCP, e.g. by `ReplayServer` or a live feed.
+
+    Each line is a JSON object with a 'date' field and the bar values.
+    The stream ends when the sender closes the connection.
+    """
+
+    def __init__(self, host='127.0.0.1', port=9999, timeout=10.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def __iter__(self):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as conn:
+            with conn.makefile('r', encoding='utf-8') as lines:
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    bar = json.loads(line)
+                    yield pd.Timestamp(bar.pop('date')), bar
+
+
+class ReplayServer:
+    """
+    Local stand-in for a market data feed: serves the bars of a source as
+    JSON lines to the first client that connects, then closes.
+    """
+
+    def __init__(self, source, host='127.0.0.1', port=0):
+        """
+        Args:
+            source (iterable): (date, bar) pairs, e.g. a DataFrameSource.
+            host (str): Interface to listen on.
+            port (int): Port to listen on (0 picks a free port, see `self.port`).
+        """
+        self.source = source
+        self._server = socket.create_server((host, port))
+        self.host, self.port = self._server.getsockname()[:2]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._server.close()
+        self._thread.join(timeout=1.0)
+
+    def _serve(self):
+        try:
+            conn, _ = self._server.accept()
+        except OSError:
+            return  # closed before a client connected
+        with conn, conn.makefile('w', encoding='utf-8') as out:
+            try:
+                for date, bar in self.source:
+                    out.write(json.dumps({'date': pd.Timestamp(date).isoformat(), **bar}) + '\n')
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client stopped reading
+
+
+if __name__ == "__main__":
+    # Test: replay a cached ticker over a local socket into a streaming backtest
+    from .backtester import Backtester
+    from .data_loader import DataLoader
+    from .strategies import MACrossoverStrategy
+
+    loader = DataLoader()
+    data = loader.fetch_data('SPY', '2015-01-01', '2024-01-01')
+    if data is not None:
+        data = loader.clean_data(data)
+        server = ReplayServer(DataFrameSource(data)).start()
+        record = None
+        for record in Backtester().stream(SocketSource(port=server.port), MACrossoverStrategy()):
+            pass
+        server.close()
+        print(record)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# Compact mode stores prices and features as float32 (about 7 significant
+# digits) while backtests keep their cash arithmetic in float64. Rule-based
+# strategies then stay within this relative tolerance of a float64 run (about
+# 2e-7 on 24 years of daily bars), unless a signal flips on an exact near-tie.
+# Float32 features alone do not change MLStrategy at all (sklearn casts its
+# inputs to float32), but training on float32 *prices* can move tree splits,
+# so ML results are not held to this tolerance.
+BACKTEST_RTOL = 1e-6
+
+
+def downcast_ohlcv(df):
+    """
+    Store prices as float32 and whole-number volume as the smallest integer
+    type that holds it. Other columns are left unchanged.
+
+    Args:
+        df (pd.DataFrame): OHLCV data with lowercase column names.
+
+    Returns:
+        pd.DataFrame: Downcast frame; columns that keep their dtype are not copied.
+    """
+    dtypes = {}
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if name == 'volume' and values.dtype.kind in 'iuf':
+            if values.dtype.kind == 'f' and not (np.isfinite(values).all() and (values == np.round(values)).all()):
+                continue
+            dtypes[name] = np.int32 if len(values) == 0 or values.max() < 2**31 else np.int64
+        elif values.dtype == np.float64:
+            dtypes[name] = np.float32
+    return df.astype(dtypes) if dtypes else df
+
+
+def memory_report(df, label):
+    """
+    Print the memory used by `df` and what float64/int64 columns would have used.
+
+    Returns:
+        dict: 'bytes', 'wide_bytes' and 'saved_bytes'.
+    """
+    used = int(df.memory_usage(index=False).sum())
+    wide = used + sum(
+        len(df) * (8 - df[name].dtype.itemsize)
+        for name in df.columns if df[name].dtype.kind in 'iuf'
+    )
+    saved = wide - used
+    print(f"{label}: {_format_bytes(used)} ({_format_bytes(saved)} saved vs 64-bit columns)")
+    return {'bytes': used, 'wide_bytes': wide, 'saved_bytes': saved}
+
+
+def _format_bytes(n_bytes):
+    if n_bytes < 1024 ** 2:
+        return f"{n_bytes / 1024:.1f} KB"
+    return f"{n_bytes / 1024 ** 2:.1f} MB"
+
+
+def drop_warmup(df):
+    """
+    Drop rows with missing values, without copying when they are all at the start.
+
+    Indicator warm-up leaves NaN only in the first rows, so the result is
+    usually a slice (a view) of `df` instead of the full copy `dropna()` makes.
+
+    Returns:
+        pd.DataFrame: Same rows as `df.dropna()`.
+    """
+    valid = df.notna().all(axis=1).to_numpy()
+    first = int(valid.argmax()) if valid.any() else len(df)
+    if valid[first:].all():
+        return df.iloc[first:]
+    return df.dropna()
@@ -1,60 +1,236 @@
-import yfinance as yf
+import contextvars
 import pandas as pd
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .compact import downcast_ohlcv, memory_report
+from .frequency import BarFrequency, resample_ohlcv
+from .profiling import profiled
+from .providers import RateLimiter, YahooProvider
+from .storage import ColumnarStore
+from .validation import summarize, validate_ohlcv
 
 class DataLoader:
-    def __init__(self, data_dir='data'):
+    def __init__(self, data_dir='data', provider=None, max_retries=3, backoff=1.0, frequency='1d', base_interval=None, compact=False, validate=True, outliers='flag', timezone='America/New_York'):
         """
         Initialize the DataLoader.
         
         Args:
             data_dir (str): Directory where data will be saved/loaded.
+            provider (object, optional): Market data source with a
+                `download(ticker, start_date, end_date)` method and an optional
+                `rate_limit` (requests per second). Defaults to Yahoo Finance.
+            max_retries (int): Retries for a failing download.
+            backoff (float): Initial retry delay in seconds, doubled on each retry.
+            frequency (str): Bar size returned by default, e.g. '1d', '1h', '5m'.
+            base_interval (str, optional): Finer bar size to download and store
+                (e.g. '1m'); bars are resampled to `frequency` on load.
+                Defaults to `frequency`.
+            compact (bool): Make `clean_data` store prices as float32 and
+                volume as integers.
+            validate (bool): Check and repair bars in `clean_data` (see
+                `validation.validate_ohlcv`).
+            outliers (str): What validation does with bad ticks: 'flag',
+                'fill' or 'drop'.
+            timezone (str): Exchange timezone; timezone-aware provider data
+                is stored and returned as naive wall-clock time in it.
         """
         self.data_dir = data_dir
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
+        self.provider = provider or YahooProvider()
+        self.store = ColumnarStore(os.path.join(data_dir, 'store'), timezone=timezone)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.frequency = BarFrequency(frequency)
+        self.base_interval = base_interval
+        self.compact = compact
+        self.validate = validate
+        self.outliers = outliers
+        self.last_report = None
+        
+        rate_limit = getattr(self.provider, 'rate_limit', None)
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit else None
 
-    def fetch_data(self, ticker, start_date, end_date):
+    @profiled('DataLoader.fetch_data')
+    def fetch_data(self, ticker, start_date, end_date, frequency=None):
         """
-        Fetch historical data from Yahoo Finance.
+        Fetch historical data, downloading only the dates not stored locally.
         
         Args:
             ticker (str): Stock ticker symbol (e.g., 'SPY').
-            start_date (str): Start date in 'YYYY-MM-DD' format.
-            end_date (str): End date in 'YYYY-MM-DD' format.
+            start_date (str or pd.Timestamp): Start, e.g. 'YYYY-MM-DD' or
+                'YYYY-MM-DD HH:MM' for intraday bars.
+            end_date (str or pd.Timestamp): Exclusive end.
+            frequency (str, optional): Bar size; defaults to the loader's.
             
         Returns:
-            pd.DataFrame: DataFrame with OHLCV data.
+            pd.DataFrame: DataFrame with OHLCV data. Bars at the base interval
+                are backed by read-only memory maps (call `.copy()` before
+                editing values in place).
         """
-        file_path = os.path.join(self.data_dir, f"{ticker}_{start_date}_{end_date}.csv")
+        frequency, base = self._intervals(frequency)
+        key = self._store_key(ticker, base)
+        missing = self.store.missing_ranges(key, start_date, end_date)
         
         # Check if data already exists locally
-        if os.path.exists(file_path):
+        if not missing:
             print(f"Loading data for {ticker} from local storage...")
-            df = pd.read_csv(file_path, index_col=0, parse_dates=True)
-        else:
-            print(f"Downloading data for {ticker} from Yahoo Finance...")
-            df = yf.download(ticker, start=start_date, end=end_date, progress=False, auto_adjust=True)
-            if df.empty:
-                print(f"No data found for {ticker}.")
-                return None
+        
+        for gap_start, gap_end in missing:
+            print(f"Downloading data for {ticker} from {gap_start.date()} to {gap_end.date()}...")
+            self._download_gap(ticker, gap_start, gap_end, base)
             
-            # Reset index to insure it is datetime
-            df.index = pd.to_datetime(df.index)
+        df = self._load(ticker, start_date, end_date, frequency, base)
+        if df is None or df.empty:
+            print(f"No data found for {ticker}.")
+            return None
+            
+        return df
 
-            # Flatten MultiIndex columns if present (e.g. ('Close', 'SPY') -> 'Close')
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
+    @profiled('DataLoader.fetch_many')
+    def fetch_many(self, tickers, start_date, end_date, max_workers=8, as_panel=False, frequency=None):
+        """
+        Fetch several tickers, downloading the missing ones concurrently.
+        
+        The local store is checked for all tickers first; only tickers with
+        missing date gaps are sent to a bounded thread pool. Downloads share
+        the provider's rate limit and are retried with exponential backoff.
+        
+        Args:
+            tickers (list): Stock ticker symbols.
+            start_date (str): Start date in 'YYYY-MM-DD' format.
+            end_date (str): End date in 'YYYY-MM-DD' format.
+            max_workers (int): Maximum concurrent downloads.
+            as_panel (bool): Return one DataFrame with (ticker, field) columns
+                aligned on the union of dates instead of a dict.
+            frequency (str, optional): Bar size; defaults to the loader's.
+            
+        Returns:
+            dict or pd.DataFrame: Data per ticker. Tickers without data are omitted.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        frequency, base = self._intervals(frequency)
+        missing = {
+            ticker: self.store.missing_ranges(self._store_key(ticker, base), start_date, end_date)
+            for ticker in tickers
+        }
+        to_download = [ticker for ticker in tickers if missing[ticker]]
+        
+        failed = []
+        if to_download:
+            print(f"Downloading {len(to_download)} of {len(tickers)} tickers...")
             
-            # Save to CSV
-            df.to_csv(file_path)
-            print(f"Data saved to {file_path}")
+            def download(ticker):
+                for gap_start, gap_end in missing[ticker]:
+                    self._download_gap(ticker, gap_start, gap_end, base)
             
-        return df
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Each download runs in a copy of this context, so it is traced
+                # by the caller's profiler
+                futures = {ticker: executor.submit(contextvars.copy_context().run, download, ticker) for ticker in to_download}
+            for ticker, future in futures.items():
+                if future.exception() is not None:
+                    print(f"Failed to download {ticker}: {future.exception()}")
+                    failed.append(ticker)
+        
+        frames = {}
+        for ticker in tickers:
+            df = self._load(ticker, start_date, end_date, frequency, base)
+            if df is not None and not df.empty:
+                frames[ticker] = df
+        print(f"Loaded {len(frames)} of {len(tickers)} tickers ({len(failed)} failed).")
+        
+        if as_panel:
+            if not frames:
+                return pd.DataFrame()
+            return pd.concat(frames, axis=1)
+        return frames
 
+    def _intervals(self, frequency):
+        """
+        Requested bar frequency and the base interval stored on disk.
+        """
+        frequency = BarFrequency(frequency) if frequency is not None else self.frequency
+        base = BarFrequency(self.base_interval) if self.base_interval else frequency
+        if base.periods_per_year < frequency.periods_per_year:
+            raise ValueError(f"Cannot build {frequency.interval} bars from coarser {base.interval} bars.")
+        return frequency, base
+
+    @staticmethod
+    def _store_key(ticker, base):
+        # Daily bars keep the plain ticker name used by existing stores
+        return ticker if base.interval == '1d' else f"{ticker}@{base.interval}"
+
+    def _load(self, ticker, start_date, end_date, frequency, base):
+        """
+        Load stored base bars and resample them to `frequency` if needed.
+        """
+        df = self.store.load(self._store_key(ticker, base), start_date, end_date)
+        if df is None or df.empty or frequency == base:
+            return df
+        return resample_ohlcv(df, frequency)
+
+    @profiled('DataLoader.download')
+    def _download_gap(self, ticker, gap_start, gap_end, base=None):
+        """
+        Download one missing date range into the store, with rate limiting and retries.
+        """
+        base = base or self.frequency
+        # Providers take whole days; a partial last day is requested in full
+        start_day = str(gap_start.date())
+        end_day = str(gap_end.ceil('D').date())
+        kwargs = {} if base.interval == '1d' else {'interval': base.interval}
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait()
+            try:
+                df = self.provider.download(ticker, start_day, end_day, **kwargs)
+                break
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+        
+        # Providers raise on failures, so an empty frame means the range has no
+        # bars (e.g. only holidays) and is recorded as covered like any other.
+        # Never mark today or future dates as covered: their bars are not final yet
+        covered_end = min(gap_end, pd.Timestamp.today().normalize())
+        self.store.write(self._store_key(ticker, base), df, gap_start, max(covered_end, gap_start))
+
+    def import_csv_cache(self, remove=False):
+        """
+        Import the legacy `{ticker}_{start}_{end}.csv` cache files into the store.
+        
+        Args:
+            remove (bool): Delete each CSV file after it has been imported.
+            
+        Returns:
+            list: Tickers that were imported.
+        """
+        pattern = re.compile(r'^(?P<ticker>.+)_(?P<start>\d{4}-\d{2}-\d{2})_(?P<end>\d{4}-\d{2}-\d{2})\.csv$')
+        imported = []
+        for file_name in sorted(os.listdir(self.data_dir)):
+            match = pattern.match(file_name)
+            if match is None:
+                continue
+            file_path = os.path.join(self.data_dir, file_name)
+            df = pd.read_csv(file_path, index_col=0, parse_dates=True)
+            self.store.write(match['ticker'], df, match['start'], match['end'])
+            imported.append(match['ticker'])
+            print(f"Imported {file_path}")
+            if remove:
+                os.remove(file_path)
+        return imported
+
+    @profiled('DataLoader.clean_data')
     def clean_data(self, df):
         """
-        Perform basic data cleaning.
+        Perform basic data cleaning and validation.
+        
+        The validation report is kept in `last_report`.
         
         Args:
             df (pd.DataFrame): Raw DataFrame.
@@ -71,6 +247,15 @@ class DataLoader:
         # We will standardize column names to lowercase for consistency
         df.columns = [c.lower() for c in df.columns]
         
+        if self.validate and isinstance(df.index, pd.DatetimeIndex):
+            df, self.last_report = validate_ohlcv(df, outliers=self.outliers)
+            issues = summarize(self.last_report)
+            if issues != 'no issues':
+                print(f"Validation: {issues}")
+        
+        if self.compact:
+            df = downcast_ohlcv(df)
+            memory_report(df, "Compact OHLCV")
         return df
 
 if __name__ == "__main__":
@@ -1,46 +1,117 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 
 class Evaluator:
-    def __init__(self, portfolio_data):
+    def __init__(self, portfolio_data, periods_per_year=None):
         """
         Initialize Evaluator.
         
         Args:
             portfolio_data (pd.DataFrame): DataFrame from Backtester with 'Portfolio Value'.
+            periods_per_year (float, optional): Bars per year for annualization.
+                Defaults to the value the Backtester stored in
+                `portfolio_data.attrs`, or 252 (daily bars).
         """
         self.data = portfolio_data
+        if periods_per_year is None:
+            periods_per_year = portfolio_data.attrs.get('periods_per_year', 252)
+        self.periods_per_year = periods_per_year
         
     def calculate_metrics(self):
         """
         Calculate performance metrics.
         
         Returns:
-            dict: Metrics dictionary.
+            dict: Metrics dictionary (see `calculate_batch_metrics`).
         """
-        # Daily Returns using 'Portfolio Value' instead of 'close' of the stock
-        returns = self.data['Portfolio Value'].pct_change().dropna()
-        
-        if returns.empty:
+        if len(self.data) < 2:
             return {}
         
-        # Cumulative Return
-        total_return = (self.data['Portfolio Value'].iloc[-1] / self.data['Portfolio Value'].iloc[0]) - 1
+        # Cash and Position columns from the Backtester give turnover and trade count
+        cash = self.data['Cash'].to_numpy() if 'Cash' in self.data else None
+        positions = self.data['Position'].to_numpy() if 'Position' in self.data else None
+        
+        metrics = self.calculate_batch_metrics(
+            self.data['Portfolio Value'].to_numpy(), cash=cash, positions=positions,
+            periods_per_year=self.periods_per_year,
+        )
+        return metrics.iloc[0].to_dict()
+
+    @staticmethod
+    def calculate_batch_metrics(equity, cash=None, positions=None, periods_per_year=252, chunk_size=1024):
+        """
+        Calculate performance metrics for many equity curves in one vectorized pass.
+        
+        Curves are processed in chunks of columns so temporary arrays stay
+        bounded at (bars x chunk_size) regardless of the number of runs.
         
-        # Sharpe Ratio (Annualized, assuming risk-free rate = 0)
-        sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252)
+        Metrics (returns are per-bar percentage changes of the equity curve):
+            Cumulative Return: Final / initial value - 1.
+            Sharpe Ratio: Mean / std of returns, annualized (risk-free rate = 0).
+            Max Drawdown: Largest peak-to-trough fall of the equity curve.
+            CAGR: Compound annual growth rate.
+            Volatility: Annualized standard deviation of returns.
+            Sortino Ratio: Mean return / downside deviation, annualized.
+            Calmar Ratio: CAGR / |Max Drawdown|.
+            Turnover: Annualized traded cash flow / average equity (needs `cash`).
+            Trade Count: Bars on which the position changed (needs `positions`).
+        
+        Args:
+            equity (np.ndarray or pd.DataFrame): Equity curves, one column per run.
+            cash (np.ndarray or pd.DataFrame, optional): Cash balances, same shape.
+            positions (np.ndarray or pd.DataFrame, optional): Positions, same shape.
+            periods_per_year (int): Bars per year used for annualization.
+            chunk_size (int): Number of runs processed at a time.
+            
+        Returns:
+            pd.DataFrame: One row of metrics per run.
+        """
+        labels = equity.columns if isinstance(equity, pd.DataFrame) else None
+        equity = _as_2d(equity)
+        cash = None if cash is None else _as_2d(cash)
+        positions = None if positions is None else _as_2d(positions)
+        n_bars, n_runs = equity.shape
         
-        # Max Drawdown
-        rolling_max = self.data['Portfolio Value'].cummax()
-        drawdown = (self.data['Portfolio Value'] - rolling_max) / rolling_max
-        max_drawdown = drawdown.min()
+        columns = ['Cumulative Return', 'Sharpe Ratio', 'Max Drawdown', 'CAGR', 'Volatility',
+                   'Sortino Ratio', 'Calmar Ratio', 'Turnover', 'Trade Count']
+        out = np.full((n_runs, len(columns)), np.nan)
+        years = (n_bars - 1) / periods_per_year
+        if n_bars < 2:
+            return pd.DataFrame(out, index=labels, columns=columns)
         
-        return {
-            "Cumulative Return": total_return,
-            "Sharpe Ratio": sharpe_ratio,
-            "Max Drawdown": max_drawdown
-        }
+        for lo in range(0, n_runs, chunk_size):
+            hi = min(lo + chunk_size, n_runs)
+            values = equity[:, lo:hi]
+            returns = values[1:] / values[:-1] - 1
+            
+            with np.errstate(divide='ignore', invalid='ignore'):
+                total_return = values[-1] / values[0] - 1
+                mean = returns.mean(axis=0)
+                std = returns.std(axis=0, ddof=1)
+                downside = np.sqrt((np.minimum(returns, 0.0) ** 2).mean(axis=0))
+                
+                rolling_max = np.maximum.accumulate(values, axis=0)
+                max_drawdown = ((values - rolling_max) / rolling_max).min(axis=0)
+                
+                cagr = (values[-1] / values[0]) ** (1 / years) - 1
+                
+                out[lo:hi, 0] = total_return
+                out[lo:hi, 1] = mean / std * np.sqrt(periods_per_year)
+                out[lo:hi, 2] = max_drawdown
+                out[lo:hi, 3] = cagr
+                out[lo:hi, 4] = std * np.sqrt(periods_per_year)
+                out[lo:hi, 5] = mean / downside * np.sqrt(periods_per_year)
+                out[lo:hi, 6] = np.where(max_drawdown < 0, cagr / np.abs(max_drawdown), np.nan)
+                
+                if cash is not None:
+                    traded = np.abs(np.diff(cash[:, lo:hi], axis=0)).sum(axis=0)
+                    out[lo:hi, 7] = traded / values.mean(axis=0) / years
+            
+            if positions is not None:
+                held = positions[:, lo:hi]
+                out[lo:hi, 8] = (held[0] != 0) + (np.diff(held, axis=0) != 0).sum(axis=0)
+        
+        return pd.DataFrame(out, index=labels, columns=columns)
 
     def plot_equity_curve(self, benchmark_data=None, save_path=None):
         """
@@ -50,6 +121,9 @@ class Evaluator:
             benchmark_data (pd.DataFrame, optional): Benchmark OHLCV data.
             save_path (str, optional): Path to save the plot.
         """
+        # Loaded only when a plot is requested
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(12, 6))
         plt.plot(self.data.index, self.data['Portfolio Value'], label='Strategy')
         
@@ -79,5 +153,124 @@ class Evaluator:
         else:
             plt.show()
 
+class OnlineEvaluator:
+    def __init__(self, periods_per_year=252):
+        """
+        Initialize the OnlineEvaluator.
+        
+        Keeps running statistics so every bar costs O(1) and a snapshot of the
+        metrics can be taken at any time without rescanning the history:
+        Welford mean/variance of returns, downside sum of squares, running
+        peak and max drawdown, and traded cash flow / position changes.
+        Snapshots match `Evaluator.calculate_metrics` on the same history.
+        
+        Args:
+            periods_per_year (int): Bars per year used for annualization.
+        """
+        self.periods_per_year = periods_per_year
+        self.reset()
+    
+    def reset(self):
+        """
+        Forget all bars seen so far.
+        """
+        self.n = 0
+        self.first_value = None
+        self.last_value = None
+        self.value_sum = 0.0
+        # Welford accumulators over returns
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.downside_sq = 0.0
+        self.peak = -np.inf
+        self.max_drawdown = 0.0
+        self.last_cash = None
+        self.traded = 0.0
+        self.has_cash = False
+        self.last_position = 0
+        self.trades = 0
+        self.has_position = False
+    
+    def update(self, value, cash=None, position=None):
+        """
+        Add one marked-to-market bar.
+        
+        Args:
+            value (float): Portfolio value.
+            cash (float, optional): Cash balance, for turnover.
+            position (float, optional): Position, for the trade count.
+        """
+        # NumPy scalars, so a zero value or peak gives inf/NaN like the batch metrics
+        value = np.float64(value)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.n == 0:
+                self.first_value = value
+            else:
+                ret = value / self.last_value - 1
+                k = self.n  # returns seen including this one
+                # Welford's step would turn an infinite mean into NaN; a plain
+                # average keeps it infinite (the variance is already NaN)
+                if not (np.isinf(self.mean) and np.isfinite(ret)):
+                    delta = ret - self.mean
+                    self.mean += delta / k
+                    self.m2 += delta * (ret - self.mean)
+                self.downside_sq += np.minimum(ret, 0.0) ** 2
+            
+            self.peak = max(self.peak, value)
+            self.max_drawdown = np.minimum(self.max_drawdown, (value - self.peak) / self.peak)
+        self.value_sum += value
+        self.last_value = value
+        
+        if cash is not None:
+            if self.last_cash is not None:
+                self.traded += abs(cash - self.last_cash)
+            self.last_cash = float(cash)
+            self.has_cash = True
+        if position is not None:
+            if position != self.last_position:
+                self.trades += 1
+            self.last_position = position
+            self.has_position = True
+        
+        self.n += 1
+    
+    def snapshot(self):
+        """
+        Metrics of the bars seen so far.
+        
+        Returns:
+            dict: Same keys as `Evaluator.calculate_metrics`.
+        """
+        if self.n < 2:
+            return {}
+        
+        n_returns = self.n - 1
+        ppy = self.periods_per_year
+        years = n_returns / ppy
+        std = np.sqrt(self.m2 / (n_returns - 1)) if n_returns > 1 else np.nan
+        downside = np.sqrt(self.downside_sq / n_returns)
+        
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            growth = self.last_value / self.first_value
+            cagr = growth ** (1 / years) - 1
+            return {
+                'Cumulative Return': float(growth - 1),
+                'Sharpe Ratio': float(np.float64(self.mean) / std * np.sqrt(ppy)),
+                'Max Drawdown': float(self.max_drawdown),
+                'CAGR': float(cagr),
+                'Volatility': float(std * np.sqrt(ppy)),
+                'Sortino Ratio': float(np.float64(self.mean) / downside * np.sqrt(ppy)),
+                'Calmar Ratio': float(cagr / abs(self.max_drawdown)) if self.max_drawdown < 0 else np.nan,
+                'Turnover': float(self.traded / (self.value_sum / self.n) / years) if self.has_cash else np.nan,
+                'Trade Count': float(self.trades) if self.has_position else np.nan,
+            }
+
+def _as_2d(values):
+    """
+    Float array with one column per run.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
 if __name__ == "__main__":
     pass
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .features import StreamingFeatureEngineer
+from .profiling import profiled
+
+
+class FeatureStore:
+    def __init__(self, cache_dir='data/features', max_bytes=512 * 1024 ** 2, max_entries=64):
+        """
+        Initialize the FeatureStore.
+
+        Feature columns are cached on disk under a key made of the input data
+        fingerprint and the FeatureEngineer configuration. Entries are evicted
+        least recently used first once the size or entry limit is exceeded.
+
+        Args:
+            cache_dir (str): Directory for the cached feature matrices.
+            max_bytes (int): Maximum total size of the cached matrices.
+            max_entries (int): Maximum number of cached entries.
+        """
+        self.cache_dir = cache_dir
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.index = self._read_index()
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self.evictions = 0
+
+    @profiled('FeatureStore.get_or_compute')
+    def get_or_compute(self, df, feature_engineer):
+        """
+        Return `feature_engineer.add_features(df)`, using the cache when possible.
+
+        Exact matches are served from disk. If only new rows were appended to a
+        cached input (and the 'ta' indicators are used), the cached columns are
+        extended bar by bar from the saved streaming state instead of being
+        recomputed over the whole history.
+
+        Args:
+            df (pd.DataFrame): Input OHLCV DataFrame with 'close' column.
+            feature_engineer (FeatureEngineer): Indicator configuration to apply.
+
+        Returns:
+            pd.DataFrame: DataFrame with added features.
+        """
+        config_key = _config_key(feature_engineer)
+        data_hash = fingerprint(df)
+        key = f'{config_key}_{data_hash}'
+
+        if key in self.index:
+            self.hits += 1
+            features = self._load(key)
+            self._touch(key)
+            return pd.concat([df, features.set_axis(df.index)], axis=1)
+
+        # Streaming state uses bar-count windows, so only daily ta features extend incrementally
+        streamable = feature_engineer.use_ta_lib and feature_engineer.frequency.interval == '1d'
+        prefix_key = self._find_prefix(df, config_key) if streamable else None
+        if prefix_key is not None:
+            self.extensions += 1
+            cached = self._load(prefix_key)
+            engine = StreamingFeatureEngineer()
+            engine.set_state(self.index[prefix_key]['state'])
+            new_rows = df.iloc[len(cached):]
+            extension = engine.warm_up(new_rows)[cached.columns].astype(feature_engineer.dtype)
+            features = pd.concat([cached, extension.set_axis(new_rows.index)])
+            features = features.set_axis(df.index)
+            state = engine.get_state()
+            # The extended entry supersedes the prefix it was built from
+            self._remove(prefix_key)
+        else:
+            self.misses += 1
+            result = feature_engineer.add_features(df)
+            features = result[[c for c in result.columns if c not in df.columns]]
+            state = None
+            if streamable:
+                engine = StreamingFeatureEngineer.from_history(df, sma_windows=feature_engineer.sma_windows)
+                state = engine.get_state()
+
+        self._save(key, config_key, df, features, state, feature_engineer.dtype)
+        return pd.concat([df, features], axis=1)
+
+    def stats(self):
+        """
+        Cache statistics.
+
+        Returns:
+            dict: Hits, misses, incremental extensions, evictions, hit rate,
+                number of entries and bytes on disk.
+        """
+        lookups = self.hits + self.misses + self.extensions
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'extensions': self.extensions,
+            'evictions': self.evictions,
+            'hit_rate': (self.hits + self.extensions) / lookups if lookups else 0.0,
+            'entries': len(self.index),
+            'bytes': sum(entry['bytes'] for entry in self.index.values()),
+        }
+
+    def clear(self):
+        """
+        Remove every cached entry.
+        """
+        for key in list(self.index):
+            self._remove(key)
+        self._write_index()
+
+    def _find_prefix(self, df, config_key):
+        """
+        Find a cached entry whose input is a strict prefix of `df`.
+        """
+        candidates = sorted(
+            (entry['n_rows'], key) for key, entry in self.index.items()
+            if entry['config_key'] == config_key
+            and entry['state'] is not None
+            and entry['n_rows'] < len(df)
+            and entry['columns_in'] == [str(c) for c in df.columns]
+        )
+        index_values = df.index.as_unit('ns').asi8 if isinstance(df.index, pd.DatetimeIndex) else None
+        # Prefer the longest prefix, so the fewest rows need extending
+        for n_rows, key in reversed(candidates):
+            entry = self.index[key]
+            if index_values is not None and index_values[n_rows - 1] != entry['last_ts']:
+                continue
+            if fingerprint(df.iloc[:n_rows]) == entry['data_hash']:
+                return key
+        return None
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.npy')
+
+    def _load(self, key):
+        entry = self.index[key]
+        values = np.load(self._path(key))
+        return pd.DataFrame(values, columns=entry['columns'])
+
+    def _save(self, key, config_key, df, features, state, dtype=np.float64):
+        values = features.to_numpy(dtype=dtype)
+        np.save(self._path(key), values)
+        self.index[key] = {
+            'config_key': config_key,
+            'data_hash': key.split('_', 1)[1],
+            'n_rows': len(df),
+            'last_ts': int(df.index.as_unit('ns').asi8[-1]) if isinstance(df.index, pd.DatetimeIndex) and len(df) else None,
+            'columns_in': [str(c) for c in df.columns],
+            'columns': [str(c) for c in features.columns],
+            'bytes': values.nbytes,
+            'last_access': time.time(),
+            'state': state,
+        }
+        self._evict()
+        self._write_index()
+
+    def _touch(self, key):
+        self.index[key]['last_access'] = time.time()
+        self._write_index()
+
+    def _remove(self, key):
+        entry = self.index.pop(key, None)
+        if entry is not None and os.path.exists(self._path(key)):
+            os.remove(self._path(key))
+
+    def _evict(self):
+        total = sum(entry['bytes'] for entry in self.index.values())
+        by_age = sorted(self.index, key=lambda k: self.index[k]['last_access'])
+        while by_age and (total > self.max_bytes or len(self.index) > self.max_entries):
+            key = by_age.pop(0)
+            total -= self.index[key]['bytes']
+            self._remove(key)
+            self.evictions += 1
+
+    def _read_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path) as f:
+            index = json.load(f)
+        # Drop entries whose matrix file has gone missing
+        return {key: entry for key, entry in index.items() if os.path.exists(self._path(key))}
+
+    def _write_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+
+def fingerprint(df):
+    """
+    Hash the index, column names and values of a DataFrame.
+
+    Args:
+        df (pd.DataFrame): Input data.
+
+    Returns:
+        str: Hex digest identifying the data.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(df.index, pd.DatetimeIndex):
+        h.update(np.ascontiguousarray(df.index.as_unit('ns').asi8))
+    else:
+        h.update(pd.util.hash_array(np.asarray(df.index)))
+    for name in df.columns:
+        h.update(str(name).encode())
+        values = df[name].to_numpy()
+        if values.dtype.kind in 'biuf':
+            h.update(np.ascontiguousarray(values))
+        else:
+            h.update(pd.util.hash_array(values))
+    return h.hexdigest()
+
+
+def _config_key(feature_engineer):
+    config = {'use_ta_lib': feature_engineer.use_ta_lib, 'sma_windows': list(feature_engineer.sma_windows)}
+    # Default (daily, float64) keys are unchanged so existing caches stay valid
+    if feature_engineer.frequency.interval != '1d':
+        config['frequency'] = feature_engineer.frequency.interval
+    if feature_engineer.compact:
+        config['compact'] = True
+    return hashlib.blake2b(json.dumps(config, sort_keys=True).encode(), digest_size=8).hexdigest()
@@ -1,19 +1,36 @@
+import json
+from collections import deque
+
 import pandas as pd
 import numpy as np
-from ta.trend import SMAIndicator, MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands
+
+from .compact import memory_report
+from .frequency import BarFrequency
+from .indicators import LEGACY_NAMES, IndicatorSpec, indicator_frame
+from .profiling import profiled
 
 class FeatureEngineer:
-    def __init__(self, use_ta_lib=True):
+    def __init__(self, use_ta_lib=True, sma_windows=(50, 200), frequency='1d', compact=False):
         """
         Initialize FeatureEngineer.
         
         Args:
             use_ta_lib (bool): Whether to use the 'ta' library or manual implementation.
+            sma_windows (iterable of int): Windows for the 'SMA_{window}' columns.
+            frequency (str or BarFrequency): Bar size of the input. Windows are
+                given in trading days and converted to bars, so 'SMA_50' on
+                5-minute bars averages 50 days of bars.
+            compact (bool): Store features as float32 and add them to a
+                shallow copy of the input instead of a full copy (see
+                `compact.BACKTEST_RTOL` for the accuracy trade-off).
         """
         self.use_ta_lib = use_ta_lib
+        self.sma_windows = tuple(sma_windows)
+        self.frequency = BarFrequency(frequency)
+        self.compact = compact
+        self.dtype = np.float32 if compact else np.float64
 
+    @profiled('FeatureEngineer.add_features')
     def add_features(self, df):
         """
         Add technical indicators to the DataFrame.
@@ -24,52 +41,346 @@ class FeatureEngineer:
         Returns:
             pd.DataFrame: DataFrame with added features.
         """
-        df = df.copy()
+        # A shallow copy only shares the input columns, which are never written
+        df = df.copy(deep=not self.compact)
+        # Day counts -> bar counts (identity for daily bars)
+        bars = self.frequency.bars
+        # Each feature is cast as it is added (a lazy no-op for float64), so compact
+        # mode never holds float64 copies of the feature columns
+        dtype = self.dtype
         
         if self.use_ta_lib:
+            # Imported on first use: 'ta' is only needed for this path
+            from ta.momentum import RSIIndicator
+            from ta.trend import MACD, SMAIndicator
+
             # Simple Moving Averages
-            df['SMA_50'] = SMAIndicator(close=df['close'], window=50).sma_indicator()
-            df['SMA_200'] = SMAIndicator(close=df['close'], window=200).sma_indicator()
+            for window in self.sma_windows:
+                df[f'SMA_{window}'] = SMAIndicator(close=df['close'], window=bars(window)).sma_indicator().astype(dtype)
             
             # RSI
-            df['RSI'] = RSIIndicator(close=df['close'], window=14).rsi()
+            df['RSI'] = RSIIndicator(close=df['close'], window=bars(14)).rsi().astype(dtype)
             
             # MACD
-            macd = MACD(close=df['close'])
-            df['MACD'] = macd.macd()
-            df['MACD_Signal'] = macd.macd_signal()
-            df['MACD_Diff'] = macd.macd_diff()
-            
-            # Rolling Volatility (Standard Deviation of log returns for 20 days)
-            df['Log_Return'] = np.log(df['close'] / df['close'].shift(1))
-            df['Volatility_20'] = df['Log_Return'].rolling(window=20).std()
+            macd = MACD(close=df['close'], window_slow=bars(26), window_fast=bars(12), window_sign=bars(9))
+            df['MACD'] = macd.macd().astype(dtype)
+            df['MACD_Signal'] = macd.macd_signal().astype(dtype)
+            df['MACD_Diff'] = macd.macd_diff().astype(dtype)
             
         else:
             # Manual Implementation (fallback)
-            df['SMA_50'] = df['close'].rolling(window=50).mean()
-            df['SMA_200'] = df['close'].rolling(window=200).mean()
+            for window in self.sma_windows:
+                df[f'SMA_{window}'] = df['close'].rolling(window=bars(window)).mean().astype(dtype)
             
             delta = df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+            gain = (delta.where(delta > 0, 0)).rolling(window=bars(14)).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=bars(14)).mean()
             rs = gain / loss
-            df['RSI'] = 100 - (100 / (1 + rs))
+            df['RSI'] = (100 - (100 / (1 + rs))).astype(dtype)
             
             # MACD: 12ema - 26ema
-            ema12 = df['close'].ewm(span=12, adjust=False).mean()
-            ema26 = df['close'].ewm(span=26, adjust=False).mean()
-            df['MACD'] = ema12 - ema26
-            df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-            df['MACD_Diff'] = df['MACD'] - df['MACD_Signal']
+            ema12 = df['close'].ewm(span=bars(12), adjust=False).mean()
+            ema26 = df['close'].ewm(span=bars(26), adjust=False).mean()
+            macd = ema12 - ema26
+            macd_signal = macd.ewm(span=bars(9), adjust=False).mean()
+            df['MACD'] = macd.astype(dtype)
+            df['MACD_Signal'] = macd_signal.astype(dtype)
+            df['MACD_Diff'] = (macd - macd_signal).astype(dtype)
             
-            df['Log_Return'] = np.log(df['close'] / df['close'].shift(1))
-            df['Volatility_20'] = df['Log_Return'].rolling(window=20).std()
+        # Rolling Volatility (Standard Deviation of log returns for 20 days),
+        # computed from the full-precision returns
+        log_return = np.log(df['close'] / df['close'].shift(1))
+        df['Log_Return'] = log_return.astype(dtype)
+        df['Volatility_20'] = log_return.rolling(window=bars(20)).std().astype(dtype)
 
+        if self.compact:
+            memory_report(df, "Compact features")
         return df
 
+    @profiled('FeatureEngineer.compute_matrix')
+    def compute_matrix(self, df, spec=None, dtype=None):
+        """
+        Compute a declarative indicator set with batched NumPy kernels.
+        
+        All columns are written into one preallocated matrix, which suits
+        research runs with dozens of windows (e.g. SMA over range(5, 251)).
+        
+        Args:
+            df (pd.DataFrame): DataFrame with 'close' column.
+            spec (IndicatorSpec, optional): Indicators to compute, with windows
+                in bars. Defaults to this engineer's SMA windows plus RSI 14,
+                MACD and Volatility 20, converted from days to bars and named
+                by their day counts ('RSI' for RSI 14, as in `add_features`).
+            dtype (np.dtype, optional): np.float64 or np.float32. Defaults to
+                float32 in compact mode and float64 otherwise.
+            
+        Returns:
+            pd.DataFrame: Indicator columns backed by a single matrix.
+        """
+        dtype = dtype or self.dtype
+        if spec is not None:
+            return indicator_frame(df, spec, dtype=dtype)
+        
+        bars = self.frequency.bars
+        day_spec = IndicatorSpec(sma=self.sma_windows, rsi=(14,), volatility=(20,), macd=(12, 26, 9), names=LEGACY_NAMES)
+        bar_spec = IndicatorSpec(
+            sma=[bars(w) for w in self.sma_windows], rsi=(bars(14),), volatility=(bars(20),),
+            macd=(bars(12), bars(26), bars(9)),
+        )
+        frame = indicator_frame(df, bar_spec, dtype=dtype)
+        frame.columns = day_spec.columns()
+        return frame
+
+class StreamingFeatureEngineer:
+    def __init__(self, sma_windows=(50, 200), rsi_window=14, macd_windows=(12, 26, 9), volatility_window=20):
+        """
+        Initialize the StreamingFeatureEngineer.
+        
+        Computes the same columns as `FeatureEngineer(use_ta_lib=True)` one
+        bar at a time, keeping rolling sums and EMA/Wilder state so every
+        update costs O(1) regardless of how much history has been seen.
+        
+        Args:
+            sma_windows (iterable of int): Windows for the 'SMA_{window}' columns.
+            rsi_window (int): RSI window (Wilder smoothing).
+            macd_windows (tuple): (fast, slow, signal) EMA spans for MACD.
+            volatility_window (int): Window for the log return standard deviation.
+        """
+        self.sma_windows = tuple(sma_windows)
+        self.rsi_window = rsi_window
+        self.macd_windows = tuple(macd_windows)
+        self.volatility_window = volatility_window
+        self.reset()
+
+    def reset(self):
+        """
+        Clear all state.
+        """
+        self.count = 0
+        self.prev_close = None
+        self.closes = deque(maxlen=max(self.sma_windows, default=1))
+        self.sma_sums = {window: 0.0 for window in self.sma_windows}
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.ema_fast = None
+        self.ema_slow = None
+        self.macd_signal = None
+        self.macd_count = 0
+        self.log_returns = deque(maxlen=self.volatility_window)
+        self.return_sum = 0.0
+        self.return_sq_sum = 0.0
+
+    def update(self, bar):
+        """
+        Add one bar and return its features.
+        
+        Args:
+            bar (dict or pd.Series): Bar with a 'close' value.
+            
+        Returns:
+            dict: Feature values for the bar (NaN while warming up).
+        """
+        close = float(bar['close'])
+        self.count += 1
+        features = {}
+
+        # Simple Moving Averages: add the new close, drop the one leaving each window
+        for window in self.sma_windows:
+            self.sma_sums[window] += close
+            if len(self.closes) >= window:
+                self.sma_sums[window] -= self.closes[-window]
+            features[f'SMA_{window}'] = self.sma_sums[window] / window if self.count >= window else np.nan
+        self.closes.append(close)
+
+        # RSI with Wilder smoothing (the first bar has no change and counts as 0)
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        alpha = 1 / self.rsi_window
+        self.avg_gain += alpha * (max(delta, 0.0) - self.avg_gain)
+        self.avg_loss += alpha * (max(-delta, 0.0) - self.avg_loss)
+        if self.count < self.rsi_window:
+            features['RSI'] = np.nan
+        elif self.avg_loss == 0:
+            features['RSI'] = 100.0
+        else:
+            features['RSI'] = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+        # MACD
+        fast, slow, sign = self.macd_windows
+        self.ema_fast = _ema_step(self.ema_fast, close, fast)
+        self.ema_slow = _ema_step(self.ema_slow, close, slow)
+        if self.count >= slow:
+            macd = self.ema_fast - self.ema_slow
+            self.macd_signal = _ema_step(self.macd_signal, macd, sign)
+            self.macd_count += 1
+            macd_signal = self.macd_signal if self.macd_count >= sign else np.nan
+        else:
+            macd = macd_signal = np.nan
+        features['MACD'] = macd
+        features['MACD_Signal'] = macd_signal
+        features['MACD_Diff'] = macd - macd_signal
+
+        # Rolling Volatility (Standard Deviation of log returns)
+        if self.prev_close is None:
+            log_return = np.nan
+        else:
+            log_return = float(np.log(close / self.prev_close))
+            if len(self.log_returns) == self.volatility_window:
+                oldest = self.log_returns[0]
+                self.return_sum -= oldest
+                self.return_sq_sum -= oldest * oldest
+            self.log_returns.append(log_return)
+            self.return_sum += log_return
+            self.return_sq_sum += log_return * log_return
+        features['Log_Return'] = log_return
+
+        n = len(self.log_returns)
+        if n == self.volatility_window:
+            variance = (self.return_sq_sum - self.return_sum * self.return_sum / n) / (n - 1)
+            features[f'Volatility_{self.volatility_window}'] = np.sqrt(max(variance, 0.0))
+        else:
+            features[f'Volatility_{self.volatility_window}'] = np.nan
+
+        self.prev_close = close
+        return features
+
+    def warm_up(self, df):
+        """
+        Feed historical bars to build up state.
+        
+        Args:
+            df (pd.DataFrame): DataFrame with 'close' column.
+            
+        Returns:
+            pd.DataFrame: Features for every bar in `df`.
+        """
+        rows = [self.update({'close': close}) for close in df['close'].to_numpy()]
+        return pd.DataFrame(rows, index=df.index)
+
+    @classmethod
+    def from_history(cls, df, **kwargs):
+        """
+        Build an engine positioned after the last bar of `df`.
+        
+        Rolling buffers only need the last few hundred bars, so just that tail
+        is replayed; the EMA and Wilder averages, which depend on the whole
+        history, are taken from vectorized recursions over all of `df`.
+        
+        Args:
+            df (pd.DataFrame): DataFrame with 'close' column.
+            **kwargs: Constructor arguments.
+            
+        Returns:
+            StreamingFeatureEngineer: Engine ready for the next bar.
+        """
+        engine = cls(**kwargs)
+        fast, slow, sign = engine.macd_windows
+        lookback = max(max(engine.sma_windows, default=1), engine.volatility_window, slow) + 1
+        if len(df) <= lookback:
+            engine.warm_up(df)
+            return engine
+        engine.warm_up(df.iloc[-lookback:])
+        engine.count = len(df)
+
+        close = df['close'].astype(float)
+        diff = close.diff()
+        alpha = 1 / engine.rsi_window
+        engine.avg_gain = float(diff.where(diff > 0, 0.0).ewm(alpha=alpha, adjust=False).mean().iloc[-1])
+        engine.avg_loss = float((-diff.where(diff < 0, 0.0)).ewm(alpha=alpha, adjust=False).mean().iloc[-1])
+
+        ema_fast = close.ewm(span=fast, adjust=False).mean()
+        ema_slow = close.ewm(span=slow, adjust=False).mean()
+        engine.ema_fast = float(ema_fast.iloc[-1])
+        engine.ema_slow = float(ema_slow.iloc[-1])
+        macd = (ema_fast - ema_slow).iloc[slow - 1:]
+        engine.macd_signal = float(macd.ewm(span=sign, adjust=False).mean().iloc[-1])
+        engine.macd_count = len(macd)
+        return engine
+
+    def get_state(self):
+        """
+        Checkpoint the engine.
+        
+        Returns:
+            dict: JSON-serializable state accepted by `set_state`.
+        """
+        return {
+            'config': {
+                'sma_windows': list(self.sma_windows),
+                'rsi_window': self.rsi_window,
+                'macd_windows': list(self.macd_windows),
+                'volatility_window': self.volatility_window,
+            },
+            'count': self.count,
+            'prev_close': self.prev_close,
+            'closes': list(self.closes),
+            'sma_sums': {str(window): value for window, value in self.sma_sums.items()},
+            'avg_gain': self.avg_gain,
+            'avg_loss': self.avg_loss,
+            'ema_fast': self.ema_fast,
+            'ema_slow': self.ema_slow,
+            'macd_signal': self.macd_signal,
+            'macd_count': self.macd_count,
+            'log_returns': list(self.log_returns),
+            'return_sum': self.return_sum,
+            'return_sq_sum': self.return_sq_sum,
+        }
+
+    def set_state(self, state):
+        """
+        Restore a checkpoint produced by `get_state`.
+        """
+        config = state['config']
+        self.__init__(
+            sma_windows=config['sma_windows'],
+            rsi_window=config['rsi_window'],
+            macd_windows=config['macd_windows'],
+            volatility_window=config['volatility_window'],
+        )
+        self.count = state['count']
+        self.prev_close = state['prev_close']
+        self.closes.extend(state['closes'])
+        self.sma_sums = {int(window): value for window, value in state['sma_sums'].items()}
+        self.avg_gain = state['avg_gain']
+        self.avg_loss = state['avg_loss']
+        self.ema_fast = state['ema_fast']
+        self.ema_slow = state['ema_slow']
+        self.macd_signal = state['macd_signal']
+        self.macd_count = state['macd_count']
+        self.log_returns.extend(state['log_returns'])
+        self.return_sum = state['return_sum']
+        self.return_sq_sum = state['return_sq_sum']
+
+    def save(self, path):
+        """
+        Save the current state to a JSON file.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.get_state(), f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Create an engine from a JSON checkpoint written by `save`.
+        """
+        with open(path) as f:
+            state = json.load(f)
+        engine = cls()
+        engine.set_state(state)
+        return engine
+
+
+def _ema_step(previous, value, span):
+    """
+    One step of an EMA with adjust=False (seeded with the first value).
+    """
+    if previous is None:
+        return value
+    alpha = 2 / (span + 1)
+    return previous + alpha * (value - previous)
+
 if __name__ == "__main__":
     # Test
-    from data_loader import DataLoader
+    from .data_loader import DataLoader
     
     loader = DataLoader()
     # Fetch a generic ticker for testing
@@ -0,0 +1,261 @@
+import numpy as np
+import pandas as pd
+
+
+class FixedSlippage:
+    def __init__(self, slippage_pct=0.0005):
+        """
+        The same price slippage on every fill, as in the default Backtester.
+
+        Args:
+            slippage_pct (float): Slippage as a fraction of the fill price.
+        """
+        self.slippage_pct = slippage_pct
+
+    columns = ()
+
+    def components(self, market, shape):
+        """
+        Slippage for q shares on a bar is `base + scale * sqrt(q / volume)`.
+
+        Returns:
+            tuple: (base, scale) arrays of shape (bars, assets); scale is None
+                when the slippage does not depend on the order size.
+        """
+        return np.full(shape, float(self.slippage_pct)), None
+
+
+class VolatilitySlippage:
+    def __init__(self, spread=0.1, impact=1.0, volatility_column='Volatility_20', min_pct=0.0001):
+        """
+        Half-spread plus square-root market impact, both scaled by volatility.
+
+        An order of q shares on a bar with volume V and volatility sigma
+        (standard deviation of log returns, e.g. 'Volatility_20') fills at
+            max(min_pct, spread * sigma) + impact * sigma * sqrt(q / V)
+        away from the quoted price. Bars without a volatility estimate (the
+        indicator warm-up) pay `min_pct` and no impact.
+
+        Args:
+            spread (float): Half-spread in units of sigma.
+            impact (float): Impact coefficient of the square-root law.
+            volatility_column (str): Feature column holding sigma.
+            min_pct (float): Smallest half-spread, as a fraction of price.
+        """
+        self.spread = spread
+        self.impact = impact
+        self.volatility_column = volatility_column
+        self.min_pct = min_pct
+
+    @property
+    def columns(self):
+        return (self.volatility_column, 'volume')
+
+    def components(self, market, shape):
+        sigma = np.nan_to_num(market[self.volatility_column], nan=0.0)
+        base = np.maximum(self.min_pct, self.spread * sigma)
+        scale = self.impact * sigma if self.impact else None
+        return base, scale
+
+
+class FillModel:
+    def __init__(self, execution='next_open', max_participation=None, slippage=None):
+        """
+        How the Backtester turns target positions into fills.
+
+        Signals are still decided at a bar's close. With 'next_open'
+        execution the order fills at the following bar's open, so a strategy
+        can no longer trade at the close it has just seen. Orders larger
+        than `max_participation` of a bar's volume fill partially, and the
+        rest carries over to the next bars until the position reaches the
+        target or the target changes. Buys that cash cannot cover are scaled
+        down, and the shortfall is dropped.
+
+        Args:
+            execution (str): 'next_open', or 'close' to fill at the signal
+                bar's close like the default Backtester.
+            max_participation (float, optional): Largest fraction of a bar's
+                volume filled per asset (e.g. 0.1). None means no cap.
+            slippage (FixedSlippage or VolatilitySlippage, optional): Price
+                slippage model. Defaults to the Backtester's `slippage_pct`.
+        """
+        if execution not in ('next_open', 'close'):
+            raise ValueError(f"Unknown execution '{execution}'. Use 'next_open' or 'close'.")
+        self.execution = execution
+        self.max_participation = max_participation
+        self.slippage = slippage
+
+    @property
+    def delay(self):
+        """
+        Bars between the signal and the fill.
+        """
+        return 1 if self.execution == 'next_open' else 0
+
+    def columns(self):
+        """
+        Market data columns needed besides 'close'.
+        """
+        slippage = self.slippage or FixedSlippage()
+        needed = ['open'] if self.execution == 'next_open' else []
+        if self.max_participation is not None:
+            needed.append('volume')
+        needed.extend(slippage.columns)
+        return list(dict.fromkeys(needed))
+
+    def arrays(self, close, market, slippage_pct=0.0005):
+        """
+        Per-bar execution inputs for `fill_trades`.
+
+        Args:
+            close (np.ndarray): Close prices, shape (bars, assets).
+            market (dict): Column name -> float64 array of the same shape,
+                for every name in `columns()`.
+            slippage_pct (float): Fixed slippage used when the model has no
+                slippage model of its own.
+
+        Returns:
+            dict: 'price', 'capacity', 'base', 'scale' and 'volume' arrays
+                (capacity and scale are None when unused).
+        """
+        slippage = self.slippage or FixedSlippage(slippage_pct)
+        price = market['open'] if self.execution == 'next_open' else close
+        volume = market.get('volume')
+
+        capacity = None
+        if self.max_participation is not None:
+            capacity = np.floor(self.max_participation * np.nan_to_num(volume, nan=0.0))
+        base, scale = slippage.components(market, close.shape)
+        if scale is not None:
+            # Without volume there is no impact estimate
+            volume = np.where(volume > 0, volume, np.inf)
+        return {'price': price, 'capacity': capacity, 'base': base, 'scale': scale, 'volume': volume}
+
+
+def market_panels(frames, columns):
+    """
+    Build (dates x tickers) panels of market columns for `run_portfolio`.
+
+    Args:
+        frames (dict): Mapping of ticker -> DataFrame (e.g. with features).
+        columns (list): Column names, e.g. `fill_model.columns()`.
+
+    Returns:
+        dict: Column name -> pd.DataFrame.
+    """
+    return {column: pd.DataFrame({ticker: df[column] for ticker, df in frames.items()}) for column in columns}
+
+
+def fill_trades(close, marks, weights, initial_capital, transaction_cost_pct, price, capacity, base, scale, volume, delay):
+    """
+    Walk the order events of a portfolio under a fill model.
+
+    Targets are set at the close of every bar whose weights change, sized
+    from the equity at that close. Orders are worked from bar `delay` on, at
+    most `capacity` shares per bar. Bars without a target change or an open
+    order are skipped.
+
+    Args:
+        close (np.ndarray): Close prices, shape (bars, assets). NaN marks
+            bars where an asset has no price.
+        marks (np.ndarray): Forward-filled prices used for valuation.
+        weights (np.ndarray): Target weights, shape (bars, assets).
+        initial_capital (float): Starting cash.
+        transaction_cost_pct (float): Fee per fill.
+        price (np.ndarray): Fill prices (close or open).
+        capacity (np.ndarray or None): Largest fill per bar, in shares.
+        base (np.ndarray): Size-independent slippage fraction.
+        scale (np.ndarray or None): Impact coefficient, times sqrt(shares / volume).
+        volume (np.ndarray or None): Bar volume for the impact term.
+        delay (int): 0 to fill on the signal bar, 1 on the next bar.
+
+    Returns:
+        tuple: (rows, cash, positions) after each bar that changed the
+            portfolio, with positions as an int64 array of shape
+            (rows, assets).
+    """
+    n_bars, n_assets = close.shape
+
+    changed = np.empty(n_bars, dtype=bool)
+    if n_bars:
+        changed[0] = weights[0].any()
+        changed[1:] = (weights[1:] != weights[:-1]).any(axis=1)
+    change_rows = np.flatnonzero(changed)
+
+    cash = float(initial_capital)
+    position = np.zeros(n_assets, dtype=np.int64)
+    target = np.zeros(n_assets, dtype=np.int64)
+    rows, cash_values, position_values = [], [], []
+
+    def slippage(b, shares):
+        if scale is None:
+            return base[b]
+        return base[b] + scale[b] * np.sqrt(shares / volume[b])
+
+    b = 0
+    while b < n_bars:
+        if not (target != position).any():
+            # Nothing to work: jump to the next target change
+            k = np.searchsorted(change_rows, b)
+            if k == len(change_rows):
+                break
+            b = change_rows[k]
+
+        if changed[b] and not delay:
+            target = _target(b, close, marks, weights, base, cash, position)
+
+        pending = target - position
+        traded = False
+        if pending.any():
+            fill_price = price[b]
+            fillable = np.isfinite(fill_price)
+            if capacity is None:
+                order = np.where(fillable, pending, 0)
+            else:
+                order = np.where(fillable, np.clip(pending, -capacity[b], capacity[b]), 0).astype(np.int64)
+            fill_price = np.where(fillable, fill_price, 1.0)
+
+            # SELL first to free cash
+            sells = np.minimum(order, 0)
+            revenue = -sells * fill_price * (1 - slippage(b, -sells))
+            cash += revenue.sum() - (revenue * transaction_cost_pct).sum()
+
+            # BUY, scaled down to the cash available
+            buys = np.maximum(order, 0)
+            buy_slippage = slippage(b, buys)
+            buy_price = fill_price * (1 + buy_slippage) * (1 + transaction_cost_pct)
+            needed = buys @ buy_price
+            if needed > cash:
+                buys = np.floor(buys * (max(cash, 0.0) / needed)).astype(np.int64)
+                buy_slippage = slippage(b, buys)
+                # The cash shortfall is dropped rather than retried every bar
+                target = np.where(order > 0, position + buys, target)
+            cost = buys * fill_price * (1 + buy_slippage)
+            cash -= cost.sum() + (cost * transaction_cost_pct).sum()
+
+            position = position + sells + buys
+            traded = bool(sells.any() or buys.any())
+
+        if changed[b] and delay:
+            target = _target(b, close, marks, weights, base, cash, position)
+
+        if traded or (changed[b] and not delay):
+            rows.append(b)
+            cash_values.append(cash)
+            position_values.append(position)
+        b += 1
+
+    positions = np.array(position_values, dtype=np.int64).reshape(len(rows), n_assets)
+    return np.array(rows, dtype=np.int64), np.array(cash_values, dtype=np.float64), positions
+
+
+def _target(b, close, marks, weights, base, cash, position):
+    """
+    Target shares from the equity at bar `b`'s close. Assets without a
+    close keep their position.
+    """
+    tradable = ~np.isnan(close[b])
+    equity = cash + position @ marks[b]
+    reference = np.where(tradable, close[b], 1.0)
+    target = np.trunc(weights[b] * equity / (reference * (1 + base[b]))).astype(np.int64)
+    return np.where(tradable, target, position)
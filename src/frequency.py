@@ -0,0 +1,165 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Trading days per year, minutes per regular US equity session and its open
+TRADING_DAYS = 252
+SESSION_MINUTES = 390
+SESSION_OPEN = '09:30'
+
+_DAY_NS = 86_400 * 10**9
+
+
+class BarFrequency:
+    def __init__(self, interval='1d', session_minutes=SESSION_MINUTES, session_open=SESSION_OPEN):
+        """
+        Bar frequency of a price series.
+
+        Indicator windows and strategy parameters in this project are written
+        in trading days (SMA_50, Volatility_20, ...). A BarFrequency converts
+        those day counts into bar counts, gives the number of bars per year
+        used to annualize metrics, and resamples finer bars into its own size.
+
+        Args:
+            interval (str or BarFrequency): Interval in the yfinance notation,
+                e.g. '1m', '5m', '15m', '30m', '1h', '1d', '1wk', '1mo'.
+            session_minutes (int): Trading minutes per day, for intraday bars.
+            session_open (str): Exchange time of the session open ('HH:MM').
+                Intraday buckets start there, so hourly bars run 9:30-10:30,
+                ..., 15:30-16:00 as Yahoo reports them.
+        """
+        if isinstance(interval, BarFrequency):
+            interval, session_minutes, session_open = interval.interval, interval.session_minutes, interval.session_open
+        match = re.fullmatch(r'(\d+)(m|h|d|wk|mo)', str(interval))
+        if match is None:
+            raise ValueError(f"Unknown interval '{interval}'. Use e.g. '1m', '5m', '1h', '1d', '1wk' or '1mo'.")
+        count, unit = int(match[1]), match[2]
+
+        self.interval = str(interval)
+        self.session_minutes = session_minutes
+        self.session_open = session_open
+        self.unit = unit
+        self.count = count
+        if unit == 'm':
+            self.bars_per_day = session_minutes / count
+        elif unit == 'h':
+            self.bars_per_day = session_minutes / (60 * count)
+        elif unit == 'd':
+            self.bars_per_day = 1 / count
+        elif unit == 'wk':
+            self.bars_per_day = 1 / (5 * count)
+        else:
+            self.bars_per_day = 12 / (TRADING_DAYS * count)
+
+    @property
+    def is_intraday(self):
+        return self.unit in ('m', 'h')
+
+    @property
+    def periods_per_year(self):
+        """
+        Bars per year, used to annualize returns and volatility.
+        """
+        return TRADING_DAYS * self.bars_per_day
+
+    def bars(self, days):
+        """
+        Number of bars spanning `days` trading days (at least 1).
+        """
+        return max(1, int(round(days * self.bars_per_day)))
+
+    def __eq__(self, other):
+        return isinstance(other, BarFrequency) and self.interval == other.interval
+
+    def __hash__(self):
+        return hash(self.interval)
+
+    def __repr__(self):
+        return f"BarFrequency('{self.interval}')"
+
+    def bucket_keys(self, index):
+        """
+        Integer bucket of every timestamp; equal keys share an output bar.
+
+        Intraday buckets are counted from each day's session open in the
+        index's wall time, so bars before the open fall in buckets of their own.
+        """
+        index = pd.DatetimeIndex(index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        if self.is_intraday:
+            step = (60 if self.unit == 'h' else 1) * self.count * 60 * 10**9
+            times = index.as_unit('ns').asi8
+            opens = times // _DAY_NS * _DAY_NS + pd.Timedelta(f'{self.session_open}:00').value
+            return opens + (times - opens) // step * step
+        if self.unit == 'd':
+            step = self.count * _DAY_NS
+            return index.as_unit('ns').asi8 // step * step
+        period = f'{self.count}W' if self.unit == 'wk' else f'{self.count}M'
+        return index.to_period(period).start_time.as_unit('ns').asi8
+
+
+def resample_ohlcv(df, frequency):
+    """
+    Aggregate OHLCV bars into coarser bars in one vectorized pass.
+
+    Rows are bucketed by timestamp and each column is reduced with
+    `np.ufunc.reduceat` over the bucket boundaries: first open, highest
+    high, lowest low, last close and summed volume. Buckets without any
+    source bar are omitted instead of being filled with NaN. Other columns
+    keep their last value. Intraday buckets start at the session open
+    (`BarFrequency.session_open`); with hourly bars the last one of a
+    9:30-16:00 session covers only 15:30-16:00.
+
+    Args:
+        df (pd.DataFrame): Date-sorted bars with open/high/low/close/volume
+            columns (any case).
+        frequency (str or BarFrequency): Target bar size.
+
+    Returns:
+        pd.DataFrame: Resampled bars labelled with the start of each bucket,
+            in the timezone of `df`.
+    """
+    frequency = BarFrequency(frequency)
+    if df.empty:
+        return df
+    keys = frequency.bucket_keys(df.index)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.append(starts[1:], len(keys)) - 1
+
+    columns = {}
+    for name in df.columns:
+        values = df[name].to_numpy()
+        kind = str(name).lower()
+        if kind == 'open':
+            columns[name] = values[starts]
+        elif kind == 'high':
+            columns[name] = np.maximum.reduceat(values, starts)
+        elif kind == 'low':
+            columns[name] = np.minimum.reduceat(values, starts)
+        elif kind == 'volume':
+            columns[name] = np.add.reduceat(values, starts)
+        else:
+            columns[name] = values[ends]
+
+    index = pd.DatetimeIndex(keys[starts].view('datetime64[ns]'), name=df.index.name)
+    if df.index.tz is not None:
+        index = index.tz_localize(df.index.tz)
+    return pd.DataFrame(columns, index=index)
+
+
+if __name__ == "__main__":
+    # Test: resample one year of synthetic 1-minute bars
+    import time
+
+    from .providers import SyntheticProvider
+
+    started = time.perf_counter()
+    minutes = SyntheticProvider().download('SPY', '2023-01-01', '2024-01-01', interval='1m')
+    loaded = time.perf_counter()
+    for interval in ('5m', '1h', '1d'):
+        bars = resample_ohlcv(minutes, interval)
+        print(f"{interval}: {len(bars)} bars")
+    print(f"{len(minutes)} minute bars generated in {loaded - started:.2f}s, "
+          f"resampled in {time.perf_counter() - loaded:.2f}s")
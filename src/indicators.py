@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+# add_features names its 14-day RSI 'RSI'
+LEGACY_NAMES = {'RSI_14': 'RSI'}
+
+
+class IndicatorSpec:
+    def __init__(self, sma=(), ema=(), rsi=(), volatility=(), macd=None, log_return=True, names=None):
+        """
+        Declarative description of the indicator columns to compute.
+
+        Args:
+            sma (iterable of int): SMA windows, e.g. range(5, 251).
+            ema (iterable of int): EMA spans.
+            rsi (iterable of int): RSI windows (Wilder smoothing).
+            volatility (iterable of int): Windows for the log return standard deviation.
+            macd (tuple, optional): (fast, slow, signal) spans for MACD columns.
+            log_return (bool): Include the 'Log_Return' column.
+            names (dict, optional): Column names to replace, e.g.
+                {'RSI_14': 'RSI'}.
+
+        Raises:
+            ValueError: If a window is smaller than 1, or a volatility window
+                smaller than 2 (a sample standard deviation needs two returns).
+        """
+        self.sma = tuple(sma)
+        self.ema = tuple(ema)
+        self.rsi = tuple(rsi)
+        self.volatility = tuple(volatility)
+        self.macd = tuple(macd) if macd else None
+        self.log_return = log_return
+        self.names = dict(names or {})
+
+        for family, windows, smallest in (('SMA', self.sma, 1), ('EMA', self.ema, 1), ('RSI', self.rsi, 1),
+                                          ('MACD', self.macd or (), 1), ('Volatility', self.volatility, 2)):
+            for window in windows:
+                if window < smallest:
+                    raise ValueError(f"{family} windows must be at least {smallest}, got {window}.")
+
+    @classmethod
+    def default(cls):
+        """
+        The indicator set of `FeatureEngineer.add_features`, with its column names.
+        """
+        return cls(sma=(50, 200), rsi=(14,), volatility=(20,), macd=(12, 26, 9), names=LEGACY_NAMES)
+
+    def columns(self):
+        """
+        Output column names, in matrix order.
+        """
+        columns = [f'SMA_{w}' for w in self.sma]
+        columns += [f'EMA_{w}' for w in self.ema]
+        columns += [f'RSI_{w}' for w in self.rsi]
+        if self.macd:
+            columns += ['MACD', 'MACD_Signal', 'MACD_Diff']
+        if self.log_return:
+            columns.append('Log_Return')
+        columns += [f'Volatility_{w}' for w in self.volatility]
+        return [self.names.get(column, column) for column in columns]
+
+
+def compute_indicators(close, spec, dtype=np.float64):
+    """
+    Compute every indicator of `spec` into one preallocated matrix.
+
+    Intermediate series are shared between families: one cumulative sum for
+    all SMA windows, one price difference for all RSI windows, and one log
+    return series (with its cumulative sums) for all volatility windows.
+    NaN warm-up periods follow the 'ta' library / pandas rolling conventions.
+
+    Args:
+        close (np.ndarray): Close prices.
+        spec (IndicatorSpec): Indicators to compute.
+        dtype (np.dtype): Output dtype (np.float32 or np.float64).
+
+    Returns:
+        tuple: (matrix, columns) with matrix of shape (len(close), n_columns).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    columns = spec.columns()
+    # Column-major so every indicator writes to a contiguous column, which is
+    # also the layout pandas uses for a single float block
+    out = np.empty((n, len(columns)), dtype=dtype, order='F')
+    col = 0
+
+    if spec.sma:
+        # Offset by the first price to keep the cumulative sum well conditioned
+        base = close[0] if n else 0.0
+        csum = np.concatenate(([0.0], np.cumsum(close - base)))
+        for window in spec.sma:
+            _rolling_mean(csum, window, out[:, col])
+            out[window - 1:, col] += base
+            col += 1
+
+    for span in spec.ema:
+        out[:, col] = _ema(close, 2 / (span + 1), min_periods=span)
+        col += 1
+
+    if spec.rsi:
+        delta = np.diff(close, prepend=np.nan)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        for window in spec.rsi:
+            avg_gain = _ema(gain, 1 / window, min_periods=window)
+            avg_loss = _ema(loss, 1 / window, min_periods=window)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+            out[:, col] = np.where(avg_loss == 0, 100.0, rsi)
+            col += 1
+
+    if spec.macd:
+        fast, slow, sign = spec.macd
+        macd = _ema(close, 2 / (fast + 1), min_periods=fast) - _ema(close, 2 / (slow + 1), min_periods=slow)
+        signal = np.full(n, np.nan)
+        signal[slow - 1:] = _ema(macd[slow - 1:], 2 / (sign + 1), min_periods=sign)
+        out[:, col] = macd
+        out[:, col + 1] = signal
+        out[:, col + 2] = macd - signal
+        col += 3
+
+    if spec.log_return or spec.volatility:
+        log_return = np.empty(n)
+        log_return[:1] = np.nan
+        np.log(close[1:] / close[:-1], out=log_return[1:])
+        if spec.log_return:
+            out[:, col] = log_return
+            col += 1
+
+        if spec.volatility:
+            returns = np.nan_to_num(log_return)
+            csum = np.concatenate(([0.0], np.cumsum(returns)))
+            csum_sq = np.concatenate(([0.0], np.cumsum(returns * returns)))
+            mean = np.empty(n)
+            mean_sq = np.empty(n)
+            for window in spec.volatility:
+                _rolling_mean(csum, window, mean)
+                _rolling_mean(csum_sq, window, mean_sq)
+                variance = (mean_sq - mean * mean) * (window / (window - 1))
+                std = np.sqrt(np.maximum(variance, 0.0))
+                # The first log return is undefined, so the first full window ends at row `window`
+                std[:window] = np.nan
+                out[:, col] = std
+                col += 1
+
+    return out, columns
+
+
+def _rolling_mean(csum, window, out):
+    """
+    Rolling mean from a cumulative sum with a leading zero; NaN before the
+    first full window.
+    """
+    out[:window - 1] = np.nan
+    np.subtract(csum[window:], csum[:-window], out=out[window - 1:])
+    out[window - 1:] /= window
+
+
+def _ema(values, alpha, min_periods):
+    """
+    Exponential moving average with adjust=False, seeded with the first value.
+    NaNs are skipped and the last average is carried over them, as with
+    pandas `ewm(adjust=False, ignore_na=True)`; `min_periods` counts valid values.
+    """
+    n = len(values)
+    result = np.full(n, np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) == 0:
+        return result
+    x = values[valid]
+    decay = 1 - alpha
+    if decay == 0:
+        ema = x
+    else:
+        # y[s + j] = decay**j * (decay * y[s - 1] + alpha * sum(x[s + k] / decay**k, k <= j)),
+        # in blocks short enough that decay**-j stays far from overflow
+        block = max(1, int(27 / -np.log(decay)))
+        powers = decay ** np.arange(min(block, len(x)))
+        ema = np.empty(len(x))
+        level = x[0]
+        for start in range(0, len(x), block):
+            chunk = x[start:start + block]
+            scale = powers[:len(chunk)]
+            ema[start:start + len(chunk)] = scale * (decay * level + alpha * np.cumsum(chunk / scale))
+            level = ema[start + len(chunk) - 1]
+    # Latest valid value at or before each row
+    seen = np.searchsorted(valid, np.arange(n), side='right')
+    ready = seen >= max(min_periods, 1)
+    result[ready] = ema[seen[ready] - 1]
+    return result
+
+
+def indicator_frame(df, spec, dtype=np.float64):
+    """
+    Wrap `compute_indicators` output in a DataFrame without copying the matrix.
+
+    Args:
+        df (pd.DataFrame): DataFrame with 'close' column.
+        spec (IndicatorSpec): Indicators to compute.
+        dtype (np.dtype): Output dtype.
+
+    Returns:
+        pd.DataFrame: Indicator columns indexed like `df`.
+    """
+    matrix, columns = compute_indicators(df['close'].to_numpy(), spec, dtype=dtype)
+    return pd.DataFrame(matrix, index=df.index, columns=columns, copy=False)
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+
+from .feature_store import fingerprint
+
+
+class ModelStore:
+    def __init__(self, cache_dir='data/models'):
+        """
+        Initialize the ModelStore.
+
+        Trained models are saved with joblib under a content-addressed key
+        built from the feature list, the hyperparameters and a fingerprint of
+        the training data. Loaded models are also kept in memory, so a
+        long-lived store (e.g. cached across Streamlit reruns) serves repeat
+        requests without touching disk.
+
+        Args:
+            cache_dir (str): Directory for the saved models.
+        """
+        self.cache_dir = cache_dir
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.index = self._read_index()
+        self._memory = {}
+
+    @staticmethod
+    def model_key(features, params):
+        """
+        Key identifying a model configuration (independent of the data).
+        """
+        config = json.dumps({'features': list(features), 'params': params}, sort_keys=True, default=str)
+        return hashlib.blake2b(config.encode(), digest_size=8).hexdigest()
+
+    def key(self, features, params, data):
+        """
+        Content-addressed key for a model trained on `data`.
+
+        Args:
+            features (list): Feature column names.
+            params (dict): Model hyperparameters.
+            data (pd.DataFrame): Training data.
+
+        Returns:
+            str: Cache key.
+        """
+        return f"{self.model_key(features, params)}_{fingerprint(data[list(features) + ['close']])}"
+
+    def load(self, key):
+        """
+        Return the model saved under `key`, or None.
+        """
+        if key in self._memory:
+            return self._memory[key]
+        if key not in self.index:
+            return None
+        import joblib
+
+        model = joblib.load(self._path(key))
+        self._memory[key] = model
+        return model
+
+    def save(self, key, model, data):
+        """
+        Save a model trained on `data` under `key`.
+        """
+        import joblib
+
+        joblib.dump(model, self._path(key))
+        self._memory[key] = model
+        self.index[key] = {
+            'model_key': key.split('_', 1)[0],
+            'n_rows': len(data),
+            'last_ts': str(data.index[-1]) if len(data) else None,
+        }
+        self._write_index()
+
+    def find_prefix(self, features, params, data):
+        """
+        Find a model trained on a strict prefix of `data`, for warm-starting.
+
+        Returns:
+            tuple: (key, n_rows) of the longest matching prefix, or (None, 0).
+        """
+        model_key = self.model_key(features, params)
+        candidates = sorted(
+            (entry['n_rows'], key) for key, entry in self.index.items()
+            if entry['model_key'] == model_key and 0 < entry['n_rows'] < len(data)
+        )
+        for n_rows, key in reversed(candidates):
+            if str(data.index[n_rows - 1]) != self.index[key]['last_ts']:
+                continue
+            if self.key(features, params, data.iloc[:n_rows]) == key:
+                return key, n_rows
+        return None, 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.joblib')
+
+    def _read_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path) as f:
+            index = json.load(f)
+        return {key: entry for key, entry in index.items() if os.path.exists(self._path(key))}
+
+    def _write_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,188 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .backtester import Backtester
+from .evaluation import Evaluator
+from .features import FeatureEngineer
+from .indicators import IndicatorSpec
+from .shared_memory import as_frame, shared
+from .signals import signal_matrix
+from .strategies import MACrossoverStrategy
+
+# Feature matrix shared with sweep workers. Set once per worker process by
+# `_init_worker` (attached from shared memory), so tasks only carry the
+# parameter combinations.
+_WORKER_FEATURES = None
+_WORKER_SETTINGS = None
+
+
+def _init_worker(features, settings):
+    global _WORKER_FEATURES, _WORKER_SETTINGS
+    _WORKER_FEATURES = as_frame(features)
+    _WORKER_SETTINGS = settings
+
+
+def _evaluate_chunk(combos):
+    """
+    Backtest a chunk of (short_window, long_window, cost) combinations on the
+    worker's feature matrix.
+    """
+    # Signals depend only on the windows: evaluate each pair once, then
+    # backtest all the pairs sharing a cost in one batch
+    pairs = list(dict.fromkeys((short_window, long_window) for short_window, long_window, _ in combos))
+    signals = signal_matrix(
+        _WORKER_FEATURES, [MACrossoverStrategy(short_window, long_window) for short_window, long_window in pairs]
+    )
+    column = {pair: j for j, pair in enumerate(pairs)}
+
+    curves = {'Portfolio Value': [None] * len(combos), 'Cash': [None] * len(combos), 'Position': [None] * len(combos)}
+    for cost in dict.fromkeys(cost for _, _, cost in combos):
+        members = [k for k, combo in enumerate(combos) if combo[2] == cost]
+        backtester = Backtester(
+            initial_capital=_WORKER_SETTINGS['initial_capital'],
+            transaction_cost_pct=cost,
+            slippage_pct=_WORKER_SETTINGS['slippage_pct'],
+        )
+        results = backtester.run_batch(_WORKER_FEATURES, signals.iloc[:, [column[combos[k][:2]] for k in members]])
+        for name, values in curves.items():
+            matrix = results[name].to_numpy()
+            for j, k in enumerate(members):
+                values[k] = matrix[:, j]
+
+    # Score the whole chunk in one vectorized pass
+    metrics = Evaluator.calculate_batch_metrics(
+        np.column_stack(curves['Portfolio Value']),
+        cash=np.column_stack(curves['Cash']),
+        positions=np.column_stack(curves['Position']),
+    )
+    rows = []
+    for (short_window, long_window, cost), row in zip(combos, metrics.to_dict('records')):
+        rows.append({
+            'short_window': short_window,
+            'long_window': long_window,
+            'transaction_cost_pct': cost,
+            **row,
+        })
+    return rows
+
+
+class ParameterSweep:
+    def __init__(self, data, initial_capital=10000.0, slippage_pct=0.0005, n_jobs=None):
+        """
+        Initialize the ParameterSweep for MACrossoverStrategy.
+
+        Args:
+            data (pd.DataFrame): Cleaned OHLCV data with a 'close' column.
+            initial_capital (float): Starting cash for every backtest.
+            slippage_pct (float): Price slippage for every backtest.
+            n_jobs (int, optional): Worker processes. Defaults to all cores;
+                1 runs in the current process.
+        """
+        self.data = data
+        self.initial_capital = initial_capital
+        self.slippage_pct = slippage_pct
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+
+    @staticmethod
+    def grid(short_windows, long_windows, costs=(0.001,)):
+        """
+        Build every (short_window, long_window, cost) combination with short < long.
+        """
+        return [
+            (short_window, long_window, cost)
+            for short_window, long_window, cost in itertools.product(short_windows, long_windows, costs)
+            if short_window < long_window
+        ]
+
+    @staticmethod
+    def random(short_range, long_range, costs=(0.001,), n_iter=100, seed=42):
+        """
+        Sample distinct (short_window, long_window, cost) combinations.
+
+        Args:
+            short_range (tuple): Inclusive (min, max) for the short window.
+            long_range (tuple): Inclusive (min, max) for the long window.
+            costs (iterable of float): Transaction costs to sample from.
+            n_iter (int): Number of combinations to draw.
+            seed (int): Random seed.
+
+        Returns:
+            list: Combinations with short < long.
+        """
+        rng = np.random.default_rng(seed)
+        costs = list(costs)
+        combos = set()
+        # Bounded number of draws so impossible requests cannot loop forever
+        for _ in range(n_iter * 20):
+            if len(combos) >= n_iter:
+                break
+            short_window = int(rng.integers(short_range[0], short_range[1] + 1))
+            long_window = int(rng.integers(long_range[0], long_range[1] + 1))
+            if short_window < long_window:
+                combos.add((short_window, long_window, costs[rng.integers(len(costs))]))
+        return sorted(combos)
+
+    def build_features(self, combos):
+        """
+        Compute every SMA window needed by the combinations exactly once.
+
+        Rows before the longest window is available are dropped so all
+        combinations are evaluated on the same period.
+        """
+        windows = sorted({w for combo in combos for w in combo[:2]})
+        fe = FeatureEngineer(sma_windows=windows)
+        spec = IndicatorSpec(sma=windows, log_return=False)
+        features = pd.concat([self.data[['close']], fe.compute_matrix(self.data, spec)], axis=1)
+        return features.dropna()
+
+    def run(self, combos, sort_by='Sharpe Ratio', chunk_size=None):
+        """
+        Evaluate all combinations across the process pool.
+
+        Args:
+            combos (list): Output of `grid` or `random`.
+            sort_by (str): Metric used to rank the results (descending).
+            chunk_size (int, optional): Combinations per task.
+
+        Returns:
+            pd.DataFrame: One row per combination with its metrics, best first.
+        """
+        features = self.build_features(combos)
+        settings = {'initial_capital': self.initial_capital, 'slippage_pct': self.slippage_pct}
+
+        if chunk_size is None:
+            # A few tasks per worker keeps the pool balanced without paying
+            # per-combination dispatch overhead
+            chunk_size = max(1, len(combos) // (self.n_jobs * 4))
+        chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+
+        if self.n_jobs == 1:
+            _init_worker(features, settings)
+            results = [_evaluate_chunk(chunk) for chunk in chunks]
+        else:
+            with shared(features) as handle, ProcessPoolExecutor(
+                max_workers=self.n_jobs, initializer=_init_worker, initargs=(handle, settings)
+            ) as executor:
+                results = list(executor.map(_evaluate_chunk, chunks))
+
+        table = pd.DataFrame([row for chunk in results for row in chunk])
+        if table.empty:
+            return table
+        return table.sort_values(sort_by, ascending=False).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    # Test
+    from .data_loader import DataLoader
+
+    loader = DataLoader()
+    data = loader.fetch_data('SPY', '2015-01-01', '2024-01-01')
+    if data is not None:
+        data = loader.clean_data(data)
+        sweep = ParameterSweep(data)
+        combos = sweep.grid(range(10, 60, 10), range(100, 250, 50), costs=(0.0005, 0.001))
+        print(sweep.run(combos).head(10))
@@ -0,0 +1,283 @@
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+# Profiling is off unless enabled with `profiling()` or the QUANT_PROFILE
+# environment variable (a trace file path, or 1 for 'profile_trace.json').
+# QUANT_PROFILE_MEMORY=1 also records bytes allocated per stage.
+# `profiling()` blocks are per context (thread, or Streamlit session), so
+# concurrent sessions never record into each other's traces; the environment
+# profiler records everything else in the process.
+_ACTIVE = contextvars.ContextVar('quant_profiler', default=None)
+_PROCESS = None
+_LOCAL = threading.local()
+
+
+class StageRecord:
+    """
+    One timed stage. `rows` can be set inside the `stage` block.
+    """
+
+    __slots__ = ('name', 'rows', 'depth', 'start', 'wall', 'cpu', 'bytes', 'peak', 'base')
+
+    def __init__(self, name, rows=None, depth=0):
+        self.name = name
+        self.rows = rows
+        self.depth = depth
+        self.start = self.wall = self.cpu = self.bytes = None
+        self.peak = self.base = 0
+
+
+class Profiler:
+    def __init__(self, memory=False):
+        """
+        Collect stage timings for the pipeline.
+
+        Every stage records wall time, CPU time of the process, rows processed
+        and, with `memory`, the peak bytes allocated while it ran (traced with
+        tracemalloc, which slows allocation-heavy code down).
+
+        Args:
+            memory (bool): Record bytes allocated per stage.
+        """
+        self.memory = memory
+        self.events = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, record, thread_id):
+        with self._lock:
+            self.events.append({
+                'name': record.name,
+                'start': record.start - self.origin,
+                'wall': record.wall,
+                'cpu': record.cpu,
+                'rows': record.rows,
+                'bytes': record.bytes,
+                'depth': record.depth,
+                'pid': os.getpid(),
+                'tid': thread_id,
+            })
+
+    def summary(self):
+        """
+        Per-stage breakdown.
+
+        Returns:
+            pd.DataFrame: calls, wall/CPU seconds, rows, rows per second, peak
+                bytes and share of the total (top-level) wall time, per stage.
+        """
+        columns = ['calls', 'wall_seconds', 'cpu_seconds', 'rows', 'rows_per_second', 'bytes', 'share']
+        if not self.events:
+            return pd.DataFrame(columns=columns)
+        events = pd.DataFrame(self.events)
+        events['rows'] = pd.to_numeric(events['rows'])
+        events['bytes'] = pd.to_numeric(events['bytes'])
+        table = events.groupby('name', sort=False).agg(
+            calls=('wall', 'size'),
+            wall_seconds=('wall', 'sum'),
+            cpu_seconds=('cpu', 'sum'),
+            rows=('rows', lambda rows: rows.sum(min_count=1)),
+            bytes=('bytes', 'max'),
+        )
+        table['rows_per_second'] = table['rows'] / table['wall_seconds'].where(table['wall_seconds'] > 0)
+        total = events.loc[events['depth'] == 0, 'wall'].sum()
+        table['share'] = table['wall_seconds'] / total if total > 0 else np.nan
+        return table[columns]
+
+    def chrome_trace(self):
+        """
+        The events in Chrome trace format (open in chrome://tracing or Perfetto).
+        """
+        return {
+            'traceEvents': [
+                {
+                    'name': event['name'],
+                    'cat': 'pipeline',
+                    'ph': 'X',
+                    'ts': event['start'] * 1e6,
+                    'dur': event['wall'] * 1e6,
+                    'pid': event['pid'],
+                    'tid': event['tid'],
+                    'args': {'cpu_ms': event['cpu'] * 1e3, 'rows': event['rows'], 'bytes': event['bytes']},
+                }
+                for event in self.events
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def to_chrome_trace(self, path):
+        """
+        Write the events as a Chrome trace file.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+    def to_jsonl(self, path):
+        """
+        Write one JSON object per event.
+        """
+        with open(path, 'w') as f:
+            for event in self.events:
+                f.write(json.dumps(event) + '\n')
+
+    def save(self, path):
+        """
+        Write the trace, as JSON lines for '.jsonl' paths and Chrome trace otherwise.
+        """
+        if path.endswith('.jsonl'):
+            self.to_jsonl(path)
+        else:
+            self.to_chrome_trace(path)
+        print(f"Profile trace saved to {path}")
+
+
+_NULL_RECORD = StageRecord('')
+
+
+def active_profiler():
+    """
+    The profiler currently recording in this context, or None.
+    """
+    return _ACTIVE.get() or _PROCESS
+
+
+@contextmanager
+def stage(name, rows=None):
+    """
+    Time a block as a pipeline stage. Costs two lookups when profiling is off.
+
+    Example:
+        with stage('FeatureEngineer.add_features') as record:
+            df = ...
+            record.rows = len(df)
+    """
+    profiler = active_profiler()
+    if profiler is None:
+        yield _NULL_RECORD
+        return
+
+    stack = getattr(_LOCAL, 'stack', None)
+    if stack is None:
+        stack = _LOCAL.stack = []
+    record = StageRecord(name, rows, depth=len(stack))
+    if profiler.memory and tracemalloc.is_tracing():
+        _update_peaks(stack)
+        record.base = tracemalloc.get_traced_memory()[0]
+    stack.append(record)
+    record.start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield record
+    finally:
+        record.wall = time.perf_counter() - record.start
+        record.cpu = time.process_time() - cpu_start
+        stack.pop()
+        if profiler.memory and tracemalloc.is_tracing():
+            # The peak since the last reset belongs to this stage and all its parents
+            peak = tracemalloc.get_traced_memory()[1]
+            record.peak = max(record.peak, peak)
+            _update_peaks(stack, peak)
+            record.bytes = record.peak - record.base
+        profiler.record(record, threading.get_ident())
+
+
+def _update_peaks(stack, peak=None):
+    """
+    Credit the traced peak to every open stage, then start a new peak window.
+    """
+    if peak is None:
+        peak = tracemalloc.get_traced_memory()[1]
+    for open_record in stack:
+        open_record.peak = max(open_record.peak, peak)
+    tracemalloc.reset_peak()
+
+
+def profiled(name):
+    """
+    Decorator timing every call of a function as stage `name`.
+
+    Rows are the length of the returned frame or array (summed over a dict
+    of frames), or else of the first DataFrame argument.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if active_profiler() is None:
+                return fn(*args, **kwargs)
+            with stage(name) as record:
+                result = fn(*args, **kwargs)
+                record.rows = _rows(result, args)
+                return result
+        return wrapper
+    return decorator
+
+
+def _rows(result, args):
+    if isinstance(result, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(result)
+    if isinstance(result, dict) and result and all(isinstance(v, pd.DataFrame) for v in result.values()):
+        return sum(len(v) for v in result.values())
+    for arg in args:
+        if isinstance(arg, (pd.DataFrame, pd.Series)):
+            return len(arg)
+    return None
+
+
+@contextmanager
+def profiling(path=None, memory=False):
+    """
+    Record pipeline stages inside the block.
+
+    Args:
+        path (str, optional): Trace file written on exit ('.jsonl' for JSON
+            lines, anything else for Chrome trace format).
+        memory (bool): Record bytes allocated per stage with tracemalloc.
+
+    Yields:
+        Profiler: The recording profiler (see `Profiler.summary`).
+    """
+    previous = active_profiler()
+    profiler = Profiler(memory=memory)
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    token = _ACTIVE.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _ACTIVE.reset(token)
+        if previous is not None:
+            # Nested runs also show up in the outer (e.g. QUANT_PROFILE) trace
+            offset = profiler.origin - previous.origin
+            with previous._lock:
+                previous.events.extend(dict(event, start=event['start'] + offset) for event in profiler.events)
+        if started_tracing:
+            tracemalloc.stop()
+        if path:
+            profiler.save(path)
+
+
+def _enable_from_env():
+    global _PROCESS
+    setting = os.environ.get('QUANT_PROFILE')
+    if not setting or setting == '0':
+        return
+    path = 'profile_trace.json' if setting == '1' else setting
+    memory = os.environ.get('QUANT_PROFILE_MEMORY') == '1'
+    if memory:
+        tracemalloc.start()
+    _PROCESS = Profiler(memory=memory)
+    atexit.register(_PROCESS.save, path)
+
+
+_enable_from_env()
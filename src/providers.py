@@ -0,0 +1,233 @@
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from .frequency import BarFrequency, resample_ohlcv
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces calls to a data source evenly.
+    """
+
+    def __init__(self, calls_per_second):
+        self.interval = 1.0 / calls_per_second
+        self._lock = threading.Lock()
+        self._next_call = 0.0
+
+    def wait(self):
+        """
+        Block until the next call is allowed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_call - now
+            self._next_call = max(now, self._next_call) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class YahooProvider:
+    """
+    Download OHLCV data from Yahoo Finance.
+    """
+
+    # Maximum requests per second (None for no limit)
+    rate_limit = 2.0
+
+    def download(self, ticker, start_date, end_date, interval='1d'):
+        """
+        Download bars for [start_date, end_date).
+
+        Args:
+            ticker (str): Stock ticker symbol (e.g., 'SPY').
+            start_date (str): Start date in 'YYYY-MM-DD' format.
+            end_date (str): End date in 'YYYY-MM-DD' format (exclusive).
+            interval (str): Bar size, e.g. '1d', '1h' or '1m'. Yahoo only
+                serves recent history for intraday intervals.
+
+        Returns:
+            pd.DataFrame: DataFrame with OHLCV data (empty if the range has no bars).
+
+        Raises:
+            Exception: The yfinance error when the download fails (network
+                errors, rate limits, unknown or delisted tickers), so callers
+                can retry and the range is not recorded as covered.
+        """
+        import yfinance as yf
+        from yfinance.exceptions import YFPricesMissingError
+
+        # yfinance only logs failures and returns an empty frame unless told otherwise
+        try:
+            with _yfinance_exceptions(yf):
+                df = yf.Ticker(ticker).history(start=start_date, end=end_date, interval=interval,
+                                               auto_adjust=True, actions=False)
+        except YFPricesMissingError as error:
+            if not _no_bars_in_range(error):
+                raise
+            # Yahoo has no bars in the range (e.g. only holidays)
+            return pd.DataFrame()
+        if df.empty:
+            return df
+
+        # Reset index to insure it is datetime
+        df.index = pd.to_datetime(df.index)
+        if not BarFrequency(interval).is_intraday:
+            # Daily and longer bars are dated by the exchange day, without a timezone
+            df.index = df.index.tz_localize(None)
+        df.index.name = 'Date'
+
+        # Flatten MultiIndex columns if present (e.g. ('Close', 'SPY') -> 'Close')
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        return df
+
+
+# Downloads running with yfinance exceptions enabled, and the setting to restore
+_YF_LOCK = threading.Lock()
+_YF_USERS = 0
+_YF_HIDE_EXCEPTIONS = None
+
+
+@contextmanager
+def _yfinance_exceptions(yf):
+    """
+    Let yfinance raise its errors for the duration of the block.
+
+    `yf.config.debug.hide_exceptions` is process-wide, so concurrent
+    downloads share one switch and the last one out restores the user's value.
+    """
+    global _YF_USERS, _YF_HIDE_EXCEPTIONS
+    with _YF_LOCK:
+        if _YF_USERS == 0:
+            _YF_HIDE_EXCEPTIONS = yf.config.debug.hide_exceptions
+            yf.config.debug.hide_exceptions = False
+        _YF_USERS += 1
+    try:
+        yield
+    finally:
+        with _YF_LOCK:
+            _YF_USERS -= 1
+            if _YF_USERS == 0:
+                yf.config.debug.hide_exceptions = _YF_HIDE_EXCEPTIONS
+
+
+def _no_bars_in_range(error):
+    """
+    Whether a YFPricesMissingError says the range has no bars, rather than
+    that the request failed or the symbol is unknown or delisted.
+    """
+    if error.yahoo_reason is not None:
+        # Yahoo's own reason: only a range without data is an empty answer
+        return error.yahoo_reason.startswith("Data doesn't exist for startDate")
+    # Without a reason, a chart with no quotes (an HTTP error carries its status code)
+    return 'status_code' not in str(error.debug_info)
+
+
+class CSVProvider:
+    """
+    Local stand-in for a market data API, serving `{ticker}.csv` files (or
+    `{ticker}_{interval}.csv` for other bar sizes) from a directory. Useful
+    for offline runs and tests.
+    """
+
+    rate_limit = None
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def download(self, ticker, start_date, end_date, interval='1d'):
+        name = ticker if interval == '1d' else f"{ticker}_{interval}"
+        path = os.path.join(self.directory, f"{name}.csv")
+        if not os.path.exists(path):
+            # A failure, not an empty range: the loader must not mark it as covered
+            raise FileNotFoundError(f"No data file for {name} in {self.directory}.")
+        df = pd.read_csv(path, index_col=0, parse_dates=True)
+        return df.loc[(df.index >= pd.Timestamp(start_date)) & (df.index < pd.Timestamp(end_date))]
+
+
+class SyntheticProvider:
+    """
+    Offline provider generating deterministic random-walk OHLCV bars.
+
+    Every ticker gets its own seed and the walk always starts at `origin`, so
+    overlapping requests return identical prices for the same dates.
+    Intraday bars are generated per day from the 9:30-16:00 session: a
+    minute path seeded by the date that runs from the day's open to its close.
+    """
+
+    rate_limit = None
+
+    def __init__(self, origin='1990-01-01', seed=0):
+        self.origin = pd.Timestamp(origin)
+        self.seed = seed
+
+    def download(self, ticker, start_date, end_date, interval='1d'):
+        frequency = BarFrequency(interval)
+        daily = self._daily(ticker, end_date)
+        start = pd.Timestamp(start_date)
+        if frequency.is_intraday:
+            bars = self._minutes(ticker, daily.loc[daily.index >= start.normalize()])
+            if frequency.interval != '1m':
+                bars = resample_ohlcv(bars, frequency)
+            return bars.loc[(bars.index >= start) & (bars.index < pd.Timestamp(end_date))]
+        daily = daily.loc[daily.index >= start]
+        return daily if frequency.interval == '1d' else resample_ohlcv(daily, frequency)
+
+    def _daily(self, ticker, end_date):
+        days = pd.date_range(self.origin, pd.Timestamp(end_date) - pd.Timedelta(days=1), name='Date')
+        dates = days[days.dayofweek < 5]
+        ticker_seed = zlib.crc32(ticker.encode())
+        n = len(dates)
+
+        # Draw one row per bar so a longer request extends, never reshuffles, the walk
+        shocks = np.random.default_rng([self.seed, ticker_seed]).standard_normal((n, 3))
+        volume_rng = np.random.default_rng([self.seed, ticker_seed, 1])
+
+        close = 100 * np.exp(np.cumsum(0.0003 + 0.01 * shocks[:, 0]))
+        open_ = close * np.exp(0.002 * shocks[:, 1])
+        spread = np.abs(0.005 * shocks[:, 2])
+        df = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * (1 + spread),
+            'Low': np.minimum(open_, close) * (1 - spread),
+            'Close': close,
+            'Volume': volume_rng.integers(1_000_000, 10_000_000, n),
+        }, index=dates)
+        return df.loc[df.index < pd.Timestamp(end_date)]
+
+    def _minutes(self, ticker, daily):
+        """
+        One-minute bars for every day of `daily`.
+        """
+        ticker_seed = zlib.crc32(ticker.encode())
+        n_days, m = len(daily), 390
+        shocks = np.empty((n_days, 2, m))
+        for i, day in enumerate(daily.index):
+            rng = np.random.default_rng([self.seed, ticker_seed, 2, int(day.value // 86_400_000_000_000)])
+            shocks[i] = rng.standard_normal((2, m))
+
+        # Random walk pinned to the day's open and close (Brownian bridge)
+        day_open = daily['Open'].to_numpy()[:, None]
+        day_close = daily['Close'].to_numpy()[:, None]
+        path = np.cumsum(0.0005 * shocks[:, 0], axis=1)
+        t = np.arange(1, m + 1) / m
+        close = day_open * np.exp(path - t * path[:, -1:] + t * np.log(day_close / day_open))
+        open_ = np.concatenate((day_open, close[:, :-1]), axis=1)
+        spread = np.abs(0.0003 * shocks[:, 1])
+        volume = np.repeat(daily['Volume'].to_numpy() // m, m)
+
+        session = np.timedelta64(570, 'm') + np.arange(m) * np.timedelta64(1, 'm')
+        index = (daily.index.to_numpy().astype('datetime64[ns]')[:, None] + session).ravel()
+        return pd.DataFrame({
+            'Open': open_.ravel(),
+            'High': (np.maximum(open_, close) * (1 + spread)).ravel(),
+            'Low': (np.minimum(open_, close) * (1 - spread)).ravel(),
+            'Close': close.ravel(),
+            'Volume': volume,
+        }, index=pd.DatetimeIndex(index, name=daily.index.name))
@@ -0,0 +1,188 @@
+import datetime
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Column name -> dtype of the arrays backing a BacktestResult
+COLUMNS = {
+    'Date': 'datetime64[ns]',
+    'Cash': np.float64,
+    'Holdings': np.float64,
+    'Portfolio Value': np.float64,
+    'Position': np.int64,
+}
+
+
+class BacktestResult:
+    def __init__(self, capacity=1024, path=None, tz=None):
+        """
+        Initialize a BacktestResult.
+
+        Results are written into preallocated typed columns (datetime64 dates,
+        float64 values, int64 positions) instead of per-bar dicts, so a row
+        costs 40 bytes. With `path`, the columns are memory-mapped `.npy`
+        files in that directory and very long runs never need to fit in RAM.
+        Capacity doubles when it runs out. Timezone-aware dates are stored as
+        UTC and converted back to their timezone by `to_frame`.
+
+        Args:
+            capacity (int): Rows to preallocate.
+            path (str, optional): Directory for memory-mapped output.
+            tz (str or tzinfo, optional): Timezone of the dates. Set from the
+                first dates written when not given.
+        """
+        self.path = path
+        self.tz = tz
+        self.length = 0
+        if path is not None and not os.path.exists(path):
+            os.makedirs(path)
+        self.arrays = {name: self._allocate(name, max(int(capacity), 1)) for name in COLUMNS}
+
+    @classmethod
+    def from_records(cls, records, capacity=1024, path=None):
+        """
+        Collect the records of `Backtester.stream` into typed columns.
+
+        Args:
+            records (iterable): Dicts with the keys of COLUMNS.
+            capacity (int): Initial capacity.
+            path (str, optional): Directory for memory-mapped output.
+
+        Returns:
+            BacktestResult: Result holding every record.
+        """
+        result = cls(capacity, path)
+        for record in records:
+            result.append(record['Date'], record['Cash'], record['Holdings'],
+                          record['Portfolio Value'], record['Position'])
+        result.flush()
+        return result
+
+    @classmethod
+    def open(cls, path):
+        """
+        Open a result previously flushed to `path`, memory-mapped read-only.
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        result = cls.__new__(cls)
+        result.path = path
+        result.tz = meta.get('tz')
+        result.length = meta['length']
+        result.arrays = {
+            name: np.load(result._column_path(name), mmap_mode='r')
+            for name in COLUMNS
+        }
+        return result
+
+    def __len__(self):
+        return self.length
+
+    def reserve(self, n_rows):
+        """
+        Make room for `n_rows` rows in total.
+        """
+        capacity = len(self.arrays['Date'])
+        if n_rows <= capacity:
+            return
+        while capacity < n_rows:
+            capacity *= 2
+        for name, old in self.arrays.items():
+            new = self._allocate(name, capacity, suffix='.tmp')
+            new[:self.length] = old[:self.length]
+            if self.path is not None:
+                new.flush()
+                del old
+                os.replace(self._column_path(name) + '.tmp', self._column_path(name))
+            self.arrays[name] = new
+
+    def add_rows(self, n_rows):
+        """
+        Extend the result by `n_rows` rows, to be filled in place through
+        `column` views (e.g. by the vectorized engine).
+        """
+        self.reserve(self.length + n_rows)
+        self.length += n_rows
+
+    def append(self, date, cash, holdings, value, position):
+        """
+        Write one bar.
+        """
+        if self.length == len(self.arrays['Date']):
+            self.reserve(self.length + 1)
+        if not isinstance(date, (str, datetime.date, np.datetime64)):
+            raise TypeError(f"Backtest dates must be timestamps, got {type(date).__name__}.")
+        timestamp = pd.Timestamp(date)
+        if self.length == 0 and self.tz is None:
+            self.tz = timestamp.tz
+        if timestamp.tz is not None:
+            timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+        i = self.length
+        arrays = self.arrays
+        arrays['Date'][i] = timestamp.as_unit('ns').asm8
+        arrays['Cash'][i] = cash
+        arrays['Holdings'][i] = holdings
+        arrays['Portfolio Value'][i] = value
+        arrays['Position'][i] = position
+        self.length += 1
+
+    def write_dates(self, index):
+        """
+        Fill the Date column of the rows added with `add_rows` from a
+        DatetimeIndex, keeping its timezone.
+        """
+        if not isinstance(index, pd.DatetimeIndex):
+            raise TypeError(f"Backtest dates must be a DatetimeIndex, got {type(index).__name__}.")
+        if index.tz is not None:
+            self.tz = index.tz
+            index = index.tz_convert('UTC').tz_localize(None)
+        self.column('Date')[:] = index.as_unit('ns').to_numpy()
+
+    def column(self, name):
+        """
+        View of the filled rows of one column.
+        """
+        return np.asarray(self.arrays[name][:self.length])
+
+    def flush(self):
+        """
+        Write memory-mapped columns and the row count to disk.
+        """
+        if self.path is None:
+            return
+        for array in self.arrays.values():
+            if isinstance(array, np.memmap) and array.flags.writeable:
+                array.flush()
+        tmp_path = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'length': self.length, 'columns': list(COLUMNS),
+                       'tz': None if self.tz is None else str(self.tz)}, f)
+        os.replace(tmp_path, os.path.join(self.path, 'meta.json'))
+
+    def to_frame(self):
+        """
+        DataFrame view of the result, in the format of `Backtester.run`.
+
+        The columns are not copied: they share memory with this result (and
+        its files, when memory-mapped).
+        """
+        index = pd.DatetimeIndex(self.column('Date'), name='Date', copy=False)
+        if self.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self.tz)
+        return pd.DataFrame(
+            {name: self.column(name) for name in COLUMNS if name != 'Date'},
+            index=index,
+            copy=False,
+        )
+
+    def _column_path(self, name):
+        return os.path.join(self.path, name.replace(' ', '_') + '.npy')
+
+    def _allocate(self, name, capacity, suffix=''):
+        if self.path is None:
+            return np.empty(capacity, dtype=COLUMNS[name])
+        return np.lib.format.open_memmap(
+            self._column_path(name) + suffix, mode='w+', dtype=COLUMNS[name], shape=(capacity,)
+        )
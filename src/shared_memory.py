@@ -0,0 +1,274 @@
+import sys
+import threading
+from contextlib import contextmanager
+import uuid
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Column offsets are aligned to cache lines
+_ALIGN = 64
+
+# Panels attached in this process, by segment name, so tasks after the first
+# one reuse the mapping
+_ATTACHED = {}
+_LOCK = threading.Lock()
+_TRACKER_LOCK = threading.Lock()
+
+
+class PanelHandle:
+    """
+    Picklable description of a published panel: the segment name and the
+    layout of its columns. Sending it to a worker costs a few hundred bytes,
+    whatever the size of the data.
+    """
+
+    __slots__ = ('name', 'n_rows', 'columns', 'index')
+
+    def __init__(self, name, n_rows, columns, index):
+        self.name = name
+        self.n_rows = n_rows
+        # [(column, dtype string, byte offset)]
+        self.columns = columns
+        # ('datetime', offset, name, tz), ('array', dtype string, offset, name) or ('object', pd.Index)
+        self.index = index
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+    def attach(self):
+        return SharedPanel.attach(self)
+
+    def __repr__(self):
+        return f"PanelHandle('{self.name}', rows={self.n_rows}, columns={len(self.columns)})"
+
+
+class SharedPanel:
+    def __init__(self, shm, handle, owner):
+        """
+        A DataFrame's columns and index in one shared memory segment.
+
+        Use `publish` in the parent process and `attach` (or
+        `handle.attach()`) in workers; do not call the constructor directly.
+        Every view handed out is read-only. The publishing process unlinks
+        the segment when the panel is closed, garbage collected or the
+        interpreter exits; if it crashes, the multiprocessing resource
+        tracker unlinks it instead.
+        """
+        self.handle = handle
+        self.owner = owner
+        self._shm = shm
+        self._finalizer = weakref.finalize(self, _release, shm, owner)
+
+    @classmethod
+    def publish(cls, df, name=None):
+        """
+        Copy a DataFrame with numeric (or datetime) columns into a new segment.
+
+        Args:
+            df (pd.DataFrame): Data to share, e.g. cleaned OHLCV plus features.
+            name (str, optional): Segment name. Defaults to a unique name.
+
+        Returns:
+            SharedPanel: The owning panel.
+        """
+        layout = []
+        offset = 0
+        arrays = []
+        for column in df.columns:
+            values = df[column].to_numpy()
+            if not _shareable(values):
+                raise TypeError(f"Column '{column}' has dtype {values.dtype}; only numeric columns can be shared.")
+            layout.append((column, values.dtype.str, offset))
+            arrays.append(values)
+            offset += _aligned(values.nbytes)
+
+        index = df.index
+        index_offset = offset
+        if isinstance(index, pd.DatetimeIndex):
+            index_values = index.as_unit('ns').asi8
+            index_layout = ('datetime', index_offset, index.name, None if index.tz is None else str(index.tz))
+        elif index.dtype.kind in 'biuf':
+            index_values = index.to_numpy()
+            index_layout = ('array', index_values.dtype.str, index_offset, index.name)
+        else:
+            # Small or non-numeric index (e.g. ticker labels): sent with the handle
+            index_values = None
+            index_layout = ('object', index)
+        if index_values is not None:
+            offset += _aligned(index_values.nbytes)
+
+        shm = shared_memory.SharedMemory(name=name or f'quant_{uuid.uuid4().hex[:16]}', create=True, size=max(offset, 1))
+        handle = PanelHandle(shm.name, len(df), layout, index_layout)
+        panel = cls(shm, handle, owner=True)
+        for (column, dtype, start), values in zip(layout, arrays):
+            np.copyto(panel._view(dtype, start, writeable=True), values)
+        if index_values is not None:
+            np.copyto(panel._view(index_values.dtype.str, index_offset, writeable=True), index_values)
+        return panel
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Attach to a published panel by handle (cached per process).
+
+        Args:
+            handle (PanelHandle or SharedPanel): Handle from the publisher.
+
+        Returns:
+            SharedPanel: A non-owning panel with read-only views.
+        """
+        if isinstance(handle, SharedPanel):
+            return handle
+        with _LOCK:
+            panel = _ATTACHED.get(handle.name)
+            if panel is None:
+                panel = _ATTACHED[handle.name] = cls(_open_untracked(handle.name), handle, owner=False)
+            return panel
+
+    def _view(self, dtype, offset, writeable=False):
+        view = np.ndarray(self.handle.n_rows, dtype=np.dtype(dtype), buffer=self._shm.buf, offset=offset)
+        view.flags.writeable = writeable
+        return view
+
+    def array(self, column):
+        """
+        Read-only NumPy view of one column.
+        """
+        for name, dtype, offset in self.handle.columns:
+            if name == column:
+                return self._view(dtype, offset)
+        raise KeyError(column)
+
+    @property
+    def index(self):
+        layout = self.handle.index
+        if layout[0] == 'datetime':
+            _, offset, name, tz = layout
+            index = pd.DatetimeIndex(self._view('<i8', offset).view('datetime64[ns]'), name=name, copy=False)
+            return index if tz is None else index.tz_localize('UTC').tz_convert(tz)
+        if layout[0] == 'array':
+            _, dtype, offset, name = layout
+            return pd.Index(self._view(dtype, offset), name=name, copy=False)
+        return layout[1]
+
+    def frame(self):
+        """
+        DataFrame over the shared columns, without copying them.
+        """
+        columns = {name: self._view(dtype, offset) for name, dtype, offset in self.handle.columns}
+        return pd.DataFrame(columns, index=self.index, copy=False)
+
+    @property
+    def nbytes(self):
+        return self._shm.size
+
+    def close(self):
+        """
+        Unmap the segment, and unlink it if this process published it.
+        """
+        self._finalizer()
+        with _LOCK:
+            if _ATTACHED.get(self.handle.name) is self:
+                del _ATTACHED[self.handle.name]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+@contextmanager
+def shared(df):
+    """
+    Publish `df` for worker processes for the duration of the block.
+
+    Yields:
+        PanelHandle or pd.DataFrame: A handle to send to workers (resolve it
+            there with `as_frame`), or `df` itself when it has non-numeric
+            columns and has to be pickled as before (or None for None).
+    """
+    # Same test as `publish`: tz-aware and nullable columns become object arrays
+    if df is None or not all(_shareable(df[column].to_numpy()) for column in df.columns):
+        yield df
+        return
+    with SharedPanel.publish(df) as panel:
+        yield panel.handle
+
+
+def as_frame(data):
+    """
+    DataFrame for worker inputs that may be a PanelHandle or a plain DataFrame.
+    """
+    if isinstance(data, PanelHandle):
+        return SharedPanel.attach(data).frame()
+    return data
+
+
+def _shareable(values):
+    """
+    Whether an array can be copied into a segment (numeric, bool or naive datetime).
+    """
+    return values.dtype.kind in 'biufM'
+
+
+def _aligned(n_bytes):
+    return -(-n_bytes // _ALIGN) * _ALIGN
+
+
+def _open_untracked(name):
+    """
+    Attach to an existing segment without registering it with this process's
+    resource tracker: a tracker of a process that did not create the segment
+    would unlink it when that process exits.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    with _TRACKER_LOCK:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _release(shm, owner):
+    if owner:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    try:
+        shm.close()
+    except BufferError:
+        # Views of the segment are still alive; the mapping is freed with them
+        pass
+
+
+if __name__ == "__main__":
+    # Test: publish a feature frame and read it back in a worker process
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .features import FeatureEngineer
+    from .providers import SyntheticProvider
+
+    def _mean_close(handle):
+        return float(handle.attach().array('close').mean())
+
+    raw = SyntheticProvider().download('SPY', '2000-01-01', '2024-01-01')
+    raw.columns = [c.lower() for c in raw.columns]
+    data = FeatureEngineer().add_features(raw).dropna()
+
+    with SharedPanel.publish(data) as panel:
+        print(f"Published {panel.handle} ({panel.nbytes / 1024 ** 2:.1f} MB)")
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            means = executor.submit(_mean_close, panel.handle).result()
+        print(f"Mean close in worker: {means:.4f} (parent: {data['close'].mean():.4f})")
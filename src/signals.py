@@ -0,0 +1,217 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class SignalCache:
+    def __init__(self, max_entries=256):
+        """
+        In-memory LRU cache of strategy signal arrays.
+
+        Entries are keyed by the strategy class, its `signal_params()` and a
+        fingerprint of the index and of the columns it reads
+        (`signal_columns()`), so adding unrelated feature columns to the data
+        does not invalidate them. Strategies whose `signal_params()` is None
+        are never cached.
+
+        A lookup hashes the columns the strategy reads (about 0.1 ms per
+        column of 6k rows), so the cache pays off for strategies that cost
+        more than that, such as MLStrategy predictions.
+
+        Args:
+            max_entries (int): Signal arrays kept before the least recently
+                used one is evicted.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, data, strategy, digests=None):
+        """
+        Cache key for `strategy` on `data`, or None when it cannot be cached.
+
+        Args:
+            data (pd.DataFrame): Feature data.
+            strategy (Strategy): Strategy instance.
+            digests (FrameDigests, optional): Column hashes of `data`, shared
+                when keying many strategies on the same frame.
+        """
+        params = strategy.signal_params()
+        if params is None:
+            return None
+        columns = strategy.signal_columns()
+        if columns is None:
+            columns = list(data.columns)
+        elif any(column not in data.columns for column in columns):
+            # Let the strategy raise its own error
+            return None
+        digests = digests or FrameDigests(data)
+
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f'{type(strategy).__module__}.{type(strategy).__qualname__}'.encode())
+        h.update(json.dumps(params, sort_keys=True, default=str).encode())
+        h.update(digests.index())
+        for column in columns:
+            h.update(str(column).encode())
+            h.update(digests.column(column))
+        return h.hexdigest()
+
+    def get(self, key):
+        """
+        Cached signal array for `key` (read-only), or None.
+        """
+        signals = self._entries.get(key)
+        if signals is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return signals
+
+    def put(self, key, signals):
+        signals = np.array(signals, dtype=np.int8)
+        signals.flags.writeable = False
+        self._entries[key] = signals
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return signals
+
+    def get_or_compute(self, data, strategy):
+        """
+        Return `strategy.signal_array(data)`, using the cache when possible.
+
+        Returns:
+            np.ndarray: int8 target positions, one per row of `data`.
+        """
+        key = self.key(data, strategy)
+        if key is None:
+            return strategy.signal_array(data)
+        signals = self.get(key)
+        if signals is None:
+            signals = self.put(key, strategy.signal_array(data))
+        return signals
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        """
+        Cache statistics.
+
+        Returns:
+            dict: entries, hits and misses.
+        """
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class FrameDigests:
+    def __init__(self, data):
+        """
+        Lazily computed hashes of a frame's index and columns, each computed
+        at most once.
+        """
+        self.data = data
+        self._index = None
+        self._columns = {}
+
+    def index(self):
+        if self._index is None:
+            index = self.data.index
+            if isinstance(index, pd.DatetimeIndex):
+                # Hash the stored integers with their unit instead of converting to ns
+                h = hashlib.blake2b(np.ascontiguousarray(index.asi8), digest_size=16)
+                h.update(f'{index.unit}{index.tz}'.encode())
+            else:
+                h = hashlib.blake2b(pd.util.hash_array(np.asarray(index)), digest_size=16)
+            self._index = h.digest()
+        return self._index
+
+    def column(self, name):
+        digest = self._columns.get(name)
+        if digest is None:
+            values = self.data[name].to_numpy()
+            if values.dtype.kind in 'biuf':
+                h = hashlib.blake2b(np.ascontiguousarray(values), digest_size=16)
+                # Equal bytes in different dtypes are different data
+                h.update(values.dtype.str.encode())
+            else:
+                h = hashlib.blake2b(pd.util.hash_array(values), digest_size=16)
+            digest = self._columns[name] = h.digest()
+        return digest
+
+
+def signal_matrix(data, strategies, cache=None, labels=None):
+    """
+    Evaluate many strategies on the same data in one call.
+
+    Strategies are grouped by class and each group is computed with the
+    class's `batch_signal_arrays`, which can share work between parameter
+    sets (e.g. MACrossoverStrategy converts every SMA column once).
+
+    Args:
+        data (pd.DataFrame): Feature data shared by all strategies.
+        strategies (list): Strategy instances.
+        cache (SignalCache, optional): Reuse and store signals per strategy.
+        labels (list, optional): Column labels. Defaults to 0..n-1.
+
+    Returns:
+        pd.DataFrame: int8 target positions (dates x strategies), ready for
+            `Backtester.run_batch`.
+    """
+    strategies = list(strategies)
+    # Column-major, so each strategy's signals are contiguous
+    matrix = np.empty((len(data), len(strategies)), dtype=np.int8, order='F')
+    digests = FrameDigests(data) if cache is not None else None
+
+    pending = {}
+    for j, strategy in enumerate(strategies):
+        key = cache.key(data, strategy, digests) if cache is not None else None
+        signals = cache.get(key) if key is not None else None
+        if signals is not None:
+            matrix[:, j] = signals
+        else:
+            pending.setdefault(type(strategy), []).append((j, strategy, key))
+
+    for kind, group in pending.items():
+        block = kind.batch_signal_arrays(data, [strategy for _, strategy, _ in group])
+        for (j, _, key), signals in zip(group, block.T):
+            matrix[:, j] = signals
+            if key is not None:
+                cache.put(key, signals)
+
+    columns = pd.Index(labels if labels is not None else range(len(strategies)))
+    return pd.DataFrame(matrix, index=data.index, columns=columns, copy=False)
+
+
+if __name__ == "__main__":
+    # Test: a grid of MA crossovers as one signal matrix, then cached
+    import time
+
+    from .backtester import Backtester
+    from .features import FeatureEngineer
+    from .providers import SyntheticProvider
+    from .strategies import MACrossoverStrategy
+
+    raw = SyntheticProvider().download('SPY', '2000-01-01', '2024-01-01')
+    raw.columns = [c.lower() for c in raw.columns]
+    windows = range(10, 260, 10)
+    data = FeatureEngineer(sma_windows=windows).add_features(raw).dropna()
+    strategies = [MACrossoverStrategy(s, l) for s in windows for l in windows if s < l]
+    labels = [f'{s.short_window}/{s.long_window}' for s in strategies]
+
+    cache = SignalCache(max_entries=1000)
+    for attempt in ('cold', 'cached'):
+        started = time.perf_counter()
+        signals = signal_matrix(data, strategies, cache=cache, labels=labels)
+        print(f"{attempt}: {signals.shape} int8 matrix in {(time.perf_counter() - started) * 1e3:.1f}ms")
+    print(cache.stats())
+
+    started = time.perf_counter()
+    results = Backtester().run_batch(data, signals)
+    print(f"Backtested {signals.shape[1]} strategies in {(time.perf_counter() - started) * 1e3:.1f}ms")
+    print(results['Portfolio Value'].iloc[-1].sort_values(ascending=False).head())
@@ -0,0 +1,173 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnarStore:
+    def __init__(self, root, timezone='America/New_York'):
+        """
+        Initialize the per-ticker columnar store.
+
+        Each ticker lives in its own directory with one memory-mappable `.npy`
+        file per column, an int64 nanosecond index and a `meta.json` that
+        records the column names and the date ranges already downloaded.
+
+        Args:
+            root (str): Directory holding the ticker directories.
+            timezone (str): Exchange timezone. Timezone-aware data (e.g.
+                intraday bars from Yahoo) is stored as naive wall-clock time
+                in this timezone, the convention of the rest of the store.
+        """
+        self.root = root
+        self.timezone = timezone
+        if not os.path.exists(root):
+            os.makedirs(root)
+
+    def _ticker_dir(self, ticker):
+        return os.path.join(self.root, ticker)
+
+    def _read_meta(self, ticker):
+        meta_path = os.path.join(self._ticker_dir(ticker), 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def coverage(self, ticker):
+        """
+        Date ranges already stored for a ticker.
+
+        Returns:
+            list: Sorted, non-overlapping [start, end) pairs of pd.Timestamp.
+        """
+        meta = self._read_meta(ticker)
+        if meta is None:
+            return []
+        return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in meta['coverage']]
+
+    def missing_ranges(self, ticker, start_date, end_date):
+        """
+        Sub-ranges of [start_date, end_date) not covered by the store.
+
+        Returns:
+            list: [start, end) pairs of pd.Timestamp that still need downloading.
+        """
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        gaps = []
+        cursor = start
+        for covered_start, covered_end in self.coverage(ticker):
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+        if cursor < end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def load(self, ticker, start_date=None, end_date=None):
+        """
+        Load a date slice of a ticker without copying the column data.
+
+        The returned frame is backed by read-only memory maps; call `.copy()`
+        before modifying values in place.
+
+        Args:
+            ticker (str): Stock ticker symbol.
+            start_date (str, optional): Inclusive start date.
+            end_date (str, optional): Exclusive end date.
+
+        Returns:
+            pd.DataFrame: Stored data in the range, or None if the ticker is unknown.
+        """
+        meta = self._read_meta(ticker)
+        if meta is None:
+            return None
+        ticker_dir = self._ticker_dir(ticker)
+
+        index = np.load(os.path.join(ticker_dir, 'index.npy'), mmap_mode='r')
+        lo = 0 if start_date is None else np.searchsorted(index, pd.Timestamp(start_date).value, side='left')
+        hi = len(index) if end_date is None else np.searchsorted(index, pd.Timestamp(end_date).value, side='left')
+
+        columns = {
+            # np.asarray drops the memmap subclass but keeps the mapped buffer
+            name: np.asarray(np.load(os.path.join(ticker_dir, f'col_{i}.npy'), mmap_mode='r')[lo:hi])
+            for i, name in enumerate(meta['columns'])
+        }
+        dates = pd.DatetimeIndex(index[lo:hi].view('datetime64[ns]'), name=meta['index_name'])
+        return pd.DataFrame(columns, index=dates, copy=False)
+
+    def write(self, ticker, df, start_date, end_date):
+        """
+        Merge new rows into a ticker and mark [start_date, end_date) as covered.
+
+        Rows in `df` replace stored rows with the same timestamp.
+
+        Args:
+            ticker (str): Stock ticker symbol.
+            df (pd.DataFrame): Date-indexed data downloaded for the range,
+                naive or timezone-aware.
+            start_date (str): Inclusive start of the downloaded range.
+            end_date (str): Exclusive end of the downloaded range.
+        """
+        ticker_dir = self._ticker_dir(ticker)
+        if not os.path.exists(ticker_dir):
+            os.makedirs(ticker_dir)
+
+        if getattr(df.index, 'tz', None) is not None:
+            df = df.tz_convert(self.timezone).tz_localize(None)
+
+        existing = self.load(ticker)
+        if df.empty and existing is not None:
+            # A range without bars (e.g. only holidays): just record its coverage
+            merged = existing
+        else:
+            if existing is not None and not existing.empty:
+                merged = pd.concat([existing, df])
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            else:
+                merged = df.sort_index()
+
+            index = pd.DatetimeIndex(merged.index).as_unit('ns').asi8
+            # Each file is written under a temporary name and swapped in, so a crash
+            # never leaves a truncated array behind
+            self._save_array(ticker_dir, 'index.npy', index)
+            for i, name in enumerate(merged.columns):
+                self._save_array(ticker_dir, f'col_{i}.npy', merged[name].to_numpy())
+
+        coverage = self.coverage(ticker) + [(pd.Timestamp(start_date), pd.Timestamp(end_date))]
+        meta = {
+            'columns': [str(c) for c in merged.columns],
+            'index_name': merged.index.name,
+            'coverage': [[s.isoformat(), e.isoformat()] for s, e in _merge_ranges(coverage)],
+        }
+        tmp_path = os.path.join(ticker_dir, 'meta.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(ticker_dir, 'meta.json'))
+
+    @staticmethod
+    def _save_array(directory, name, values):
+        tmp_path = os.path.join(directory, name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(values))
+        os.replace(tmp_path, os.path.join(directory, name))
+
+
+def _merge_ranges(ranges):
+    """
+    Merge overlapping or touching [start, end) ranges.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
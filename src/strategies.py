@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
+import copy
+import uuid
+import weakref
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
+
+from .features import StreamingFeatureEngineer
+from .inference import CompiledForest
+from .profiling import profiled
 
 class Strategy(ABC):
     @abstractmethod
@@ -19,54 +23,216 @@ class Strategy(ABC):
         """
         pass
 
+    def signal_params(self):
+        """
+        Parameters that determine the signals, used in `SignalCache` keys.
+        None (the default) means the signals cannot be cached, e.g. because
+        they depend on a fitted model.
+        """
+        return None
+
+    def signal_columns(self):
+        """
+        Columns of the data the signals depend on. None means all of them.
+        """
+        return None
+
+    def signal_array(self, data):
+        """
+        Target positions as a compact int8 array, one per row of `data`.
+        
+        The default converts `generate_signals`. Missing signals (NaN) become
+        -1, which the backtester treats like any value other than 0 and 1:
+        keep the current position.
+        
+        Args:
+            data (pd.DataFrame): DataFrame with features.
+            
+        Returns:
+            np.ndarray: int8 signals.
+            
+        Raises:
+            ValueError: If a signal is not -1, 0, 1 or NaN (e.g. a 0.5
+                weight, which int8 would silently turn into 0).
+        """
+        signals = self.generate_signals(data)
+        if isinstance(signals, pd.Series) and not signals.index.equals(data.index):
+            signals = signals.loc[data.index]
+        values = np.asarray(signals)
+        if values.dtype.kind == 'f':
+            values = np.where(np.isnan(values), -1, values)
+        _check_signals(values)
+        return values.astype(np.int8)
+
+    @classmethod
+    def batch_signal_arrays(cls, data, strategies):
+        """
+        Signals of several instances of this class on the same data.
+        
+        Subclasses override this to share work between parameter sets; see
+        `signals.signal_matrix`.
+        
+        Returns:
+            np.ndarray: int8 array of shape (rows, strategies).
+        """
+        block = np.empty((len(data), len(strategies)), dtype=np.int8, order='F')
+        for j, strategy in enumerate(strategies):
+            block[:, j] = strategy.signal_array(data)
+        return block
+
+    def start_stream(self):
+        """
+        Reset the incremental state used by `on_bar` before a new stream.
+        """
+        pass
+
+    def on_bar(self, date, bar):
+        """
+        Incremental signal for streaming backtests and paper trading.
+        
+        Args:
+            date (pd.Timestamp): Bar date.
+            bar (dict): Bar values with lowercase OHLCV keys.
+            
+        Returns:
+            int: Target position for this bar (1: Long, 0: Cash).
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming.")
+
+    def generate_weights(self, panel):
+        """
+        Generate target portfolio weights for several tickers.
+
+        Each ticker gets its long/flat signal from `generate_signals`, and
+        capital is split equally across the tickers that are long on a bar.
+
+        Args:
+            panel (dict): Mapping of ticker -> DataFrame with features.
+
+        Returns:
+            pd.DataFrame: Target weights (dates x tickers), rows sum to 1 or 0.
+        """
+        signals = pd.DataFrame(
+            {ticker: self.generate_signals(data) for ticker, data in panel.items()}
+        )
+        longs = (signals == 1).astype(float)
+        n_longs = longs.sum(axis=1)
+        return longs.div(n_longs.where(n_longs > 0, 1), axis=0)
+
 class MACrossoverStrategy(Strategy):
     def __init__(self, short_window=50, long_window=200):
         self.short_window = short_window
         self.long_window = long_window
 
+    @profiled('MACrossoverStrategy.generate_signals')
     def generate_signals(self, data):
         """
         Buy when Short MA > Long MA.
         Sell when Short MA < Long MA.
         """
-        signals = pd.Series(0, index=data.index)
-        
-        # Check if features exist, else compute them (assuming data has 'close') or rely on existing columns
-        short_col = f'SMA_{self.short_window}'
-        long_col = f'SMA_{self.long_window}'
-        
-        if short_col not in data.columns or long_col not in data.columns:
-            # Fallback if not pre-computed (though we assume features.py did it)
-            # For simplicity, we assume they attend
-             raise ValueError(f"Columns {short_col} and {long_col} required.")
-        
-        # Generate signal: 1 if Short > Long, -1 if Short < Long
-        # We transform this to 1 (Long position) and 0 (Cash/Neutral) or -1 (Short)
-        # For this backtest, let's assume Long-Only or Long/Short.
-        # Let's simple model: Hold (1) when SMA_S > SMA_L else Cash (0)
-        
         # The signal represents the TARGET POSITION.
         # 1 = "I want to be long"
         # 0 = "I want to be in cash"
+        return pd.Series(self.signal_array(data), index=data.index)
+
+    def signal_params(self):
+        return {'short_window': self.short_window, 'long_window': self.long_window}
+
+    def signal_columns(self):
+        return [f'SMA_{self.short_window}', f'SMA_{self.long_window}']
+
+    def signal_array(self, data):
+        return self.batch_signal_arrays(data, [self])[:, 0]
+
+    @classmethod
+    def batch_signal_arrays(cls, data, strategies):
+        """
+        Hold (1) when SMA_short > SMA_long, else cash (0), for every
+        strategy at once. Each SMA column is converted to NumPy once, however
+        many window pairs use it, and the comparisons are written straight
+        into one int8 block.
+        """
+        pairs = [strategy.signal_columns() for strategy in strategies]
+        needed = list(dict.fromkeys(column for pair in pairs for column in pair))
+        missing = [column for column in needed if column not in data.columns]
+        if missing:
+            raise ValueError(f"Columns {', '.join(missing)} required.")
         
-        signals[data[short_col] > data[long_col]] = 1
-        signals[data[short_col] <= data[long_col]] = 0
-        
-        # Convert position signal to trade signal (diff) if needed by backtester,
-        # but usually strategies return the Desired Position.
-        # Let's return Desired Position.
-        return signals
+        columns = {column: data[column].to_numpy() for column in needed}
+        block = np.empty((len(data), len(strategies)), dtype=np.int8, order='F')
+        # int8 and bool have the same layout, so the comparison writes 0/1 directly
+        flags = block.view(np.bool_)
+        for j, (short_col, long_col) in enumerate(pairs):
+            np.greater(columns[short_col], columns[long_col], out=flags[:, j])
+        return block
+
+    def start_stream(self):
+        self.stream_features = StreamingFeatureEngineer(sma_windows=(self.short_window, self.long_window))
+
+    def on_bar(self, date, bar):
+        """
+        Same rule as `generate_signals`, with the SMAs updated in O(1) per bar.
+        """
+        features = self.stream_features.update(bar)
+        return int(features[f'SMA_{self.short_window}'] > features[f'SMA_{self.long_window}'])
+
+class PrecomputedSignalStrategy(Strategy):
+    def __init__(self, signals):
+        """
+        Replay signals computed elsewhere (e.g. stitched walk-forward predictions).
+
+        Args:
+            signals (pd.Series): Date-indexed target positions.
+        """
+        _check_signals(signals.dropna().to_numpy())
+        self.signals = signals
+
+    def generate_signals(self, data):
+        """
+        Signals aligned to `data`; dates without a signal stay in cash.
+        """
+        return self.signals.reindex(data.index).fillna(0).astype(int)
+
+    def on_bar(self, date, bar):
+        signal = self.signals.get(date, 0)
+        return 0 if pd.isna(signal) else int(signal)
+
+def _check_signals(values):
+    """
+    Raise ValueError unless every value is a -1, 0 or 1 signal.
+    """
+    invalid = ~np.isin(values, (-1, 0, 1))
+    if invalid.any():
+        raise ValueError(f"Signals must be -1, 0 or 1, got {values[invalid][0]!r}.")
+
+def _random_forest(**params):
+    # sklearn takes about a second to import; load it only when a model is built
+    from sklearn.ensemble import RandomForestClassifier
+
+    return RandomForestClassifier(**params)
+
+# Signal cache tokens for fitted models, unique for as long as the model
+# object lives (unlike id(), which is reused after garbage collection)
+_MODEL_TOKENS = weakref.WeakKeyDictionary()
+
+def _model_token(model):
+    token = _MODEL_TOKENS.get(model)
+    if token is None:
+        token = _MODEL_TOKENS[model] = uuid.uuid4().hex
+    return token
 
 class MLStrategy(Strategy):
-    def __init__(self, features=['RSI', 'MACD', 'Volatility_20', 'Log_Return']):
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+    def __init__(self, features=['RSI', 'MACD', 'Volatility_20', 'Log_Return'], n_estimators=100, random_state=42):
+        self.params = {'n_estimators': n_estimators, 'random_state': random_state}
+        self.model = _random_forest(**self.params)
         self.features = features
+        self.trained_until = None
 
-    def train_model(self, data):
+    def _training_set(self, df):
         """
-        Train the model to predict next day's return sign.
+        Features and next-day direction target for the rows of `df`.
         """
-        df = data.copy().dropna()
+        df = df.copy()
         
         # Target: 1 if Close moves up tomorrow, 0 otherwise
         df['Target'] = (df['close'].shift(-1) > df['close']).astype(int)
@@ -74,13 +240,163 @@ class MLStrategy(Strategy):
         # Drop last row as it has no target
         df = df.dropna()
         
-        X = df[self.features]
-        y = df['Target']
+        return df[self.features], df['Target']
+
+    @profiled('MLStrategy.train_model')
+    def train_model(self, data, store=None, n_new_trees=20):
+        """
+        Train the model to predict next day's return sign.
+        
+        Args:
+            data (pd.DataFrame): Training data with features and 'close'.
+            store (ModelStore, optional): Cache of trained models. An identical
+                earlier training run is loaded instead of refit; a model trained
+                on a prefix of `data` is warm-started with trees for the new rows.
+            n_new_trees (int): Trees added when warm-starting from a prefix.
+        """
+        df = data.dropna()
+        
+        if store is not None:
+            key = store.key(self.features, self.params, df)
+            model = store.load(key)
+            if model is not None:
+                self.model = model
+                self.trained_until = df.index[-1]
+                print("Model loaded from cache.")
+                return
+            
+            prefix_key, n_rows = store.find_prefix(self.features, self.params, df)
+            if prefix_key is not None:
+                self.model = store.load(prefix_key)
+                self.trained_until = df.index[n_rows - 1]
+                self.update_model(df, n_new_trees=n_new_trees)
+                store.save(key, self.model, df)
+                return
+        
+        X, y = self._training_set(df)
         
         # Train/Test logic could be external, but here we just train on provided data
+        self.model = _random_forest(**self.params)
         self.model.fit(X, y)
+        self.trained_until = df.index[-1]
         print("Model trained.")
+        
+        if store is not None:
+            store.save(key, self.model, df)
+
+    @profiled('MLStrategy.update_model')
+    def update_model(self, data, n_new_trees=20):
+        """
+        Add trees fitted on the rows appended since the last training run,
+        keeping the existing trees (warm start) instead of refitting the forest.
+        
+        Args:
+            data (pd.DataFrame): Full history including the new rows.
+            n_new_trees (int): Number of trees to add.
+        """
+        # Start one row early: that row's target needed the first new close
+        new_rows = data.loc[data.index >= self.trained_until].dropna()
+        X, y = self._training_set(new_rows)
+        if y.nunique() < 2:
+            print("Not enough new data to update the model.")
+            return
+        
+        # Copy first: the fitted forest may be shared, e.g. by a ModelStore
+        self.model = copy.deepcopy(self.model)
+        self.model.set_params(warm_start=True, n_estimators=len(self.model.estimators_) + n_new_trees)
+        self.model.fit(X, y)
+        self.model.set_params(warm_start=False)
+        self.trained_until = new_rows.index[-1]
+        print(f"Model updated with {n_new_trees} trees on {len(X)} new rows.")
+
+    def signal_params(self):
+        """
+        Feature names and the identity of the fitted model: retraining (or
+        warm-starting) replaces the model object and so the cache key.
+        Refitting `self.model` in place is not detected.
+        """
+        return {'features': list(self.features), 'model': _model_token(self.model)}
+
+    def signal_columns(self):
+        return list(self.features)
+
+    def compiled_model(self):
+        """
+        Array-based copy of the fitted forest for low-latency scoring,
+        rebuilt whenever the model has been retrained.
+        """
+        if getattr(self, '_compiled_for', None) is not self.model:
+            self._compiled = CompiledForest(self.model)
+            self._compiled_for = self.model
+        return self._compiled
+
+    def predict_rows(self, rows):
+        """
+        Score a single row or a small batch without sklearn's per-call overhead.
+        
+        Args:
+            rows (pd.DataFrame, pd.Series or np.ndarray): Feature values, in
+                `self.features` order for arrays.
+            
+        Returns:
+            np.ndarray: Predicted signals (0: Cash, 1: Long), one per row.
+        """
+        if isinstance(rows, pd.Series):
+            rows = rows[self.features].to_numpy(dtype=np.float64)[None, :]
+        elif isinstance(rows, pd.DataFrame):
+            rows = rows[self.features].to_numpy(dtype=np.float64)
+        X = np.nan_to_num(np.atleast_2d(np.asarray(rows, dtype=np.float64)))
+        return self.compiled_model().predict(X)
+
+    def predict_latest(self, frames):
+        """
+        Score the newest bar of many tickers in one batched call.
+        
+        Args:
+            frames (dict): Mapping of ticker -> feature DataFrame.
+            
+        Returns:
+            pd.Series: Signal per ticker.
+        """
+        tickers = list(frames)
+        X = np.array([frames[ticker][self.features].iloc[-1].to_numpy(dtype=np.float64) for ticker in tickers])
+        return pd.Series(self.predict_rows(X.reshape(len(tickers), len(self.features))), index=tickers)
+
+    def start_stream(self):
+        self.stream_features = StreamingFeatureEngineer()
+
+    def on_bar(self, date, bar):
+        """
+        Update the streaming features with the new bar and score it with the
+        compiled forest. Missing features count as 0, as in `generate_signals`.
+        """
+        features = self.stream_features.update(bar)
+        row = [features.get(name, bar.get(name, np.nan)) for name in self.features]
+        return int(self.predict_rows(np.array([row], dtype=np.float64))[0])
+
+    def save_model(self, path):
+        """
+        Save the trained model with joblib.
+        """
+        import joblib
+
+        joblib.dump({'model': self.model, 'features': self.features, 'params': self.params,
+                     'trained_until': self.trained_until}, path)
+
+    @classmethod
+    def load_model(cls, path):
+        """
+        Create a strategy from a file written by `save_model`.
+        """
+        import joblib
+
+        saved = joblib.load(path)
+        strategy = cls(features=saved['features'], **saved['params'])
+        strategy.model = saved['model']
+        strategy.trained_until = saved['trained_until']
+        return strategy
 
+    @profiled('MLStrategy.generate_signals')
     def generate_signals(self, data):
         """
         Predict signals using trained model.
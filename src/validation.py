@@ -0,0 +1,223 @@
+import functools
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay, USMartinLutherKingJr,
+    USMemorialDay, USPresidentsDay, USThanksgivingDay, nearest_workday, sunday_to_monday,
+)
+
+_DAY_NS = 86_400 * 10**9
+
+
+class NYSECalendar(AbstractHolidayCalendar):
+    """
+    Full-day NYSE holidays (regular rules only; one-off closures such as
+    national days of mourning are not included).
+    """
+
+    rules = [
+        # A Saturday New Year's Day is not made up on the Friday before
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday),
+    ]
+
+
+@functools.lru_cache(maxsize=32)
+def nyse_holidays(first_year, last_year):
+    """
+    NYSE holidays from `first_year` to `last_year` as datetime64[D]
+    (generating them from the rules is slow, so results are cached).
+    """
+    holidays = NYSECalendar().holidays(pd.Timestamp(first_year, 1, 1), pd.Timestamp(last_year, 12, 31))
+    return holidays.to_numpy('datetime64[D]')
+
+
+def validate_ohlcv(df, outliers='flag', outlier_threshold=12.0, holidays=None):
+    """
+    Check and repair OHLCV bars in one vectorized pass over the arrays.
+
+    Steps, in order:
+        - sort the index once if it is not increasing, and drop duplicated
+          timestamps (keeping the last bar, as the store does);
+        - drop bars with a missing, zero or negative price;
+        - repair OHLC consistency: high becomes the largest and low the
+          smallest of the four prices;
+        - clip negative volume to 0;
+        - detect bad ticks: a close-to-close move of more than
+          `outlier_threshold` robust standard deviations (MAD of log returns)
+          that is reversed by the next bar. They are flagged in the report,
+          filled with the previous bar's close ('fill') or dropped ('drop');
+        - count trading sessions missing between the first and last bar,
+          against the weekday calendar minus `holidays`.
+
+    The result is in index order, so `ensure_sorted` in later stages returns
+    it as is. Nothing is stored in `attrs`: pandas deep-copies them on every
+    operation, which would slow down everything downstream.
+
+    Args:
+        df (pd.DataFrame): Bars with lowercase open/high/low/close(/volume)
+            columns and a DatetimeIndex.
+        outliers (str): 'flag', 'fill' or 'drop'.
+        outlier_threshold (float): Spike size in robust standard deviations.
+        holidays (array-like, optional): Exchange holidays for the gap check.
+            Defaults to the NYSE calendar.
+
+    Returns:
+        tuple: (repaired pd.DataFrame, report dict of counts and dates).
+    """
+    if outliers not in ('flag', 'fill', 'drop'):
+        raise ValueError(f"Unknown outliers mode '{outliers}'. Use 'flag', 'fill' or 'drop'.")
+    report = {'rows_in': len(df)}
+
+    # Ordering and duplicates
+    times = df.index.as_unit('ns').asi8
+    steps = np.diff(times)
+    report['unsorted'] = bool((steps < 0).any())
+    if report['unsorted']:
+        order = np.argsort(times, kind='stable')
+        df = df.iloc[order]
+        times = times[order]
+        steps = np.diff(times)
+    keep = np.ones(len(df), dtype=bool)
+    keep[:-1] = steps != 0
+    report['duplicates'] = int(len(df) - keep.sum())
+
+    price_columns = [name for name in ('open', 'high', 'low', 'close') if name in df.columns]
+    prices = np.column_stack([df[name].to_numpy(dtype=np.float64) for name in price_columns]) if price_columns else np.empty((len(df), 0))
+    valid = (prices > 0).all(axis=1) & np.isfinite(prices).all(axis=1)
+    report['invalid_prices'] = int((keep & ~valid).sum())
+    keep &= valid
+
+    if not keep.all():
+        df = df.iloc[keep]
+        prices = prices[keep]
+        times = times[keep]
+
+    # OHLC consistency
+    fixes = {}
+    report['ohlc_repaired'] = 0
+    if {'high', 'low'} <= set(price_columns):
+        high = prices.max(axis=1)
+        low = prices.min(axis=1)
+        bad = (prices[:, price_columns.index('high')] != high) | (prices[:, price_columns.index('low')] != low)
+        report['ohlc_repaired'] = int(bad.sum())
+        if bad.any():
+            fixes['high'] = high
+            fixes['low'] = low
+
+    report['negative_volume'] = 0
+    if 'volume' in df.columns:
+        volume = df['volume'].to_numpy()
+        negative = volume < 0
+        report['negative_volume'] = int(negative.sum())
+        if negative.any():
+            fixes['volume'] = np.where(negative, 0, volume).astype(volume.dtype)
+
+    # Bad ticks: an outsized move immediately reversed
+    spikes = np.zeros(len(df), dtype=bool)
+    if 'close' in price_columns and len(df) > 2:
+        close = prices[:, price_columns.index('close')]
+        returns = np.diff(np.log(close))
+        deviation = np.abs(returns - np.median(returns))
+        scale = 1.4826 * np.median(deviation)
+        if scale > 0:
+            large = deviation > outlier_threshold * scale
+            spikes[1:-1] = large[:-1] & large[1:] & (np.sign(returns[:-1]) != np.sign(returns[1:]))
+    report['outliers'] = int(spikes.sum())
+    report['outlier_dates'] = [str(date) for date in df.index[spikes]]
+    if spikes.any() and outliers == 'fill':
+        # Consecutive spikes are filled from the last good close
+        last_good = np.maximum.accumulate(np.where(spikes, 0, np.arange(len(df))))
+        fill = prices[:, price_columns.index('close')][last_good]
+        for name in price_columns:
+            column = fixes.get(name, prices[:, price_columns.index(name)])
+            fixes[name] = np.where(spikes, fill, column)
+
+    if fixes:
+        df = df.assign(**{name: values.astype(df[name].dtype, copy=False) for name, values in fixes.items()})
+    if spikes.any() and outliers == 'drop':
+        df = df.iloc[~spikes]
+        times = times[~spikes]
+
+    report.update(_session_gaps(times, holidays))
+    report['rows_out'] = len(df)
+
+    return df, report
+
+
+def _session_gaps(times, holidays=None):
+    """
+    Trading sessions missing between the first and last bar.
+    """
+    if len(times) < 2:
+        return {'missing_sessions': 0, 'gaps': []}
+    days = np.unique(times // _DAY_NS).astype('datetime64[D]')
+    if holidays is None:
+        years = days[[0, -1]].astype('datetime64[Y]').astype(int) + 1970
+        holidays = nyse_holidays(int(years[0]), int(years[1]))
+    # Sessions strictly between consecutive bar days
+    missing = np.busday_count(days[:-1] + 1, days[1:], holidays=holidays)
+    where = np.flatnonzero(missing > 0)
+    gaps = [(str(days[i]), str(days[i + 1])) for i in where]
+    return {'missing_sessions': int(missing.sum()), 'gaps': gaps}
+
+
+def ensure_sorted(df):
+    """
+    Sort by index unless it is already increasing (as after `validate_ohlcv`).
+    The check is cached on the index, so repeated calls are cheap.
+    """
+    if df.index.is_monotonic_increasing:
+        return df
+    return df.sort_index()
+
+
+def summarize(report):
+    """
+    One-line summary of the issues in a validation report.
+    """
+    labels = {
+        'unsorted': 'unsorted index', 'duplicates': 'duplicated timestamps',
+        'invalid_prices': 'bars with invalid prices', 'ohlc_repaired': 'inconsistent OHLC bars',
+        'negative_volume': 'negative volumes', 'outliers': 'bad ticks',
+        'missing_sessions': 'missing sessions',
+    }
+    issues = []
+    for key, label in labels.items():
+        value = report.get(key)
+        if value is True:
+            issues.append(label)
+        elif value:
+            issues.append(f"{value} {label}")
+    return ', '.join(issues) if issues else 'no issues'
+
+
+if __name__ == "__main__":
+    # Test: damage synthetic bars and repair them
+    import time
+
+    from .providers import SyntheticProvider
+
+    raw = SyntheticProvider().download('SPY', '2000-01-01', '2024-01-01')
+    raw.columns = [c.lower() for c in raw.columns]
+    damaged = raw.copy()
+    damaged.iloc[100, damaged.columns.get_loc('close')] *= 3
+    damaged.iloc[200, damaged.columns.get_loc('high')] = damaged['low'].iloc[200] * 0.9
+    damaged.iloc[300, damaged.columns.get_loc('open')] = 0
+    damaged = pd.concat([damaged, damaged.iloc[[50]]]).drop(damaged.index[400:405]).sample(frac=1, random_state=0)
+
+    started = time.perf_counter()
+    repaired, report = validate_ohlcv(damaged, outliers='fill')
+    elapsed = time.perf_counter() - started
+    print(summarize(report))
+    print({key: value for key, value in report.items() if key not in ('gaps', 'outlier_dates')})
+    print(f"{len(damaged)} bars validated in {elapsed * 1e3:.1f}ms")
@@ -0,0 +1,135 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .backtester import Backtester
+from .evaluation import Evaluator
+from .profiling import profiled
+from .shared_memory import as_frame, shared
+from .strategies import MLStrategy, PrecomputedSignalStrategy
+from .validation import ensure_sorted
+
+# Feature data shared with fold workers, attached once per worker by `_init_worker`
+_WORKER_DATA = None
+
+
+def _init_worker(data):
+    global _WORKER_DATA
+    _WORKER_DATA = as_frame(data)
+
+
+def _run_fold(task):
+    """
+    Train one fold model and produce its out-of-sample signals.
+    """
+    fold, (train_start, train_end, test_end), strategy_kwargs = task
+    train_data = _WORKER_DATA.iloc[train_start:train_end]
+    test_data = _WORKER_DATA.iloc[train_end:test_end]
+
+    started = time.perf_counter()
+    strategy = MLStrategy(**strategy_kwargs)
+    strategy.train_model(train_data)
+    trained = time.perf_counter()
+    signals = strategy.generate_signals(test_data)
+    predicted = time.perf_counter()
+
+    # Replay the signals instead of letting the backtester predict them again
+    results = Backtester().run(test_data, PrecomputedSignalStrategy(signals))
+    metrics = Evaluator(results).calculate_metrics()
+    finished = time.perf_counter()
+
+    # Direction accuracy against the next bar, where it is known
+    target = (test_data['close'].shift(-1) > test_data['close']).astype(int).iloc[:-1]
+    accuracy = (signals.iloc[:-1] == target).mean() if len(target) else float('nan')
+
+    report = {
+        'fold': fold,
+        'train_start': train_data.index[0],
+        'train_end': train_data.index[-1],
+        'test_start': test_data.index[0],
+        'test_end': test_data.index[-1],
+        'train_rows': len(train_data),
+        'test_rows': len(test_data),
+        'train_seconds': trained - started,
+        'predict_seconds': predicted - trained,
+        'backtest_seconds': finished - predicted,
+        'accuracy': accuracy,
+        **metrics,
+    }
+    return signals, report
+
+
+class WalkForward:
+    def __init__(self, train_size=756, test_size=126, step=None, expanding=False, n_jobs=None, strategy_kwargs=None):
+        """
+        Initialize the walk-forward engine for MLStrategy.
+
+        Args:
+            train_size (int): Rows in the (first) training window.
+            test_size (int): Out-of-sample rows predicted by each fold model.
+            step (int, optional): Rows between fold starts. Defaults to test_size.
+            expanding (bool): Grow the training window from the start of the
+                data instead of rolling it forward.
+            n_jobs (int, optional): Worker processes. Defaults to all cores;
+                1 runs in the current process.
+            strategy_kwargs (dict, optional): Arguments for each fold's MLStrategy.
+        """
+        self.train_size = train_size
+        self.test_size = test_size
+        self.step = step or test_size
+        self.expanding = expanding
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.strategy_kwargs = strategy_kwargs or {}
+
+    def splits(self, n_rows):
+        """
+        Fold boundaries as (train_start, train_end, test_end) row positions.
+        """
+        folds = []
+        train_end = self.train_size
+        while train_end < n_rows:
+            train_start = 0 if self.expanding else train_end - self.train_size
+            folds.append((train_start, train_end, min(train_end + self.test_size, n_rows)))
+            train_end += self.step
+        return folds
+
+    @profiled('WalkForward.run')
+    def run(self, data):
+        """
+        Train every fold and stitch the out-of-sample signals together.
+
+        Args:
+            data (pd.DataFrame): Feature DataFrame (NaN rows already dropped).
+
+        Returns:
+            tuple: (signals, report) where signals is one continuous pd.Series
+                covering every tested row (the latest fold wins where test
+                windows overlap) and report has one row of timings and
+                metrics per fold.
+        """
+        data = ensure_sorted(data)
+        tasks = [(fold, bounds, self.strategy_kwargs) for fold, bounds in enumerate(self.splits(len(data)))]
+        if not tasks:
+            raise ValueError(f"Need more than {self.train_size} rows for walk-forward, got {len(data)}.")
+
+        started = time.perf_counter()
+        if self.n_jobs == 1:
+            _init_worker(data)
+            outputs = [_run_fold(task) for task in tasks]
+        else:
+            with shared(data) as handle, ProcessPoolExecutor(
+                max_workers=self.n_jobs, initializer=_init_worker, initargs=(handle,)
+            ) as executor:
+                outputs = list(executor.map(_run_fold, tasks))
+        wall_seconds = time.perf_counter() - started
+
+        signals = pd.concat([fold_signals for fold_signals, _ in outputs])
+        signals = signals[~signals.index.duplicated(keep='last')]
+        report = pd.DataFrame([fold_report for _, fold_report in outputs]).set_index('fold')
+        report.attrs['wall_seconds'] = wall_seconds
+        fold_seconds = report[['train_seconds', 'predict_seconds', 'backtest_seconds']].to_numpy().sum()
+        print(f"Walk-forward: {len(report)} folds in {wall_seconds:.2f}s "
+              f"({fold_seconds:.2f}s of fold work, {self.n_jobs} workers).")
+        return signals, report
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtester import Backtester
+from src.results import BacktestResult
+from src.strategies import PrecomputedSignalStrategy, Strategy
+
+
+def make_data(n=60, seed=0, tz=None):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-02 09:30', periods=n, freq='h', tz=tz)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({'close': close}, index=index)
+
+
+class FixedSignals(Strategy):
+    """
+    Raw signals passed straight to the backtester, NaN and -1 included.
+    """
+
+    def __init__(self, signals):
+        self.signals = np.asarray(signals, dtype=float)
+
+    def generate_signals(self, data):
+        return pd.Series(self.signals, index=data.index)
+
+
+def assert_engines_agree(data, strategy, **kwargs):
+    vectorized = Backtester(**kwargs).run(data, strategy)
+    loop = Backtester(**kwargs).run(data, strategy, engine='loop')
+    pd.testing.assert_frame_equal(vectorized, loop)
+    return vectorized
+
+
+def test_engines_agree_with_missing_and_hold_signals():
+    data = make_data(500)
+    rng = np.random.default_rng(1)
+    signals = rng.choice([0.0, 1.0, -1.0, np.nan], size=len(data), p=[0.3, 0.3, 0.2, 0.2])
+    results = assert_engines_agree(data, FixedSignals(signals))
+
+    # NaN and -1 keep the position of the bar before
+    held = results['Position'].to_numpy()
+    keep = ~np.isin(signals, (0.0, 1.0))
+    assert (held[1:][keep[1:]] == held[:-1][keep[1:]]).all()
+    assert held[signals == 0].max() == 0
+
+
+def test_failed_buy_is_retried_on_next_long_bar():
+    # One share fits the cash at 99.95 but its fee does not; at 90 the buy goes through
+    data = pd.DataFrame({'close': [99.95, 99.95, 99.95, 90.0, 95.0, 97.0]},
+                        index=pd.date_range('2024-01-01', periods=6, freq='D'))
+    results = assert_engines_agree(data, FixedSignals([1, 1, np.nan, 1, 0, 1]), initial_capital=100.0)
+    assert results['Position'].tolist() == [0, 0, 0, 1, 0, 1]
+    assert results['Cash'].iloc[2] == 100.0
+
+
+def test_results_keep_timezone_aware_index(tmp_path):
+    data = make_data(tz='America/New_York')
+    strategy = PrecomputedSignalStrategy(pd.Series(np.arange(len(data)) // 7 % 2, index=data.index))
+
+    for engine in ('vectorized', 'loop'):
+        path = str(tmp_path / engine)
+        results = Backtester().run(data, strategy, engine=engine, output_path=path)
+        pd.testing.assert_index_equal(results.index, data.index.as_unit('ns').rename('Date'))
+        pd.testing.assert_frame_equal(BacktestResult.open(path).to_frame(), results, check_freq=False)
+
+
+def test_non_datetime_index_is_rejected():
+    data = make_data().reset_index(drop=True)
+    strategy = PrecomputedSignalStrategy(pd.Series(1, index=data.index))
+    for engine in ('vectorized', 'loop'):
+        with pytest.raises(ValueError, match='DatetimeIndex'):
+            Backtester().run(data, strategy, engine=engine)
+
+
+def test_fractional_signals_are_rejected():
+    data = make_data(4)
+    # int8 would truncate 0.5 to 0 and silently sell
+    with pytest.raises(ValueError, match='-1, 0 or 1'):
+        FixedSignals([1, 0.5, 0, 1]).signal_array(data)
+    with pytest.raises(ValueError, match='-1, 0 or 1'):
+        PrecomputedSignalStrategy(pd.Series([1, 2, 0, 1], index=data.index))
+
+    signals = FixedSignals([1, np.nan, -1, 0]).signal_array(data)
+    assert signals.tolist() == [1, -1, -1, 0]
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from src.backtester import Backtester
+from src.compact import BACKTEST_RTOL, downcast_ohlcv, drop_warmup
+from src.features import FeatureEngineer
+from src.providers import SyntheticProvider
+from src.strategies import MACrossoverStrategy
+
+
+def daily_bars(start='2010-01-01', end='2020-01-01'):
+    df = SyntheticProvider().download('SPY', start, end)
+    df.columns = [c.lower() for c in df.columns]
+    return df
+
+
+def test_downcast_ohlcv_dtypes():
+    df = daily_bars()
+    df['label'] = 'x'
+    compact = downcast_ohlcv(df)
+    assert compact[['open', 'high', 'low', 'close']].dtypes.eq(np.float32).all()
+    assert compact['volume'].dtype == np.int32
+    assert compact['label'].dtype == df['label'].dtype
+    np.testing.assert_allclose(compact['close'], df['close'], rtol=1e-7)
+
+
+def test_downcast_ohlcv_volume_edge_cases():
+    index = pd.date_range('2024-01-01', periods=3)
+    fractional = pd.DataFrame({'close': [1.0, 2.0, 3.0], 'volume': [1.0, np.nan, 2.5]}, index=index)
+    assert downcast_ohlcv(fractional)['volume'].dtype == np.float64
+    large = pd.DataFrame({'close': [1.0, 2.0, 3.0], 'volume': [1, 2**40, 3]}, index=index)
+    assert downcast_ohlcv(large)['volume'].dtype == np.int64
+    empty = downcast_ohlcv(large.iloc[:0])
+    assert empty.empty and empty['volume'].dtype == np.int32
+    already = downcast_ohlcv(large.iloc[:0].astype({'close': np.float32, 'volume': np.int32}))
+    assert list(already.dtypes) == [np.float32, np.int32]
+
+
+def test_drop_warmup_equals_dropna():
+    values = np.arange(10.0)
+    cases = {
+        'warm-up': np.where(values < 3, np.nan, values),
+        'interior': np.where(values == 5, np.nan, values),
+        'all missing': np.full(10, np.nan),
+        'complete': values,
+    }
+    for name, column in cases.items():
+        df = pd.DataFrame({'a': column, 'b': values})
+        pd.testing.assert_frame_equal(drop_warmup(df), df.dropna(), obj=name)
+    empty = pd.DataFrame({'a': []})
+    pd.testing.assert_frame_equal(drop_warmup(empty), empty.dropna())
+
+
+def test_compact_features_and_backtest_stay_within_tolerance():
+    df = daily_bars()
+    wide = FeatureEngineer().add_features(df)
+    compact = FeatureEngineer(compact=True).add_features(downcast_ohlcv(df))
+    features = [c for c in wide.columns if c not in df.columns]
+    assert compact[features].dtypes.eq(np.float32).all()
+    np.testing.assert_allclose(compact['SMA_50'], wide['SMA_50'], rtol=1e-6)
+
+    strategy = MACrossoverStrategy()
+    expected = Backtester().run(drop_warmup(wide), strategy)['Portfolio Value']
+    result = Backtester().run(drop_warmup(compact), strategy)['Portfolio Value']
+    np.testing.assert_allclose(result, expected, rtol=BACKTEST_RTOL)
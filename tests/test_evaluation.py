@@ -0,0 +1,75 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.evaluation import Evaluator, OnlineEvaluator
+
+
+def portfolio(values, cash=None, positions=None):
+    values = np.asarray(values, dtype=float)
+    return pd.DataFrame({
+        'Portfolio Value': values,
+        'Cash': values if cash is None else cash,
+        'Position': np.ones(len(values), dtype=int) if positions is None else positions,
+    })
+
+
+def online(frame, periods_per_year=252):
+    evaluator = OnlineEvaluator(periods_per_year)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        for value, cash, position in frame[['Portfolio Value', 'Cash', 'Position']].itertuples(index=False):
+            evaluator.update(value, cash, position)
+    return evaluator.snapshot()
+
+
+def assert_metrics_equal(snapshot, expected):
+    assert snapshot.keys() == expected.keys()
+    for key, value in expected.items():
+        if np.isnan(value):
+            assert np.isnan(snapshot[key]), key
+        else:
+            assert snapshot[key] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+
+
+def test_snapshot_matches_batch_metrics():
+    rng = np.random.default_rng(0)
+    values = 10_000 * np.exp(np.cumsum(rng.normal(0, 0.01, 1000)))
+    positions = (rng.random(1000) > 0.5).astype(int)
+    frame = portfolio(values, cash=values * (1 - positions), positions=positions)
+    for periods_per_year in (252, 252 * 78):
+        expected = Evaluator(frame, periods_per_year).calculate_metrics()
+        assert_metrics_equal(online(frame, periods_per_year), expected)
+
+
+@pytest.mark.parametrize('values', [
+    [100.0, 110.0, 0.0, 0.0, 5.0, 6.0],  # wiped out, then restarted
+    [0.0, 1.0, 2.0],                    # zero start and peak
+    [100.0, np.nan, 105.0],             # missing value
+    [100.0, 100.0, 100.0],              # flat: no volatility
+    [100.0, 101.0],                     # a single return
+])
+def test_snapshot_matches_batch_metrics_on_edge_cases(values):
+    frame = portfolio(values)
+    with warnings.catch_warnings():
+        # The batch metrics warn about the same divisions by zero
+        warnings.simplefilter('ignore', RuntimeWarning)
+        expected = Evaluator(frame).calculate_metrics()
+    assert_metrics_equal(online(frame), expected)
+
+
+def test_short_histories_have_no_metrics():
+    assert OnlineEvaluator().snapshot() == {}
+    assert online(portfolio([100.0])) == Evaluator(portfolio([100.0])).calculate_metrics() == {}
+
+
+def test_reset_forgets_history():
+    evaluator = OnlineEvaluator()
+    for value in (100.0, 50.0, 75.0):
+        evaluator.update(value)
+    evaluator.reset()
+    for value in (100.0, 110.0):
+        evaluator.update(value)
+    assert evaluator.snapshot()['Max Drawdown'] == 0.0
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from src.feature_store import FeatureStore, fingerprint
+from src.features import FeatureEngineer
+from src.providers import SyntheticProvider
+
+
+def daily_bars(start='2015-01-01', end='2019-01-01'):
+    df = SyntheticProvider().download('SPY', start, end)
+    df.columns = [c.lower() for c in df.columns]
+    return df
+
+
+def test_cached_features_equal_computed_ones(tmp_path):
+    df = daily_bars()
+    fe = FeatureEngineer()
+    store = FeatureStore(str(tmp_path))
+    expected = fe.add_features(df)
+
+    pd.testing.assert_frame_equal(store.get_or_compute(df, fe), expected)
+    # A new store reads the same entry back from disk
+    reopened = FeatureStore(str(tmp_path))
+    pd.testing.assert_frame_equal(reopened.get_or_compute(df, fe), expected)
+    assert (store.stats()['misses'], reopened.stats()['hits']) == (1, 1)
+
+
+def test_appended_rows_extend_the_cached_entry(tmp_path):
+    df = daily_bars()
+    fe = FeatureEngineer()
+    store = FeatureStore(str(tmp_path))
+    store.get_or_compute(df.iloc[:-20], fe)
+
+    extended = store.get_or_compute(df, fe)
+    pd.testing.assert_frame_equal(extended, fe.add_features(df), rtol=1e-9, atol=1e-9)
+    assert store.stats()['extensions'] == 1
+    assert store.stats()['entries'] == 1
+
+
+def test_configuration_and_data_changes_miss(tmp_path):
+    df = daily_bars()
+    store = FeatureStore(str(tmp_path))
+    store.get_or_compute(df, FeatureEngineer())
+    store.get_or_compute(df, FeatureEngineer(sma_windows=(20, 50)))
+
+    changed = df.copy()
+    changed.iloc[100, changed.columns.get_loc('close')] *= 1.01
+    assert fingerprint(changed) != fingerprint(df)
+    store.get_or_compute(changed, FeatureEngineer())
+    assert store.stats()['misses'] == 3
+
+
+def test_eviction_keeps_the_limits(tmp_path):
+    df = daily_bars()
+    store = FeatureStore(str(tmp_path), max_entries=2)
+    for window in (10, 20, 30):
+        store.get_or_compute(df, FeatureEngineer(sma_windows=(window,)))
+    assert store.stats()['entries'] == 2
+    assert store.stats()['evictions'] == 1
+
+
+def test_single_bar_and_empty_frames(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    fe = FeatureEngineer()
+    for df in (daily_bars().iloc[:1], daily_bars().iloc[:0]):
+        result = store.get_or_compute(df, fe)
+        assert len(result) == len(df)
+        assert np.isnan(result['RSI'].to_numpy()).all()
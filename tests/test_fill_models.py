@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtester import Backtester
+from src.fill_models import FillModel, market_panels
+from src.providers import SyntheticProvider
+
+
+def panel(start='2018-01-01', end='2020-01-01', tickers=('SPY', 'QQQ', 'IWM')):
+    frames = {}
+    for ticker in tickers:
+        df = SyntheticProvider().download(ticker, start, end)
+        df.columns = [c.lower() for c in df.columns]
+        frames[ticker] = df
+    return frames
+
+
+def monthly_weights(prices):
+    # Rotate between equal weight and all-in-first-asset every month
+    even = (prices.index.month.to_numpy() % 2 == 0)[:, None]
+    first = np.arange(prices.shape[1]) == 0
+    weights = np.where(even, 1.0 / prices.shape[1], np.where(first, 1.0, 0.0))
+    return pd.DataFrame(weights, index=prices.index, columns=prices.columns)
+
+
+def test_close_fills_match_default_portfolio():
+    frames = panel()
+    prices = pd.DataFrame({ticker: df['close'] for ticker, df in frames.items()})
+    # One asset lists late: NaN closes must not trade
+    prices.iloc[:40, 2] = np.nan
+    weights = monthly_weights(prices)
+
+    default, default_positions = Backtester().run_portfolio(prices, weights)
+    filled, filled_positions = Backtester(fill_model=FillModel('close')).run_portfolio(prices, weights)
+    pd.testing.assert_frame_equal(filled, default)
+    pd.testing.assert_frame_equal(filled_positions, default_positions)
+    assert (default_positions.iloc[:40, 2] == 0).all()
+
+
+def test_next_open_fills_at_the_following_open():
+    index = pd.date_range('2024-01-01', periods=4, freq='D')
+    prices = pd.DataFrame({'A': [100.0, 101.0, 102.0, 103.0]}, index=index)
+    market = {'open': pd.DataFrame({'A': [99.0, 98.0, 105.0, 104.0]}, index=index)}
+    weights = pd.DataFrame({'A': [1.0, 1.0, 1.0, 1.0]}, index=index)
+
+    backtester = Backtester(fill_model=FillModel('next_open'))
+    results, positions = backtester.run_portfolio(prices, weights, market=market)
+
+    # Sized at bar 0's close, filled at bar 1's open
+    shares = int(10000.0 / (100.0 * (1 + 0.0005)))
+    cost = shares * 98.0 * (1 + 0.0005)
+    assert positions['A'].tolist() == [0, shares, shares, shares]
+    assert results['Cash'].iloc[0] == 10000.0
+    assert results['Cash'].iloc[1] == pytest.approx(10000.0 - cost * 1.001)
+
+
+def test_participation_cap_fills_partially():
+    index = pd.date_range('2024-01-01', periods=6, freq='D')
+    prices = pd.DataFrame({'A': [10.0] * 6}, index=index)
+    market = {'volume': pd.DataFrame({'A': [1000.0] * 6}, index=index)}
+    weights = pd.DataFrame({'A': [1.0] * 6}, index=index)
+
+    model = FillModel('close', max_participation=0.1)
+    _, positions = Backtester(fill_model=model).run_portfolio(prices, weights, market=market)
+    # 100 shares per bar until the ~999 share target is reached
+    target = int(10000.0 / (10.0 * (1 + 0.0005)))
+    assert positions['A'].tolist() == [100, 200, 300, 400, 500, 600]
+    assert positions['A'].iloc[-1] < target
+
+    # The remainder is dropped once the target goes back to flat
+    weights.iloc[3:] = 0.0
+    _, positions = Backtester(fill_model=model).run_portfolio(prices, weights, market=market)
+    assert positions['A'].tolist() == [100, 200, 300, 200, 100, 0]
+
+
+def test_market_panels_feed_the_fill_model():
+    frames = panel(tickers=('SPY', 'QQQ'))
+    prices = pd.DataFrame({ticker: df['close'] for ticker, df in frames.items()})
+    model = FillModel('next_open', max_participation=0.01)
+    market = market_panels(frames, model.columns())
+    assert set(market) == {'open', 'volume'}
+    results, positions = Backtester(fill_model=model).run_portfolio(prices, monthly_weights(prices), market=market)
+    assert (results['Cash'] >= 0).all()
+    assert (positions.iloc[0] == 0).all()
+
+    with pytest.raises(ValueError, match='open'):
+        Backtester(fill_model=model).run_portfolio(prices, monthly_weights(prices))
+
+
+@pytest.mark.parametrize('execution', ['close', 'next_open'])
+@pytest.mark.parametrize('n_bars', [0, 1])
+def test_portfolio_edge_cases(execution, n_bars):
+    index = pd.date_range('2024-01-01', periods=n_bars, freq='D')
+    prices = pd.DataFrame({'A': [50.0] * n_bars, 'B': [np.nan] * n_bars}, index=index)
+    market = {'open': prices.copy()}
+    weights = pd.DataFrame({'A': [0.5] * n_bars, 'B': [0.5] * n_bars}, index=index)
+
+    results, positions = Backtester(fill_model=FillModel(execution)).run_portfolio(prices, weights, market=market)
+    assert len(results) == len(positions) == n_bars
+    if n_bars:
+        # B has no price; next_open has no later bar to fill on
+        assert positions['B'].iloc[0] == 0
+        assert positions['A'].iloc[0] == (0 if execution == 'next_open' else int(5000.0 / (50.0 * 1.0005)))
+        assert results['Portfolio Value'].iloc[0] == pytest.approx(10000.0, rel=1e-3)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.frequency import BarFrequency, resample_ohlcv
+from src.providers import SyntheticProvider
+
+
+def minute_bars(start='2024-01-02', end='2024-01-04'):
+    df = SyntheticProvider().download('SPY', start, end, interval='1m')
+    df.columns = [c.lower() for c in df.columns]
+    return df
+
+
+def reference(df, rule, offset=None):
+    # pandas resample with the same reductions, empty buckets dropped
+    bars = df.resample(rule, offset=offset).agg(
+        {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    return bars.loc[df.resample(rule, offset=offset)['close'].count() > 0]
+
+
+@pytest.mark.parametrize('interval, rule', [('5m', '5min'), ('15m', '15min'), ('30m', '30min')])
+def test_minute_buckets_match_pandas(interval, rule):
+    df = minute_bars()
+    pd.testing.assert_frame_equal(resample_ohlcv(df, interval), reference(df, rule), check_freq=False)
+
+
+def test_hourly_buckets_start_at_the_session_open():
+    df = minute_bars()
+    bars = resample_ohlcv(df, '1h')
+    day = bars.loc['2024-01-02']
+    assert day.index.strftime('%H:%M').tolist() == ['09:30', '10:30', '11:30', '12:30', '13:30', '14:30', '15:30']
+    # Every bucket but the 15:30-16:00 one is a full hour
+    minutes = df.loc['2024-01-02', 'volume'].groupby(BarFrequency('1h').bucket_keys(df.loc['2024-01-02'].index)).size()
+    assert minutes.tolist() == [60] * 6 + [30]
+    pd.testing.assert_frame_equal(bars, reference(df, '1h', offset='30min'), check_freq=False)
+
+    assert bars['open'].iloc[0] == df['open'].iloc[0]
+    assert bars['close'].iloc[6] == df['close'].loc['2024-01-02'].iloc[-1]
+    assert bars['volume'].sum() == df['volume'].sum()
+
+
+def test_session_open_is_configurable():
+    df = minute_bars()
+    bars = resample_ohlcv(df, BarFrequency('1h', session_open='09:00'))
+    assert bars.loc['2024-01-02'].index.strftime('%H:%M').tolist()[:2] == ['09:00', '10:00']
+    # Bars before the open get buckets of their own
+    early = pd.concat([df.iloc[:1].set_axis([pd.Timestamp('2024-01-02 08:15')]), df])
+    assert resample_ohlcv(early, '1h').index[:2].strftime('%H:%M').tolist() == ['07:30', '09:30']
+
+
+def test_timezone_is_kept_and_buckets_use_wall_time():
+    df = minute_bars('2024-03-08', '2024-03-12')
+    aware = df.tz_localize('America/New_York')
+    bars = resample_ohlcv(aware, '1h')
+    assert str(bars.index.tz) == 'America/New_York'
+    # Across the DST change the buckets stay at 9:30 exchange time
+    pd.testing.assert_frame_equal(bars.tz_localize(None), resample_ohlcv(df, '1h'))
+
+
+def test_daily_and_weekly_buckets():
+    df = minute_bars('2024-01-01', '2024-01-13')
+    daily = resample_ohlcv(df, '1d')
+    assert daily.index.tolist() == list(pd.bdate_range('2024-01-01', '2024-01-12'))
+    weekly = resample_ohlcv(daily, '1wk')
+    assert len(weekly) == 2
+    assert weekly['volume'].tolist() == [daily['volume'].iloc[:5].sum(), daily['volume'].iloc[5:].sum()]
+
+
+@pytest.mark.parametrize('n_bars', [0, 1])
+def test_empty_and_single_bar(n_bars):
+    df = minute_bars().iloc[:n_bars]
+    bars = resample_ohlcv(df, '1h')
+    assert len(bars) == n_bars
+    if n_bars:
+        assert bars.index[0] == df.index[0]
+        np.testing.assert_array_equal(bars.to_numpy(), df.to_numpy())
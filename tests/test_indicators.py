@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import FeatureEngineer
+from src.indicators import IndicatorSpec, _ema, compute_indicators
+from src.providers import SyntheticProvider
+
+
+def daily_bars(start='2015-01-01', end='2020-01-01'):
+    df = SyntheticProvider().download('SPY', start, end)
+    df.columns = [c.lower() for c in df.columns]
+    return df
+
+
+def test_default_spec_matches_add_features():
+    df = daily_bars()
+    matrix, columns = compute_indicators(df['close'].to_numpy(), IndicatorSpec.default())
+    batched = pd.DataFrame(matrix, index=df.index, columns=columns)
+    features = FeatureEngineer().add_features(df)
+
+    assert columns == ['SMA_50', 'SMA_200', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Diff', 'Log_Return', 'Volatility_20']
+    for column in columns:
+        pd.testing.assert_series_equal(batched[column], features[column], rtol=1e-9, atol=1e-9)
+
+
+def test_ema_skips_missing_values_like_pandas():
+    values = 100 + np.cumsum(np.random.default_rng(0).normal(size=300))
+    values[:3] = np.nan
+    values[[50, 51, 120]] = np.nan
+    for span in (1, 2, 12, 26, 250):
+        expected = pd.Series(values).ewm(span=span, adjust=False, ignore_na=True, min_periods=span).mean()
+        np.testing.assert_allclose(_ema(values, 2 / (span + 1), span), expected.to_numpy(), rtol=1e-12)
+
+
+def test_ema_edge_cases():
+    assert len(_ema(np.array([]), 0.5, 1)) == 0
+    assert np.isnan(_ema(np.array([np.nan, np.nan]), 0.5, 1)).all()
+    np.testing.assert_array_equal(_ema(np.array([3.0]), 0.5, 1), [3.0])
+
+
+@pytest.mark.parametrize('kwargs', [{'volatility': (1,)}, {'sma': (0,)}, {'macd': (12, 0, 9)}])
+def test_invalid_windows_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        IndicatorSpec(**kwargs)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import FeatureEngineer
+from src.inference import CompiledForest
+from src.providers import SyntheticProvider
+from src.strategies import MLStrategy
+
+
+@pytest.fixture(scope='module')
+def trained():
+    df = SyntheticProvider().download('SPY', '2015-01-01', '2019-01-01')
+    df.columns = [c.lower() for c in df.columns]
+    data = FeatureEngineer().add_features(df).dropna()
+    strategy = MLStrategy(n_estimators=20)
+    strategy.train_model(data)
+    return strategy, data
+
+
+def test_compiled_forest_matches_sklearn(trained):
+    strategy, data = trained
+    X = data[strategy.features]
+    compiled = CompiledForest(strategy.model)
+    np.testing.assert_array_equal(compiled.predict_proba(X.to_numpy()), strategy.model.predict_proba(X))
+    np.testing.assert_array_equal(compiled.predict(X.to_numpy()), strategy.model.predict(X))
+
+
+def test_compiled_forest_edge_rows(trained):
+    strategy, data = trained
+    compiled = CompiledForest(strategy.model)
+    X = data[strategy.features]
+    # One row, no rows, and zeros (the imputed value for missing features)
+    np.testing.assert_array_equal(compiled.predict(X.iloc[:1].to_numpy()), strategy.model.predict(X.iloc[:1]))
+    assert compiled.predict(X.iloc[:0].to_numpy()).shape == (0,)
+    zeros = pd.DataFrame(0.0, index=range(3), columns=strategy.features)
+    np.testing.assert_array_equal(compiled.predict(zeros.to_numpy()), strategy.model.predict(zeros))
+    with pytest.raises(ValueError):
+        compiled.predict(X.to_numpy()[:, :2])
+
+
+def test_predict_rows_matches_generate_signals(trained):
+    strategy, data = trained
+    rows = data.iloc[-50:].copy()
+    rows.iloc[0, rows.columns.get_loc('RSI')] = np.nan
+    expected = strategy.generate_signals(rows).to_numpy()
+    np.testing.assert_array_equal(strategy.predict_rows(rows), expected)
+    np.testing.assert_array_equal(strategy.predict_rows(rows.iloc[-1]), expected[-1:])
+
+    latest = strategy.predict_latest({'A': rows, 'B': rows.iloc[:10]})
+    assert latest.tolist() == [expected[-1], expected[9]]
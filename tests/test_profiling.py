@@ -0,0 +1,57 @@
+import threading
+
+from src.data_loader import DataLoader
+from src.profiling import active_profiler, profiling, stage
+from src.providers import SyntheticProvider
+
+
+def names(profiler):
+    return {event['name'] for event in profiler.events}
+
+
+def test_concurrent_sessions_keep_their_own_traces():
+    entered = threading.Barrier(2)
+    first_done = threading.Event()
+    profilers = {}
+
+    def session(name, exit_first):
+        with profiling() as profiler:
+            profilers[name] = profiler
+            entered.wait()
+            with stage(name):
+                pass
+            if not exit_first:
+                # Exit after the other session, in the reverse order of entering
+                first_done.wait()
+        if exit_first:
+            first_done.set()
+        profilers[name + '_after'] = active_profiler()
+
+    threads = [threading.Thread(target=session, args=('a', True)), threading.Thread(target=session, args=('b', False))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert names(profilers['a']) == {'a'}
+    assert names(profilers['b']) == {'b'}
+    assert profilers['a_after'] is None and profilers['b_after'] is None
+    assert active_profiler() is None
+
+
+def test_nested_profiling_restores_the_outer_profiler():
+    with profiling() as outer:
+        with profiling() as inner:
+            assert active_profiler() is inner
+            with stage('inner'):
+                pass
+        assert active_profiler() is outer
+    assert active_profiler() is None
+    assert names(outer) == {'inner'}
+
+
+def test_fetch_many_downloads_are_traced(tmp_path):
+    loader = DataLoader(str(tmp_path), provider=SyntheticProvider())
+    with profiling() as profiler:
+        loader.fetch_many(['AAA', 'BBB'], '2024-01-01', '2024-02-01', max_workers=2)
+    assert sum(event['name'] == 'DataLoader.download' for event in profiler.events) == 2
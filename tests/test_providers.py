@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+import yfinance as yf
+from yfinance.exceptions import YFPricesMissingError, YFTzMissingError
+
+from src.providers import YahooProvider
+
+
+def fake_ticker(outcome):
+    """
+    Stand-in for yf.Ticker whose history() behaves like yfinance's: it
+    raises `outcome` only when exceptions are not hidden.
+    """
+
+    class Ticker:
+        def __init__(self, ticker):
+            self.ticker = ticker
+
+        def history(self, **kwargs):
+            if isinstance(outcome, Exception):
+                if yf.config.debug.hide_exceptions:
+                    return pd.DataFrame()
+                raise outcome
+            return outcome
+
+    return Ticker
+
+
+def download(monkeypatch, outcome, interval='1d'):
+    monkeypatch.setattr(yf, 'Ticker', fake_ticker(outcome))
+    return YahooProvider().download('SPY', '2024-01-01', '2024-01-02', interval=interval)
+
+
+@pytest.mark.parametrize('error', [
+    YFPricesMissingError('SPY', ' (1d 2024-01-01 -> 2024-01-02)'),
+    YFPricesMissingError('SPY', '', yahoo_reason="Data doesn't exist for startDate = 1704067200, endDate = 1704153600"),
+])
+def test_range_without_bars_is_empty(monkeypatch, error):
+    assert download(monkeypatch, error).empty
+
+
+@pytest.mark.parametrize('error', [
+    YFPricesMissingError('XYZQ', '', yahoo_reason='No data found, symbol may be delisted'),
+    YFPricesMissingError('SPY', ' (1d 2024-01-01 -> 2024-01-02)(Yahoo status_code = 500)'),
+    YFTzMissingError('XYZQ'),
+])
+def test_failures_are_raised(monkeypatch, error):
+    hidden = yf.config.debug.hide_exceptions
+    with pytest.raises(type(error)):
+        download(monkeypatch, error)
+    # The user's setting is restored
+    assert yf.config.debug.hide_exceptions == hidden
+
+
+def test_bars_are_dated_by_exchange_day(monkeypatch):
+    index = pd.DatetimeIndex(['2024-01-02 00:00'], tz='America/New_York')
+    bars = pd.DataFrame({'Open': [1.0], 'High': [2.0], 'Low': [0.5], 'Close': [1.5], 'Volume': [10]}, index=index)
+    daily = download(monkeypatch, bars.copy())
+    assert daily.index.tz is None and daily.index.name == 'Date'
+    assert daily.index[0] == pd.Timestamp('2024-01-02')
+
+    hourly = download(monkeypatch, bars, interval='1h')
+    assert str(hourly.index.tz) == 'America/New_York'
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtester import Backtester
+from src.evaluation import Evaluator
+from src.features import FeatureEngineer
+from src.fill_models import FillModel, VolatilitySlippage
+from src.providers import SyntheticProvider
+from src.robustness import RobustnessTest
+from src.strategies import MACrossoverStrategy
+
+
+def feature_data(start='2015-01-01', end='2020-01-01'):
+    df = SyntheticProvider().download('SPY', start, end)
+    df.columns = [c.lower() for c in df.columns]
+    return FeatureEngineer().add_features(df).dropna()
+
+
+@pytest.mark.parametrize('fill_model', [None, FillModel('next_open', max_participation=0.01)])
+def test_perturbed_runs_match_direct_backtests(fill_model):
+    data = feature_data()
+    strategy = MACrossoverStrategy()
+    backtester = Backtester(fill_model=fill_model)
+    test = RobustnessTest(backtester.run(data, strategy), n_jobs=1)
+    runs = test.perturb_costs(data, strategy, backtester=backtester, n_runs=4)
+
+    for _, run in runs.iterrows():
+        direct = Backtester(transaction_cost_pct=run['transaction_cost_pct'], slippage_pct=run['slippage_pct'],
+                            fill_model=fill_model).run(data, strategy)
+        expected = Evaluator(direct).calculate_metrics()
+        assert run['Sharpe Ratio'] == pytest.approx(expected['Sharpe Ratio'], rel=1e-9)
+        assert run['Cumulative Return'] == pytest.approx(expected['Cumulative Return'], rel=1e-9)
+
+
+def test_fill_model_columns_are_required():
+    data = feature_data()
+    backtester = Backtester(fill_model=FillModel('close', slippage=VolatilitySlippage()))
+    test = RobustnessTest(backtester.run(data, MACrossoverStrategy()), n_jobs=1)
+    with pytest.raises(ValueError, match='Volatility_20'):
+        test.perturb_costs(data.drop(columns='Volatility_20'), MACrossoverStrategy(), backtester=backtester)
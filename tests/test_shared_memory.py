@@ -0,0 +1,92 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.shared_memory import PanelHandle, SharedPanel, as_frame, shared
+
+
+def mixed_frame(n=50, index=None):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'close': rng.normal(100, 1, n),
+        'Volatility_20': rng.normal(0, 1, n).astype(np.float32),
+        'volume': rng.integers(0, 10_000, n),
+        'flag': rng.random(n) > 0.5,
+        'listed': pd.date_range('2020-01-01', periods=n, freq='D'),
+    }, index=index if index is not None else pd.date_range('2024-01-02', periods=n, freq='h', name='Date'))
+    df.iloc[3:4, 0] = np.nan
+    return df
+
+
+def _close_sum(handle):
+    return float(np.nansum(as_frame(handle)['close'].to_numpy()))
+
+
+def test_publish_and_attach_round_trip():
+    df = mixed_frame()
+    with SharedPanel.publish(df) as panel:
+        handle = pickle.loads(pickle.dumps(panel.handle))
+        attached = SharedPanel.attach(handle)
+        frame = attached.frame()
+        # Columns keep their dtype; the index comes back in nanoseconds
+        pd.testing.assert_frame_equal(frame, df.set_axis(df.index.as_unit('ns')), check_freq=False)
+        assert frame.dtypes.tolist() == df.dtypes.tolist()
+
+        # Views are read-only
+        assert not attached.array('close').flags.writeable
+        with pytest.raises(KeyError):
+            attached.array('missing')
+        attached.close()
+
+
+@pytest.mark.parametrize('index', [
+    pd.date_range('2024-03-08 09:30', periods=50, freq='h', tz='America/New_York', name='Date'),
+    pd.RangeIndex(50),
+    pd.Index([f'T{i}' for i in range(50)], name='ticker'),
+])
+def test_index_round_trip(index):
+    df = mixed_frame(index=index)
+    with SharedPanel.publish(df) as panel:
+        expected = index.as_unit('ns') if isinstance(index, pd.DatetimeIndex) else index
+        pd.testing.assert_index_equal(panel.frame().index, expected, exact='equiv')
+
+
+@pytest.mark.parametrize('n_rows', [0, 1])
+def test_empty_and_single_row_panels(n_rows):
+    df = mixed_frame(n=n_rows)
+    with SharedPanel.publish(df) as panel:
+        frame = panel.frame()
+        assert frame.shape == df.shape
+        np.testing.assert_array_equal(frame['volume'].to_numpy(), df['volume'].to_numpy())
+
+
+def test_closing_the_owner_unlinks_the_segment():
+    panel = SharedPanel.publish(mixed_frame())
+    handle = panel.handle
+    panel.close()
+    with pytest.raises(FileNotFoundError):
+        SharedPanel.attach(handle)
+
+
+def test_worker_process_reads_the_panel():
+    df = mixed_frame()
+    with shared(df) as handle:
+        assert isinstance(handle, PanelHandle)
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            total = executor.submit(_close_sum, handle).result()
+    assert total == pytest.approx(np.nansum(df['close'].to_numpy()))
+
+
+def test_shared_falls_back_to_the_frame():
+    df = mixed_frame()
+    for unshareable in (df.assign(ticker='SPY'), df.assign(listed=df['listed'].dt.tz_localize('UTC'))):
+        with shared(unshareable) as data:
+            assert data is unshareable
+            assert as_frame(data) is unshareable
+        with pytest.raises(TypeError, match='only numeric'):
+            SharedPanel.publish(unshareable)
+    with shared(None) as data:
+        assert data is None
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtester import Backtester
+from src.features import FeatureEngineer
+from src.providers import SyntheticProvider
+from src.signals import SignalCache, signal_matrix
+from src.strategies import MACrossoverStrategy, PrecomputedSignalStrategy
+
+WINDOWS = (10, 20, 50, 100)
+
+
+def feature_data(start='2015-01-01', end='2019-01-01'):
+    df = SyntheticProvider().download('SPY', start, end)
+    df.columns = [c.lower() for c in df.columns]
+    return FeatureEngineer(sma_windows=WINDOWS).add_features(df).dropna()
+
+
+def crossovers():
+    return [MACrossoverStrategy(s, l) for s in WINDOWS for l in WINDOWS if s < l]
+
+
+def test_signal_matrix_matches_each_strategy():
+    data = feature_data()
+    strategies = crossovers() + [PrecomputedSignalStrategy(pd.Series(1, index=data.index[::3]))]
+    matrix = signal_matrix(data, strategies, labels=[f's{j}' for j in range(len(strategies))])
+
+    assert matrix.dtypes.eq(np.int8).all()
+    assert list(matrix.columns) == [f's{j}' for j in range(len(strategies))]
+    for j, strategy in enumerate(strategies):
+        np.testing.assert_array_equal(matrix.iloc[:, j].to_numpy(), strategy.signal_array(data))
+
+
+def test_signal_cache_hits_and_invalidation():
+    data = feature_data()
+    cache = SignalCache()
+    strategies = crossovers()
+    cold = signal_matrix(data, strategies, cache=cache)
+    assert cache.stats() == {'entries': len(strategies), 'hits': 0, 'misses': len(strategies)}
+
+    # Unrelated columns do not change the key
+    warm = signal_matrix(data.assign(extra=1.0), strategies, cache=cache)
+    pd.testing.assert_frame_equal(warm, cold)
+    assert cache.hits == len(strategies)
+
+    # Changing a column a strategy reads does
+    changed = data.copy()
+    changed['SMA_10'] = changed['SMA_10'] * 2
+    strategy = MACrossoverStrategy(10, 20)
+    signals = cache.get_or_compute(changed, strategy)
+    np.testing.assert_array_equal(signals, strategy.signal_array(changed))
+    assert not signals.flags.writeable
+    assert cache.misses == len(strategies) + 1
+
+    # Precomputed signals have no params and are never cached
+    precomputed = PrecomputedSignalStrategy(pd.Series(1, index=data.index))
+    assert cache.key(data, precomputed) is None
+
+
+def test_signal_cache_evicts_least_recently_used():
+    data = feature_data()
+    cache = SignalCache(max_entries=2)
+    a, b, c = MACrossoverStrategy(10, 20), MACrossoverStrategy(10, 50), MACrossoverStrategy(20, 50)
+    for strategy in (a, b, a, c):
+        cache.get_or_compute(data, strategy)
+    assert cache.get(cache.key(data, a)) is not None
+    assert cache.get(cache.key(data, b)) is None
+
+
+def test_run_batch_matches_run_per_strategy():
+    data = feature_data()
+    strategies = crossovers()
+    results = Backtester().run_batch(data, signal_matrix(data, strategies))
+    for j, strategy in enumerate(strategies):
+        single = Backtester().run(data, strategy)
+        for name in ('Cash', 'Holdings', 'Portfolio Value', 'Position'):
+            np.testing.assert_allclose(results[name][j].to_numpy(), single[name].to_numpy(), rtol=1e-12)
+
+
+@pytest.mark.parametrize('n_bars', [0, 1])
+def test_signal_matrix_edge_cases(n_bars):
+    data = feature_data().iloc[:n_bars]
+    matrix = signal_matrix(data, crossovers(), cache=SignalCache())
+    assert matrix.shape == (n_bars, len(crossovers()))
+
+    empty = signal_matrix(data, [])
+    assert empty.shape == (n_bars, 0)
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from src.data_loader import DataLoader
+from src.providers import SyntheticProvider
+
+
+class NewYorkProvider(SyntheticProvider):
+    """
+    Synthetic bars stamped in exchange time with a timezone, as Yahoo
+    returns intraday intervals.
+    """
+
+    def download(self, ticker, start_date, end_date, interval='1d'):
+        return super().download(ticker, start_date, end_date, interval).tz_localize('America/New_York')
+
+
+def test_tz_aware_intraday_bars_keep_exchange_wall_time(tmp_path):
+    loader = DataLoader(str(tmp_path), provider=NewYorkProvider(), frequency='1h', base_interval='1m')
+    naive = DataLoader(str(tmp_path / 'naive'), provider=SyntheticProvider(), frequency='1h', base_interval='1m')
+
+    bars = loader.fetch_data('SPY', '2024-01-02', '2024-01-04')
+    minutes = loader.store.load('SPY@1m')
+    assert minutes.index.tz is None
+    assert minutes.index[0] == pd.Timestamp('2024-01-02 09:30')
+    pd.testing.assert_frame_equal(bars, naive.fetch_data('SPY', '2024-01-02', '2024-01-04'))
+
+    # Extending the stored range merges with the existing bars
+    extended = loader.fetch_data('SPY', '2024-01-02', '2024-01-06')
+    pd.testing.assert_frame_equal(extended, naive.fetch_data('SPY', '2024-01-02', '2024-01-06'))
+
+
+class HolidayProvider(SyntheticProvider):
+    """
+    Synthetic daily bars without the 2024-07-04 holiday, counting requests.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def download(self, ticker, start_date, end_date, interval='1d'):
+        self.requests.append((start_date, end_date))
+        df = super().download(ticker, start_date, end_date, interval)
+        return df.drop(pd.Timestamp('2024-07-04'), errors='ignore')
+
+
+def test_range_without_bars_is_covered(tmp_path):
+    provider = HolidayProvider()
+    loader = DataLoader(str(tmp_path), provider=provider, max_retries=0)
+    loader.fetch_data('SPY', '2024-07-01', '2024-07-04')
+    loader.fetch_data('SPY', '2024-07-05', '2024-07-12')
+
+    # The gap between the stored ranges holds only the holiday: it is
+    # downloaded once, found empty and not requested again
+    for _ in range(2):
+        assert len(loader.fetch_data('SPY', '2024-07-01', '2024-07-12')) == 8
+    assert provider.requests == [('2024-07-01', '2024-07-04'), ('2024-07-05', '2024-07-12'), ('2024-07-04', '2024-07-05')]
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtester import Backtester
+from src.bar_sources import DataFrameSource
+from src.evaluation import OnlineEvaluator
+from src.features import FeatureEngineer, StreamingFeatureEngineer
+from src.providers import SyntheticProvider
+from src.strategies import MACrossoverStrategy
+
+COLUMNS = ['SMA_50', 'SMA_200', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Diff', 'Log_Return', 'Volatility_20']
+
+
+def daily_bars(start='2015-01-01', end='2019-01-01'):
+    df = SyntheticProvider().download('SPY', start, end)
+    df.columns = [c.lower() for c in df.columns]
+    return df
+
+
+def test_streaming_features_match_batch():
+    df = daily_bars()
+    streamed = StreamingFeatureEngineer().warm_up(df)
+    batch = FeatureEngineer().add_features(df)
+    for column in COLUMNS:
+        pd.testing.assert_series_equal(streamed[column], batch[column], rtol=1e-9, atol=1e-9, check_names=False)
+
+
+def test_from_history_and_checkpoint_continue_the_stream(tmp_path):
+    df = daily_bars()
+    history, live = df.iloc[:700], df.iloc[700:]
+    expected = StreamingFeatureEngineer().warm_up(df).iloc[700:]
+
+    engine = StreamingFeatureEngineer.from_history(history)
+    engine.save(str(tmp_path / 'state.json'))
+    restored = StreamingFeatureEngineer.load(str(tmp_path / 'state.json'))
+    for candidate in (engine, restored):
+        pd.testing.assert_frame_equal(candidate.warm_up(live), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_streaming_edge_cases():
+    assert StreamingFeatureEngineer().warm_up(daily_bars().iloc[:0]).empty
+    first = StreamingFeatureEngineer().update({'close': 100.0})
+    assert np.isnan([first[column] for column in COLUMNS if column != 'RSI']).all()
+
+    # A flat price has no losses: RSI is 100 and volatility 0, as in the batch path
+    flat = pd.DataFrame({'close': np.full(60, 50.0)})
+    streamed = StreamingFeatureEngineer(sma_windows=(5,)).warm_up(flat)
+    assert streamed['RSI'].iloc[-1] == 100.0
+    assert streamed['Volatility_20'].iloc[-1] == 0.0
+
+
+@pytest.mark.parametrize('n_bars', [1, 300])
+def test_stream_backtest_matches_run(n_bars):
+    raw = daily_bars().iloc[:n_bars]
+    strategy = MACrossoverStrategy(10, 30)
+    data = FeatureEngineer(sma_windows=(10, 30)).add_features(raw)
+    expected = Backtester().run(data, strategy)
+
+    evaluator = OnlineEvaluator()
+    records = list(Backtester().stream(DataFrameSource(raw), strategy, evaluator=evaluator))
+    streamed = pd.DataFrame(records).set_index('Date')
+    pd.testing.assert_frame_equal(streamed[expected.columns], expected, check_dtype=False, check_index_type=False, check_freq=False)
+    assert evaluator.n == n_bars
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.providers import SyntheticProvider
+from src.validation import ensure_sorted, summarize, validate_ohlcv
+
+
+def daily_bars(start='2023-01-01', end='2024-01-01'):
+    df = SyntheticProvider().download('SPY', start, end)
+    df.columns = [c.lower() for c in df.columns]
+    return df
+
+
+def test_clean_bars_pass_through():
+    df = daily_bars()
+    repaired, report = validate_ohlcv(df, holidays=[])
+    pd.testing.assert_frame_equal(repaired, df)
+    assert summarize(report) == 'no issues'
+    assert report['rows_in'] == report['rows_out'] == len(df)
+
+
+def test_unsorted_and_duplicated_bars():
+    df = daily_bars()
+    later = df.iloc[[10]].assign(close=df['close'].iloc[10] * 1.001)
+    damaged = pd.concat([df, later]).sample(frac=1, random_state=0)
+    repaired, report = validate_ohlcv(damaged, holidays=[])
+
+    assert report['unsorted'] and report['duplicates'] == 1
+    assert repaired.index.is_monotonic_increasing and repaired.index.is_unique
+    # The bar appended last wins, as in the store
+    assert repaired['close'].iloc[10] == later['close'].iloc[0]
+    assert ensure_sorted(repaired) is repaired
+
+
+def test_invalid_prices_are_dropped():
+    df = daily_bars()
+    damaged = df.copy()
+    damaged.iloc[5, damaged.columns.get_loc('open')] = 0.0
+    damaged.iloc[6, damaged.columns.get_loc('low')] = -1.0
+    damaged.iloc[7, damaged.columns.get_loc('close')] = np.nan
+    damaged.iloc[8, damaged.columns.get_loc('high')] = np.inf
+    repaired, report = validate_ohlcv(damaged, holidays=[])
+    assert report['invalid_prices'] == 4
+    pd.testing.assert_frame_equal(repaired, df.drop(df.index[5:9]))
+
+
+def test_ohlc_and_volume_repairs():
+    df = daily_bars()
+    damaged = df.copy()
+    damaged.iloc[3, damaged.columns.get_loc('high')] = damaged['low'].iloc[3] * 0.99
+    damaged.iloc[4, damaged.columns.get_loc('low')] = damaged['high'].iloc[4] * 1.01
+    damaged.iloc[9, damaged.columns.get_loc('volume')] = -5
+    repaired, report = validate_ohlcv(damaged, holidays=[])
+
+    assert report['ohlc_repaired'] == 2 and report['negative_volume'] == 1
+    prices = repaired[['open', 'high', 'low', 'close']]
+    assert (repaired['high'] == prices.max(axis=1)).all()
+    assert (repaired['low'] == prices.min(axis=1)).all()
+    assert repaired['volume'].iloc[9] == 0
+    assert repaired.dtypes.equals(df.dtypes)
+
+
+@pytest.mark.parametrize('mode', ['flag', 'fill', 'drop'])
+def test_spike_handling(mode):
+    df = daily_bars()
+    damaged = df.copy()
+    # A bad tick scales the whole bar, so the OHLC check has nothing to repair
+    damaged.iloc[100, :4] *= 3
+    repaired, report = validate_ohlcv(damaged, outliers=mode, holidays=[])
+
+    assert report['outliers'] == 1
+    assert report['outlier_dates'] == [str(df.index[100])]
+    if mode == 'flag':
+        pd.testing.assert_frame_equal(repaired, damaged)
+    elif mode == 'fill':
+        previous = df['close'].iloc[99]
+        assert (repaired.iloc[100][['open', 'high', 'low', 'close']] == previous).all()
+        pd.testing.assert_frame_equal(repaired.drop(df.index[100]), df.drop(df.index[100]))
+    else:
+        pd.testing.assert_frame_equal(repaired, df.drop(df.index[100]))
+
+
+def test_unreversed_jump_is_not_a_spike():
+    df = daily_bars()
+    damaged = df.copy()
+    damaged.iloc[100:, :4] *= 3
+    _, report = validate_ohlcv(damaged, holidays=[])
+    assert report['outliers'] == 0
+
+
+def test_missing_sessions_against_the_nyse_calendar():
+    df = daily_bars()
+    # The synthetic bars trade every weekday, holidays included
+    holidays_traded = validate_ohlcv(df)[1]
+    assert holidays_traded['missing_sessions'] == 0
+
+    gapped = df.drop(df.index[20:23])
+    _, report = validate_ohlcv(gapped, holidays=[])
+    assert report['missing_sessions'] == 3
+    assert report['gaps'] == [(str(df.index[19].date()), str(df.index[23].date()))]
+
+    # Thanksgiving 2023 is not a missing session
+    _, report = validate_ohlcv(df.drop(pd.Timestamp('2023-11-23')))
+    assert report['missing_sessions'] == 0
+
+
+@pytest.mark.parametrize('n_bars', [0, 1])
+def test_empty_and_single_bar(n_bars):
+    df = daily_bars().iloc[:n_bars]
+    repaired, report = validate_ohlcv(df)
+    pd.testing.assert_frame_equal(repaired, df)
+    assert report['rows_out'] == n_bars
+    assert report['missing_sessions'] == 0 and report['outliers'] == 0
+
+
+def test_unknown_outlier_mode():
+    with pytest.raises(ValueError, match='outliers'):
+        validate_ohlcv(daily_bars(), outliers='clip')
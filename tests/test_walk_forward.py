@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from src import walk_forward
+from src.backtester import Backtester
+from src.evaluation import Evaluator
+from src.features import FeatureEngineer
+from src.providers import SyntheticProvider
+from src.strategies import MLStrategy, PrecomputedSignalStrategy
+
+
+def feature_data(start='2016-01-01', end='2020-01-01'):
+    df = SyntheticProvider().download('SPY', start, end)
+    df.columns = [c.lower() for c in df.columns]
+    return FeatureEngineer().add_features(df).dropna()
+
+
+class CountingStrategy(MLStrategy):
+    predictions = 0
+
+    def generate_signals(self, data):
+        CountingStrategy.predictions += 1
+        return super().generate_signals(data)
+
+    def signal_array(self, data):
+        CountingStrategy.predictions += 1
+        return super().signal_array(data)
+
+
+def test_folds_predict_once_and_backtest_their_signals(monkeypatch):
+    monkeypatch.setattr(walk_forward, 'MLStrategy', CountingStrategy)
+    data = feature_data()
+    engine = walk_forward.WalkForward(train_size=400, test_size=150, n_jobs=1, strategy_kwargs={'n_estimators': 10})
+    signals, report = engine.run(data)
+
+    assert CountingStrategy.predictions == len(report) == len(engine.splits(len(data)))
+    assert signals.index.equals(data.index[400:])
+
+    # Fold metrics are those of the stitched signals over each test window
+    for fold, (_, train_end, test_end) in enumerate(engine.splits(len(data))):
+        test_data = data.iloc[train_end:test_end]
+        results = Backtester().run(test_data, PrecomputedSignalStrategy(signals.loc[test_data.index]))
+        expected = Evaluator(results).calculate_metrics()
+        assert report.loc[fold, 'Sharpe Ratio'] == pytest.approx(expected['Sharpe Ratio'], nan_ok=True)
+        assert report.loc[fold, 'Cumulative Return'] == pytest.approx(expected['Cumulative Return'])
+
+
+def test_too_little_data_for_a_fold():
+    with pytest.raises(ValueError, match='rows for walk-forward'):
+        walk_forward.WalkForward(train_size=400, n_jobs=1).run(feature_data().iloc[:400])